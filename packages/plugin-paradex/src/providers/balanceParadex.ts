@@ -6,6 +6,7 @@ import {
     elizaLogger,
 } from "@elizaos/core";
 import { getJwtToken, ParadexAuthError } from "../utils/getJwtParadex";
+import { getSnapshotPart } from "../utils/accountSnapshot";
 
 interface ParadexState extends State {
     starknetAccount?: string;
@@ -27,27 +28,12 @@ interface BalanceResponse {
     results: BalanceResult[];
 }
 
-function getParadexUrl(): string {
-    const network = (process.env.PARADEX_NETWORK || "testnet").toLowerCase();
-    if (network !== "testnet" && network !== "prod") {
-        throw new Error("PARADEX_NETWORK must be either 'testnet' or 'prod'");
-    }
-    return `https://api.${network}.paradex.trade/v1`;
-}
-
 async function fetchAccountBalance(
     jwt: string,
     account: string
 ): Promise<BalanceResponse> {
-    const baseUrl = getParadexUrl();
     try {
-        const balanceResponse = await fetch(`${baseUrl}/balance`, {
-            headers: {
-                Authorization: `Bearer ${jwt}`,
-                Accept: "application/json",
-            },
-        });
-        return await balanceResponse.json();
+        return await getSnapshotPart(jwt, "balances");
     } catch (error) {
         console.error("Error fetching account balance:", error);
         throw new ParadexAuthError("Failed to fetch account balance", error);
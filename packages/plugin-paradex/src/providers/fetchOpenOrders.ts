@@ -6,6 +6,7 @@ import {
     elizaLogger,
 } from "@elizaos/core";
 import { getJwtToken, ParadexAuthError } from "../utils/getJwtParadex";
+import { getSnapshotPart } from "../utils/accountSnapshot";
 import { ParadexState } from "../types";
 
 interface OrderResponse {
@@ -47,10 +48,17 @@ async function fetchOpenOrders(
     jwt: string,
     market?: string
 ): Promise<OrderResponse> {
+    if (!market) {
+        try {
+            return await getSnapshotPart(jwt, "openOrders");
+        } catch (error) {
+            elizaLogger.error("Error fetching open orders:", error);
+            throw error;
+        }
+    }
+
     const baseUrl = getParadexUrl();
-    const url = market
-        ? `${baseUrl}/orders?market=${market}`
-        : `${baseUrl}/orders`;
+    const url = `${baseUrl}/orders?market=${market}`;
 
     elizaLogger.info("Fetching open orders from URL:", url);
 
@@ -6,6 +6,7 @@ import {
     elizaLogger,
 } from "@elizaos/core";
 import { getJwtToken, ParadexAuthError } from "../utils/getJwtParadex";
+import { getSnapshotPart } from "../utils/accountSnapshot";
 import { ParadexState } from "../types";
 
 interface Position {
@@ -37,34 +38,9 @@ interface PositionResponse {
     results: Position[];
 }
 
-function getParadexUrl(): string {
-    const network = (process.env.PARADEX_NETWORK || "testnet").toLowerCase();
-    if (network !== "testnet" && network !== "prod") {
-        throw new Error("PARADEX_NETWORK must be either 'testnet' or 'prod'");
-    }
-    return `https://api.${network}.paradex.trade/v1`;
-}
-
 async function fetchPositions(jwt: string): Promise<PositionResponse> {
-    const baseUrl = getParadexUrl();
-    const url = `${baseUrl}/positions`;
-
     try {
-        const response = await fetch(url, {
-            headers: {
-                Authorization: `Bearer ${jwt}`,
-                Accept: "application/json",
-            },
-        });
-
-        if (!response.ok) {
-            throw new Error(
-                `Failed to fetch positions: ${response.status} ${response.statusText}`
-            );
-        }
-
-        const data = await response.json();
-        return data;
+        return await getSnapshotPart(jwt, "positions");
     } catch (error) {
         elizaLogger.error("Error fetching positions:", error);
         throw error;
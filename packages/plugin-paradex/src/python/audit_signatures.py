@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from starknet_py.common import int_from_bytes
+from starknet_py.net.signer.stark_curve_signer import KeyPair
+
+from shared.api_client import get_paradex_config
+from shared.order_audit import DEFAULT_BATCH_SIZE, audit_fills, audit_orders
+from shared.trade_store import open_fill_store
+from utils import get_paradex_account_address, hex_to_int
+
+def get_paradex_url():
+    network = os.getenv("PARADEX_NETWORK", "testnet").lower()
+    if network not in ["testnet", "prod"]:
+        raise ValueError("PARADEX_NETWORK must be either 'testnet' or 'prod'")
+    return f"https://api.{network}.paradex.trade/v1"
+
+def parse_list(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+def iter_json_lines(path: str):
+    """Records of a JSON lines file, one at a time."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_store_fills():
+    table = open_fill_store().read(["id", "order_id", "market"])
+    for batch in table.to_batches():
+        yield from batch.to_pylist()
+
+async def main():
+    try:
+        private_keys = parse_list(os.getenv("PARADEX_ACCOUNT_PRIVATE_KEYS", ""))
+        if not private_keys:
+            raise Exception("PARADEX_ACCOUNT_PRIVATE_KEYS needs at least one key")
+        orders_path = os.getenv("AUDIT_ORDERS_PATH")
+        if not orders_path:
+            raise Exception("AUDIT_ORDERS_PATH must point to a JSON lines file of orders")
+        fills_path = os.getenv("AUDIT_FILLS_PATH")
+        processes = int(os.getenv("AUDIT_PROCESSES", str(os.cpu_count() or 1)))
+        batch_size = int(os.getenv("AUDIT_BATCH_SIZE", str(DEFAULT_BATCH_SIZE)))
+
+        paradex_config = await get_paradex_config(get_paradex_url())
+        chain_id = int_from_bytes(paradex_config["starknet_chain_id"].encode())
+        public_keys = {
+            get_paradex_account_address(paradex_config, key): hex(
+                KeyPair.from_private_key(hex_to_int(key)).public_key
+            )
+            for key in private_keys
+        }
+
+        valid_ids = set()
+        with ProcessPoolExecutor(max_workers=max(processes, 1)) as executor:
+            orders_report = audit_orders(
+                iter_json_lines(orders_path),
+                chain_id,
+                public_keys,
+                processes=processes,
+                executor=executor,
+                batch_size=batch_size,
+                valid_ids=valid_ids,
+            )
+        # Fills from the given file, or else from the local fill store
+        fills = iter_json_lines(fills_path) if fills_path else iter_store_fills()
+        fills_report = audit_fills(fills, valid_ids)
+
+        print(json.dumps({"orders": orders_report, "fills": fills_report}))
+        sys.exit(1 if orders_report["mismatches"] or fills_report["mismatches"] else 0)
+
+    except Exception as e:
+        error_result = {
+            "error": str(e),
+            "type": type(e).__name__,
+            "traceback": traceback.format_exc()
+        }
+        print(json.dumps(error_result), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOGGING_LEVEL", "INFO"),
+        format="%(asctime)s.%(msecs)03d | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr
+    )
+
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        logging.error("Local Main Error", exc_info=True)
+        sys.exit(1)
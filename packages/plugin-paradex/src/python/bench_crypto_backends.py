@@ -0,0 +1,43 @@
+import timeit
+
+from helpers.crypto_backend import available_backends, select_backend
+
+number = 200
+rep = 5
+private_key = 0x3C1E9550E66958296D11B60F8E8E7A7AD990D07FA65D5F7652C4A6C87D4E3CC
+msg_hash = 0x2BBE1A1AE0E5D5EC9C5D0E9CA6A4D4E8C3B8A6A8A3A5A1E9F5C5B5D4C3B2A1F
+
+backends = available_backends()
+print(f"available backends: {', '.join(backends)}")
+
+# Every backend has to give the same public key and the same (RFC 6979) signature
+reference = None
+for name, backend in backends.items():
+    public_key = backend.get_public_key(private_key)
+    r, s = backend.sign(msg_hash, private_key)
+    assert backend.verify(msg_hash, r, s, public_key), name
+    assert not backend.verify(msg_hash + 1, r, s, public_key), name
+    result = (backend.pedersen_hash(msg_hash, private_key), public_key, r, s)
+    assert reference is None or result == reference, f"{name} disagrees"
+    reference = result
+
+for name, backend in backends.items():
+    public_key = backend.get_public_key(private_key)
+    r, s = backend.sign(msg_hash, private_key)
+    timings = {
+        "pedersen_hash": timeit.repeat(
+            lambda: backend.pedersen_hash(msg_hash, private_key), number=number, repeat=rep
+        ),
+        "sign": timeit.repeat(
+            lambda: backend.sign(msg_hash, private_key), number=number // 10, repeat=rep
+        ),
+        "verify": timeit.repeat(
+            lambda: backend.verify(msg_hash, r, s, public_key), number=number // 10, repeat=rep
+        ),
+    }
+    print(f"{name}:")
+    for op, t in timings.items():
+        n = number if op == "pedersen_hash" else number // 10
+        print(f"\t{op}:\t{1_000_000*min(t)/n:.0f}us\tbest per sec:\t{n/min(t):.0f}")
+
+print(f"auto selects: {select_backend('auto').name}")
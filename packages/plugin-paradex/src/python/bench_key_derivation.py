@@ -0,0 +1,66 @@
+import hashlib
+import secrets
+import timeit
+
+from eth_account import Account as EthAccount
+from eth_account.messages import encode_structured_data
+
+from helpers.key_derivation import derive_stark_keys, grind_keys, stark_key_message
+from starknet_py.constants import EC_ORDER
+
+number = 10
+rep = 5
+fleet_size = 100
+chain_id = 11155111
+
+# Equivalence with these implementations is checked in tests/test_key_derivation.py
+def legacy_grind_key(key_seed: int, key_value_limit: int) -> int:
+    max_allowed_value = 2**256 - (2**256 % key_value_limit)
+    current_index = 0
+
+    def indexed_sha256(seed: int, index: int) -> int:
+        def padded_hex(x: int) -> str:
+            hex_str = hex(x)[2:]
+            return hex_str if len(hex_str) % 2 == 0 else "0" + hex_str
+
+        digest = hashlib.sha256(bytes.fromhex(padded_hex(seed) + padded_hex(index))).hexdigest()
+        return int(digest, 16)
+
+    key = indexed_sha256(seed=key_seed, index=current_index)
+    while key >= max_allowed_value:
+        current_index += 1
+        key = indexed_sha256(seed=key_seed, index=current_index)
+    return key % key_value_limit
+
+
+def legacy_derive_stark_keys(eth_private_keys):
+    keys = []
+    for key in eth_private_keys:
+        encoded = encode_structured_data(primitive=stark_key_message(chain_id))
+        signature = EthAccount.sign_message(encoded, key).signature.hex()
+        keys.append(legacy_grind_key(int(signature[2 : 64 + 2], 16), EC_ORDER))
+    return keys
+
+
+seeds = [secrets.randbits(256) for _ in range(10_000)] + [0, 1, 255, 256]
+eth_private_keys = [secrets.token_hex(32) for _ in range(fleet_size)]
+
+
+def report(name, t, count, runs=number):
+    print(
+        f"{name}:\n\tbest time:\t{1000*min(t)/runs:.1f}ms\n\tbest per sec:\t{count*runs/min(t):.0f}"
+    )
+
+
+report("grind_key x10000 (legacy)", timeit.repeat(
+    lambda: [legacy_grind_key(s, EC_ORDER) for s in seeds], number=number, repeat=rep
+), len(seeds))
+report("grind_keys x10000", timeit.repeat(
+    lambda: grind_keys(seeds), number=number, repeat=rep
+), len(seeds))
+report(f"stark keys x{fleet_size} (legacy)", timeit.repeat(
+    lambda: legacy_derive_stark_keys(eth_private_keys), number=1, repeat=rep
+), fleet_size, runs=1)
+report(f"derive_stark_keys x{fleet_size}", timeit.repeat(
+    lambda: derive_stark_keys(eth_private_keys, chain_id), number=1, repeat=rep
+), fleet_size, runs=1)
@@ -0,0 +1,37 @@
+// Burns the withdrawn tokens and records the withdrawal, without messaging L1.
+#[starknet::contract]
+mod L2Bridge {
+    use starknet::{ContractAddress, EthAddress, get_caller_address};
+    use paradex_devnet::usdc::{IUSDCDispatcher, IUSDCDispatcherTrait};
+
+    #[storage]
+    struct Storage {
+        token: ContractAddress,
+    }
+
+    #[event]
+    #[derive(Drop, starknet::Event)]
+    enum Event {
+        WithdrawInitiated: WithdrawInitiated,
+    }
+
+    #[derive(Drop, starknet::Event)]
+    struct WithdrawInitiated {
+        l1_recipient: EthAddress,
+        amount: u256,
+        caller_address: ContractAddress,
+    }
+
+    #[constructor]
+    fn constructor(ref self: ContractState, token: ContractAddress) {
+        self.token.write(token);
+    }
+
+    #[external(v0)]
+    fn initiate_withdraw(ref self: ContractState, l1_recipient: EthAddress, amount: u256) {
+        let caller_address = get_caller_address();
+        IUSDCDispatcher { contract_address: self.token.read() }
+            .permissionedBurn(caller_address, amount);
+        self.emit(WithdrawInitiated { l1_recipient, amount, caller_address });
+    }
+}
@@ -0,0 +1,6 @@
+// Stand-ins for the contracts used by the on-chain flows, for local devnets only.
+// They expose the entrypoints and argument names of the real contracts with
+// the simplest possible behavior: no access control beyond what the flows need.
+mod usdc;
+mod paraclear;
+mod l2_bridge;
@@ -0,0 +1,46 @@
+// Paraclear balances have 8 decimals, `scale` converts them to token units.
+#[starknet::contract]
+mod Paraclear {
+    use starknet::{ContractAddress, get_caller_address, get_contract_address};
+    use paradex_devnet::usdc::{IUSDCDispatcher, IUSDCDispatcherTrait};
+
+    #[storage]
+    struct Storage {
+        scale: u128,
+        balances: LegacyMap<(ContractAddress, ContractAddress), u128>,
+    }
+
+    #[constructor]
+    fn constructor(ref self: ContractState, scale: u128) {
+        self.scale.write(scale);
+    }
+
+    #[external(v0)]
+    fn deposit(ref self: ContractState, token_address: ContractAddress, amount: felt252) {
+        let account = get_caller_address();
+        let amount: u128 = amount.try_into().unwrap();
+        let token_amount: u256 = (amount / self.scale.read()).into();
+        IUSDCDispatcher { contract_address: token_address }
+            .transferFrom(account, get_contract_address(), token_amount);
+        let balance = self.balances.read((account, token_address));
+        self.balances.write((account, token_address), balance + amount);
+    }
+
+    #[external(v0)]
+    fn withdraw(ref self: ContractState, token_address: ContractAddress, amount: felt252) {
+        let account = get_caller_address();
+        let amount: u128 = amount.try_into().unwrap();
+        let balance = self.balances.read((account, token_address));
+        assert(balance >= amount, 'Insufficient balance');
+        self.balances.write((account, token_address), balance - amount);
+        let token_amount: u256 = (amount / self.scale.read()).into();
+        IUSDCDispatcher { contract_address: token_address }.transfer(account, token_amount);
+    }
+
+    #[external(v0)]
+    fn getTokenAssetBalance(
+        self: @ContractState, account: ContractAddress, token_address: ContractAddress
+    ) -> felt252 {
+        self.balances.read((account, token_address)).into()
+    }
+}
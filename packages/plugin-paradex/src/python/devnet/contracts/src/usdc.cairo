@@ -0,0 +1,96 @@
+use starknet::ContractAddress;
+
+#[starknet::interface]
+trait IUSDC<TState> {
+    fn balanceOf(self: @TState, account: ContractAddress) -> u256;
+    fn allowance(self: @TState, owner: ContractAddress, spender: ContractAddress) -> u256;
+    fn transfer(ref self: TState, recipient: ContractAddress, amount: u256) -> bool;
+    fn transferFrom(
+        ref self: TState, sender: ContractAddress, recipient: ContractAddress, amount: u256
+    ) -> bool;
+    fn increaseAllowance(ref self: TState, spender: ContractAddress, addedValue: u256) -> bool;
+    fn permissionedBurn(ref self: TState, account: ContractAddress, amount: u256);
+}
+
+#[starknet::contract]
+mod USDC {
+    use starknet::{ContractAddress, get_caller_address};
+
+    #[storage]
+    struct Storage {
+        owner: ContractAddress,
+        bridge: ContractAddress,
+        balances: LegacyMap<ContractAddress, u256>,
+        allowances: LegacyMap<(ContractAddress, ContractAddress), u256>,
+    }
+
+    #[constructor]
+    fn constructor(ref self: ContractState, owner: ContractAddress) {
+        self.owner.write(owner);
+    }
+
+    #[external(v0)]
+    fn decimals(self: @ContractState) -> u8 {
+        6
+    }
+
+    #[external(v0)]
+    fn mint(ref self: ContractState, recipient: ContractAddress, amount: u256) {
+        assert(get_caller_address() == self.owner.read(), 'Only owner');
+        self.balances.write(recipient, self.balances.read(recipient) + amount);
+    }
+
+    #[external(v0)]
+    fn set_bridge(ref self: ContractState, bridge: ContractAddress) {
+        assert(get_caller_address() == self.owner.read(), 'Only owner');
+        self.bridge.write(bridge);
+    }
+
+    #[abi(embed_v0)]
+    impl USDCImpl of super::IUSDC<ContractState> {
+        fn balanceOf(self: @ContractState, account: ContractAddress) -> u256 {
+            self.balances.read(account)
+        }
+
+        fn allowance(
+            self: @ContractState, owner: ContractAddress, spender: ContractAddress
+        ) -> u256 {
+            self.allowances.read((owner, spender))
+        }
+
+        fn transfer(ref self: ContractState, recipient: ContractAddress, amount: u256) -> bool {
+            let sender = get_caller_address();
+            self.balances.write(sender, self.balances.read(sender) - amount);
+            self.balances.write(recipient, self.balances.read(recipient) + amount);
+            true
+        }
+
+        fn transferFrom(
+            ref self: ContractState,
+            sender: ContractAddress,
+            recipient: ContractAddress,
+            amount: u256
+        ) -> bool {
+            let spender = get_caller_address();
+            let allowance = self.allowances.read((sender, spender));
+            self.allowances.write((sender, spender), allowance - amount);
+            self.balances.write(sender, self.balances.read(sender) - amount);
+            self.balances.write(recipient, self.balances.read(recipient) + amount);
+            true
+        }
+
+        fn increaseAllowance(
+            ref self: ContractState, spender: ContractAddress, addedValue: u256
+        ) -> bool {
+            let owner = get_caller_address();
+            let allowance = self.allowances.read((owner, spender));
+            self.allowances.write((owner, spender), allowance + addedValue);
+            true
+        }
+
+        fn permissionedBurn(ref self: ContractState, account: ContractAddress, amount: u256) {
+            assert(get_caller_address() == self.bridge.read(), 'Only bridge');
+            self.balances.write(account, self.balances.read(account) - amount);
+        }
+    }
+}
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import urllib.request
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+# Must be set before the shared modules and web3.auto are imported
+os.environ.setdefault("PARADEX_DATA_DIR", tempfile.mkdtemp(prefix="paradex-devnet-"))
+
+from starknet_py.contract import Contract
+
+from shared.account_registry import get_account_registry
+from shared.api_client import deposit_to_paraclear
+from shared.api_config import ApiConfig
+from transfer_l2_usdc import paraclear_transfer
+from utils import get_l1_eth_account
+from withdraw import withdraw_from_l1_bridge, withdraw_from_paraclear
+
+CONTRACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "devnet", "contracts")
+ARTIFACTS_DIR = os.path.join(CONTRACTS_DIR, "target", "dev")
+SCARB_PACKAGE = "paradex_devnet"
+# First default anvil account
+ANVIL_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+# The L1 bridge stand-in is a contract that accepts any call
+L1_BRIDGE_ADDRESS = "0x00000000000000000000000000000000000b1D9e"
+PARACLEAR_DECIMALS = 8
+USDC_DECIMALS = 6
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class RpcCounter:
+    """JSON-RPC proxy in front of a node, counting HTTP requests and calls per method."""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.requests = 0
+        self.calls = Counter()
+        self._session = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        payload = json.loads(body)
+        self.requests += 1
+        for call in payload if isinstance(payload, list) else [payload]:
+            self.calls[call.get("method")] += 1
+        async with self._session.post(
+            self.upstream, data=body, headers={"Content-Type": "application/json"}
+        ) as response:
+            return web.Response(
+                body=await response.read(), status=response.status, content_type="application/json"
+            )
+
+    async def start(self) -> None:
+        self._session = aiohttp.ClientSession()
+        app = web.Application()
+        app.router.add_post("/", handler=self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", self.port).start()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.calls = Counter()
+
+    def snapshot(self) -> dict:
+        return {
+            "http_requests": self.requests,
+            "calls": sum(self.calls.values()),
+            "by_method": dict(self.calls),
+        }
+
+
+def start_proxies(counters) -> None:
+    # web3 is synchronous, the proxies get their own loop so that a blocking
+    # L1 call from a flow does not stall the proxy that has to answer it
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    for counter in counters:
+        asyncio.run_coroutine_threadsafe(counter.start(), loop).result()
+
+
+def start_node(command, url: str, method: str, timeout: float = 30):
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    payload = json.dumps({"jsonrpc": "2.0", "id": 0, "method": method, "params": []})
+    while time.monotonic() < deadline:
+        try:
+            request = urllib.request.Request(
+                url, data=payload.encode(), headers={"Content-Type": "application/json"}
+            )
+            urllib.request.urlopen(request, timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise Exception(f"{command[0]} did not start at {url}")
+
+
+async def rpc(url: str, method: str, params=None):
+    payload = {"jsonrpc": "2.0", "id": 0, "method": method, "params": params or []}
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=payload) as response:
+            result = await response.json(content_type=None)
+    if "error" in result:
+        raise Exception(f"{method} failed: {result['error']}")
+    return result["result"]
+
+
+async def declare_and_deploy(deployer, name: str, constructor_args: list) -> Contract:
+    base = os.path.join(ARTIFACTS_DIR, f"{SCARB_PACKAGE}_{name}")
+    if not os.path.exists(f"{base}.contract_class.json"):
+        raise Exception(f"{base}.contract_class.json not found, run `scarb build` in {CONTRACTS_DIR}")
+    with open(f"{base}.contract_class.json") as f:
+        sierra = f.read()
+    with open(f"{base}.compiled_contract_class.json") as f:
+        casm = f.read()
+    declare_result = await Contract.declare_v2(
+        deployer, compiled_contract=sierra, compiled_contract_casm=casm, auto_estimate=True
+    )
+    await declare_result.wait_for_acceptance()
+    deploy_result = await declare_result.deploy_v1(
+        constructor_args=constructor_args, auto_estimate=True
+    )
+    await deploy_result.wait_for_acceptance()
+    logging.info(f"{name} deployed at {hex(deploy_result.deployed_contract.address)}")
+    return deploy_result.deployed_contract
+
+
+async def deploy_stand_ins(starknet_url: str, l1_url: str, users) -> dict:
+    """Deploys the stand-in contracts, funds the users and returns the matching paradex_config."""
+    chain_id = await rpc(starknet_url, "starknet_chainId")
+    predeployed = await rpc(starknet_url, "devnet_getPredeployedAccounts")
+    config = {
+        "starknet_fullnode_rpc_url": starknet_url,
+        "starknet_chain_id": bytes.fromhex(chain_id[2:]).decode(),
+    }
+    deployer = get_account_registry().account(
+        predeployed[0]["address"],
+        int(predeployed[0]["private_key"], 16),
+        starknet_url,
+        int(chain_id, 16),
+    )
+
+    usdc = await declare_and_deploy(deployer, "USDC", [deployer.address])
+    paraclear = await declare_and_deploy(
+        deployer, "Paraclear", [10 ** (PARACLEAR_DECIMALS - USDC_DECIMALS)]
+    )
+    l2_bridge = await declare_and_deploy(deployer, "L2Bridge", [usdc.address])
+    calls = [usdc.functions["set_bridge"].prepare_invoke_v1(bridge=l2_bridge.address)]
+    for user in users:
+        calls.append(
+            usdc.functions["mint"].prepare_invoke_v1(
+                recipient=int(user["address"], 16), amount=1_000 * 10**USDC_DECIMALS
+            )
+        )
+    invoke = await deployer.execute_v1(calls, auto_estimate=True)
+    await deployer.client.wait_for_tx(invoke.transaction_hash)
+
+    await rpc(l1_url, "anvil_setCode", [L1_BRIDGE_ADDRESS, "0x00"])
+    config.update(
+        {
+            "l1_chain_id": str(int(await rpc(l1_url, "eth_chainId"), 16)),
+            "paraclear_address": hex(paraclear.address),
+            "paraclear_decimals": PARACLEAR_DECIMALS,
+            "bridged_tokens": [
+                {
+                    "name": "USDC",
+                    "symbol": "USDC",
+                    "decimals": USDC_DECIMALS,
+                    "l1_token_address": L1_BRIDGE_ADDRESS,
+                    "l1_bridge_address": L1_BRIDGE_ADDRESS,
+                    "l2_token_address": hex(usdc.address),
+                    "l2_bridge_address": hex(l2_bridge.address),
+                }
+            ],
+        }
+    )
+    return config
+
+
+def build_flows(config: dict, users, w3, eth_account) -> dict:
+    """The on-chain flows under test, against the stand-in contracts."""
+    registry = get_account_registry()
+    chain = int.from_bytes(config["starknet_chain_id"].encode(), "big")
+    old_account, new_account = [
+        registry.account(
+            u["address"], int(u["private_key"], 16), config["starknet_fullnode_rpc_url"], chain
+        )
+        for u in users
+    ]
+    api_config = ApiConfig()
+    api_config.paradex_config = config
+    api_config.paradex_account = users[0]["address"]
+    api_config.paradex_account_private_key = users[0]["private_key"]
+
+    flows = {
+        "deposit": lambda: deposit_to_paraclear(api_config, 100 * 10**USDC_DECIMALS),
+        "transfer": lambda: paraclear_transfer(config, old_account, new_account, 10.0),
+        "withdraw_l2": lambda: withdraw_from_paraclear(
+            eth_account.address, 1, config, new_account
+        ),
+        "withdraw_l1": lambda: withdraw_from_l1_bridge(
+            eth_account.address, 1, config, w3, eth_account
+        ),
+    }
+    return flows
+
+
+async def benchmark(config: dict, users, counters, runs: int) -> list:
+    w3, eth_account = get_l1_eth_account(ANVIL_PRIVATE_KEY)
+    flows = build_flows(config, users, w3, eth_account)
+    starknet_counter, l1_counter = counters
+    results = []
+    for run in range(runs):
+        for name, flow in flows.items():
+            for counter in counters:
+                counter.reset()
+            started = time.perf_counter()
+            result = {"run": run, "flow": name}
+            try:
+                await flow()
+            except Exception as e:
+                logging.error(f"{name} failed: {e}")
+                result["error"] = str(e)
+            result["latency_s"] = round(time.perf_counter() - started, 3)
+            result["starknet_rpc"] = starknet_counter.snapshot()
+            result["l1_rpc"] = l1_counter.snapshot()
+            results.append(result)
+    return results
+
+
+async def main():
+    processes = []
+    try:
+        starknet_upstream = os.getenv("DEVNET_STARKNET_URL")
+        if not starknet_upstream:
+            port = free_port()
+            starknet_upstream = f"http://127.0.0.1:{port}/rpc"
+            processes.append(
+                start_node(
+                    [os.getenv("STARKNET_DEVNET_BIN", "starknet-devnet"), "--seed", "0",
+                     "--port", str(port)],
+                    starknet_upstream,
+                    "starknet_chainId",
+                )
+            )
+        l1_upstream = os.getenv("DEVNET_L1_URL")
+        if not l1_upstream:
+            port = free_port()
+            l1_upstream = f"http://127.0.0.1:{port}"
+            processes.append(
+                start_node(
+                    [os.getenv("ANVIL_BIN", "anvil"), "--port", str(port), "--silent"],
+                    l1_upstream,
+                    "eth_chainId",
+                )
+            )
+
+        # Flows talk to the nodes through counting proxies
+        counters = [RpcCounter(starknet_upstream), RpcCounter(l1_upstream)]
+        start_proxies(counters)
+        os.environ["WEB3_PROVIDER_URI"] = counters[1].url
+
+        predeployed = await rpc(starknet_upstream, "devnet_getPredeployedAccounts")
+        users = predeployed[1:3]
+        config = await deploy_stand_ins(counters[0].url, counters[1].url, users)
+        results = await benchmark(
+            config, users, counters, int(os.getenv("DEVNET_BENCH_RUNS", "3"))
+        )
+
+        print(json.dumps({"paradex_config": config, "results": results}))
+        await get_account_registry().close()
+        sys.exit(1 if any("error" in r for r in results) else 0)
+
+    except Exception as e:
+        error_result = {
+            "error": str(e),
+            "type": type(e).__name__,
+            "traceback": traceback.format_exc()
+        }
+        print(json.dumps(error_result), file=sys.stderr)
+        sys.exit(1)
+    finally:
+        for process in processes:
+            process.terminate()
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOGGING_LEVEL", "INFO"),
+        format="%(asctime)s.%(msecs)03d | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr
+    )
+
+    try:
+        asyncio.run(main())
+    except Exception:
+        logging.error("Local Main Error", exc_info=True)
+        sys.exit(1)
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import traceback
+from shared.api_client import get_jwt_token, get_markets_summary, get_paradex_config
+from shared.history_sync import sync_markets
+from shared.pnl import FIFO, pnl_by_market
+from shared.trade_store import open_fill_store
+from utils import generate_paradex_account, get_l1_eth_account
+
+def get_paradex_url():
+    network = os.getenv("PARADEX_NETWORK", "testnet").lower()
+    if network not in ["testnet", "prod"]:
+        raise ValueError("PARADEX_NETWORK must be either 'testnet' or 'prod'")
+    return f"https://api.{network}.paradex.trade/v1"
+
+async def main():
+    try:
+        paradex_http_url = get_paradex_url()
+        ethereum_private_key = os.getenv("ETHEREUM_PRIVATE_KEY")
+        if not ethereum_private_key:
+            raise Exception("ETHEREUM_PRIVATE_KEY not set")
+        markets = [m.strip() for m in os.getenv("PARADEX_MARKETS", "ETH-USD-PERP").split(",") if m.strip()]
+        method = os.getenv("PNL_METHOD", FIFO)
+
+        paradex_config = await get_paradex_config(paradex_http_url)
+        _, eth_account = get_l1_eth_account(ethereum_private_key)
+        paradex_account, paradex_account_private_key = generate_paradex_account(
+            paradex_config,
+            eth_account.key.hex()
+        )
+        jwt_token = await get_jwt_token(
+            paradex_config,
+            paradex_http_url,
+            paradex_account,
+            paradex_account_private_key,
+        )
+
+        # Only fills newer than the stored ones are fetched
+        store = open_fill_store()
+        await sync_markets(paradex_http_url, jwt_token, "/fills", markets, paradex_account, store)
+
+        summaries = await get_markets_summary(paradex_http_url)
+        mark_prices = {
+            s["symbol"]: float(s["mark_price"]) for s in summaries if s.get("mark_price")
+        }
+        result = pnl_by_market(store, mark_prices, method, account=paradex_account)
+
+        print(json.dumps(result))
+        sys.exit(0)
+
+    except Exception as e:
+        error_result = {
+            "error": str(e),
+            "type": type(e).__name__,
+            "traceback": traceback.format_exc()
+        }
+        print(json.dumps(error_result), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOGGING_LEVEL", "INFO"),
+        format="%(asctime)s.%(msecs)03d | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr
+    )
+
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        logging.error("Local Main Error", exc_info=True)
+        sys.exit(1)
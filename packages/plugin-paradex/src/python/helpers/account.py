@@ -2,12 +2,14 @@ from typing import List, Optional
 
 from starknet_py.net.account.account import Account as StarknetAccount
 from starknet_py.net.client import Client
+from starknet_py.net.client_models import Calls, EstimatedFee, SentTransactionResponse
 from starknet_py.net.models import AddressRepresentation, StarknetChainId
 from starknet_py.net.signer import BaseSigner
 from starknet_py.net.signer.stark_curve_signer import KeyPair
 from starknet_py.utils.typed_data import TypedData as TypedDataDataclass
 
 
+from .nonce_manager import LoopLock, NonceManager, is_nonce_error
 from .typed_data import TypedData
 from .utils import message_signature
 
@@ -25,6 +27,49 @@ class Account(StarknetAccount):
         super().__init__(
             address=address, client=client, signer=signer, key_pair=key_pair, chain=chain
         )
+        self.nonce_manager = NonceManager(lambda: self.get_nonce(block_number="pending"))
+        self._send_lock = LoopLock()
+
+    async def submit_v1(
+        self,
+        calls: Calls,
+        *,
+        max_fee: Optional[int] = None,
+        auto_estimate: bool = False,
+        retries: int = 2,
+    ) -> SentTransactionResponse:
+        """
+        `execute_v1` with a locally managed nonce. Returns as soon as the node
+        accepted the transaction, so several invokes can be pipelined without
+        waiting for inclusion in between. Sends are serialized per account to
+        keep nonces in order; a nonce rejection resyncs and retries.
+        """
+        for attempt in range(retries + 1):
+            async with self._send_lock.get():
+                nonce = await self.nonce_manager.acquire()
+                try:
+                    response = await self.execute_v1(
+                        calls, nonce=nonce, max_fee=max_fee, auto_estimate=auto_estimate
+                    )
+                except Exception as err:
+                    self.nonce_manager.release(nonce, err)
+                    if not is_nonce_error(err) or attempt == retries:
+                        raise
+                    continue
+            self.nonce_manager.sent(nonce, response.transaction_hash)
+            return response
+
+    async def estimate_fee_v1(self, sequence: List[Calls]) -> List[EstimatedFee]:
+        """
+        Estimates consecutive invokes of this account in one request, each
+        simulated on top of the state left by the previous ones.
+        """
+        nonce = await self.get_nonce(block_number="pending")
+        transactions = [
+            await self._prepare_invoke(calls, nonce=nonce + i, max_fee=0)
+            for i, calls in enumerate(sequence)
+        ]
+        return await self.estimate_fee(transactions, block_number="pending")
 
     def sign_message(self, typed_data: TypedData) -> List[int]:
         typed_data_dataclass = TypedDataDataclass.from_dict(typed_data)
@@ -0,0 +1,179 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from starknet_py.constants import EC_ORDER
+
+CRYPTO_BACKEND_ENV = "PARADEX_CRYPTO_BACKEND"
+# Used in this order when no benchmark is run
+BACKEND_PREFERENCE = ("rust", "cpp", "python")
+BENCHMARK_HASHES = 100
+BENCHMARK_VERIFIES = 4
+
+# pedersen_hash(1, 2), every backend has to agree with it to be used
+_PEDERSEN_1_2 = 0x5BB9440E27889A364BCB678B1F679ECD1347ACDEDCBF36E83494F857CC58026
+
+
+class CryptoBackend:
+    """
+    Stark curve primitives of one implementation, with the same signatures
+    everywhere: pedersen_hash(left, right), get_public_key(private_key),
+    sign(msg_hash, private_key, seed) -> (r, s), verify(msg_hash, r, s, public_key).
+    Signatures use the RFC 6979 nonce, so all backends return the same (r, s).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pedersen_hash: Callable[[int, int], int],
+        get_public_key: Callable[[int], int],
+        sign: Callable[..., Tuple[int, int]],
+        verify: Callable[[int, int, int, int], bool],
+    ):
+        self.name = name
+        self.pedersen_hash = pedersen_hash
+        self.get_public_key = get_public_key
+        self.sign = sign
+        self.verify = verify
+
+    def __repr__(self):
+        return f"CryptoBackend({self.name})"
+
+
+def _rust_backend() -> CryptoBackend:
+    from starknet_crypto_py import (
+        get_public_key as rs_get_public_key,
+        pedersen_hash as rs_pedersen_hash,
+        sign as rs_sign,
+        verify as rs_verify,
+    )
+    from starkware.crypto.signature.signature import generate_k_rfc6979
+
+    def sign(msg_hash: int, priv_key: int, seed: Optional[int] = None) -> Tuple[int, int]:
+        k = generate_k_rfc6979(msg_hash, priv_key, seed)
+        return rs_sign(private_key=priv_key, msg_hash=msg_hash, k=k)
+
+    def verify(msg_hash: int, r: int, s: int, public_key: int) -> bool:
+        return rs_verify(msg_hash=msg_hash, r=r, s=s, public_key=public_key)
+
+    return CryptoBackend("rust", rs_pedersen_hash, rs_get_public_key, sign, verify)
+
+
+def _cpp_backend() -> CryptoBackend:
+    from crypto_cpp_py.cpp_bindings import (
+        cpp_get_public_key,
+        cpp_hash,
+        cpp_sign,
+        cpp_verify,
+        get_cpp_lib_file,
+    )
+
+    # Raises RuntimeError when the shared library is not installed
+    get_cpp_lib_file()
+
+    def sign(msg_hash: int, priv_key: int, seed: Optional[int] = None) -> Tuple[int, int]:
+        return cpp_sign(msg_hash, priv_key, seed)
+
+    def verify(msg_hash: int, r: int, s: int, public_key: int) -> bool:
+        return bool(cpp_verify(msg_hash, r, pow(s, -1, EC_ORDER), public_key))
+
+    return CryptoBackend("cpp", cpp_hash, cpp_get_public_key, sign, verify)
+
+
+def _python_backend() -> CryptoBackend:
+    from starkware.cairo.lang.vm.crypto import pedersen_hash
+    from starkware.crypto.signature.signature import private_to_stark_key, sign, verify
+
+    return CryptoBackend("python", pedersen_hash, private_to_stark_key, sign, verify)
+
+
+_LOADERS: Dict[str, Callable[[], CryptoBackend]] = {
+    "rust": _rust_backend,
+    "cpp": _cpp_backend,
+    "python": _python_backend,
+}
+
+
+def available_backends() -> Dict[str, CryptoBackend]:
+    """
+    The backends that load and hash correctly here, in preference order.
+    DISABLE_CRYPTO_C_EXTENSION=true leaves the C++ library out, as in starknet.py.
+    """
+    disable_c_extension = os.getenv("DISABLE_CRYPTO_C_EXTENSION", "false").lower() == "true"
+    backends = {}
+    for name in BACKEND_PREFERENCE:
+        if name == "cpp" and disable_c_extension:
+            continue
+        try:
+            backend = _LOADERS[name]()
+            if backend.pedersen_hash(1, 2) != _PEDERSEN_1_2:
+                raise ValueError("wrong pedersen_hash(1, 2)")
+        except (ImportError, OSError, RuntimeError, ValueError) as e:
+            logging.debug(f"Crypto backend {name} unavailable: {e}")
+            continue
+        backends[name] = backend
+    return backends
+
+
+def benchmark_backend(
+    backend: CryptoBackend, hashes: int = BENCHMARK_HASHES, verifies: int = BENCHMARK_VERIFIES
+) -> float:
+    """Seconds taken by `hashes` Pedersen hashes and `verifies` signature checks."""
+    public_key = backend.get_public_key(0x1234)
+    # Checking a wrong signature costs as much as a right one, without signing first
+    r = s = _PEDERSEN_1_2
+    started = time.perf_counter()
+    value = 0
+    for i in range(hashes):
+        value = backend.pedersen_hash(value, i)
+    for _ in range(verifies):
+        backend.verify(_PEDERSEN_1_2, r, s, public_key)
+    return time.perf_counter() - started
+
+
+def select_backend(name: Optional[str] = None) -> CryptoBackend:
+    """
+    The backend named by `name` or PARADEX_CRYPTO_BACKEND: rust, cpp, python,
+    "auto" (default) to benchmark the available ones and take the fastest, or
+    "preferred" to take the first available one in BACKEND_PREFERENCE.
+    """
+    name = (name or os.getenv(CRYPTO_BACKEND_ENV) or "auto").lower()
+    backends = available_backends()
+    if not backends:
+        raise RuntimeError("No Stark crypto backend available")
+    if name == "preferred":
+        return next(iter(backends.values()))
+    if name == "auto":
+        if len(backends) == 1:
+            return next(iter(backends.values()))
+        timings = {n: benchmark_backend(b) for n, b in backends.items()}
+        fastest = min(timings, key=timings.get)
+        logging.info(
+            f"Crypto backend {fastest}, benchmark: "
+            + ", ".join(f"{n} {1000 * t:.2f}ms" for n, t in timings.items())
+        )
+        return backends[fastest]
+    if name not in backends:
+        raise ValueError(
+            f"{CRYPTO_BACKEND_ENV}={name} is not available, available: {', '.join(backends)}"
+        )
+    return backends[name]
+
+
+_backend: Optional[CryptoBackend] = None
+
+
+def get_crypto_backend() -> CryptoBackend:
+    """The backend of this process, selected on first use."""
+    global _backend
+    if _backend is None:
+        _backend = select_backend()
+    return _backend
+
+
+def set_crypto_backend(name: str) -> CryptoBackend:
+    """Replaces the backend of this process, e.g. to compare them."""
+    global _backend
+    _backend = select_backend(name)
+    return _backend
@@ -0,0 +1,88 @@
+import functools
+import hashlib
+from typing import Iterable, List, Union
+
+from eth_account import Account as EthAccount
+from eth_account.messages import SignableMessage, encode_structured_data
+from starknet_py.constants import EC_ORDER
+
+_TWO_256 = 2**256
+
+
+def _int_bytes(x: int) -> bytes:
+    # Same bytes as the even-length hex string of x: big-endian, at least one byte
+    return x.to_bytes(max(1, (x.bit_length() + 7) // 8), "big")
+
+
+def _grind(seed: bytes, key_value_limit: int, max_allowed_value: int) -> int:
+    key = int.from_bytes(hashlib.sha256(seed + b"\x00").digest(), "big")
+    index = 0
+    while key >= max_allowed_value:
+        index += 1
+        key = int.from_bytes(hashlib.sha256(seed + _int_bytes(index)).digest(), "big")
+    return key % key_value_limit
+
+
+def grind_key(key_seed: int, key_value_limit: int = EC_ORDER) -> int:
+    """
+    Uniform key below `key_value_limit` from sha256(seed || index), retrying
+    the indexes that fall in the biased range (StarkWare's grindKey).
+    """
+    return _grind(_int_bytes(key_seed), key_value_limit, _TWO_256 - (_TWO_256 % key_value_limit))
+
+
+def grind_keys(key_seeds: Iterable[int], key_value_limit: int = EC_ORDER) -> List[int]:
+    max_allowed_value = _TWO_256 - (_TWO_256 % key_value_limit)
+    return [_grind(_int_bytes(seed), key_value_limit, max_allowed_value) for seed in key_seeds]
+
+
+def private_key_from_eth_signature(eth_signature: Union[str, bytes]) -> int:
+    """Stark private key from the `r` part of an Ethereum signature (hex string or bytes)."""
+    if isinstance(eth_signature, str):
+        r = int(eth_signature[2 : 64 + 2], 16)
+    else:
+        r = int.from_bytes(eth_signature[:32], "big")
+    return grind_key(r)
+
+
+def stark_key_message(chain_id: int) -> dict:
+    return {
+        "domain": {"name": "Paradex", "version": "1", "chainId": chain_id},
+        "primaryType": "Constant",
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+            ],
+            "Constant": [
+                {"name": "action", "type": "string"},
+            ],
+        },
+        "message": {
+            "action": "STARK Key",
+        },
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def encoded_stark_key_message(chain_id: int) -> SignableMessage:
+    return encode_structured_data(primitive=stark_key_message(chain_id))
+
+
+def encode_stark_key_message(message: dict) -> SignableMessage:
+    """EIP-712 encoding of `message`, from the per-chain cache when it is the STARK Key one."""
+    chain_id = message.get("domain", {}).get("chainId")
+    if isinstance(chain_id, int) and message == stark_key_message(chain_id):
+        return encoded_stark_key_message(chain_id)
+    return encode_structured_data(primitive=message)
+
+
+def derive_stark_key(eth_private_key: Union[str, bytes, int], chain_id: int) -> int:
+    signed = EthAccount.sign_message(encoded_stark_key_message(chain_id), eth_private_key)
+    return grind_key(signed.r)
+
+
+def derive_stark_keys(eth_private_keys: Iterable, chain_id: int) -> List[int]:
+    encoded = encoded_stark_key_message(chain_id)
+    return grind_keys(EthAccount.sign_message(encoded, key).r for key in eth_private_keys)
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import re
+import weakref
+from typing import Awaitable, Callable, Dict, Optional
+
+from starknet_py.net.client_errors import ClientError
+
+_NONCE_ERROR = re.compile(r"nonce", re.IGNORECASE)
+
+
+def is_nonce_error(err: Exception) -> bool:
+    return isinstance(err, ClientError) and bool(_NONCE_ERROR.search(err.message or ""))
+
+
+class LoopLock:
+    """
+    One asyncio.Lock per event loop, created on first use in that loop, for
+    objects shared across loops: an asyncio.Lock is bound to the first loop using it.
+    """
+
+    def __init__(self):
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+
+class NonceManager:
+    """
+    Hands out the nonces of one account locally, so that transactions can be
+    submitted back to back without waiting for the previous one to be included.
+    The chain nonce is only read on first use and after a rejection.
+    """
+
+    def __init__(self, fetch_nonce: Callable[[], Awaitable[int]]):
+        self._fetch_nonce = fetch_nonce
+        self._next: Optional[int] = None
+        self._stale = False
+        self._lock = LoopLock()
+        # nonce -> transaction hash, None until the transaction is sent
+        self.in_flight: Dict[int, Optional[int]] = {}
+
+    async def _sync(self) -> None:
+        chain_nonce = await self._fetch_nonce()
+        for nonce in [n for n in self.in_flight if n < chain_nonce]:
+            del self.in_flight[nonce]
+        if self._next is not None and chain_nonce != self._next:
+            logging.info(f"Nonce resynced from {self._next} to {chain_nonce}")
+        self._next = chain_nonce
+        self._stale = False
+
+    async def acquire(self) -> int:
+        async with self._lock.get():
+            if self._next is None or self._stale:
+                await self._sync()
+            nonce = self._next
+            self._next += 1
+            self.in_flight[nonce] = None
+            return nonce
+
+    def sent(self, nonce: int, tx_hash: int) -> None:
+        self.in_flight[nonce] = tx_hash
+
+    def release(self, nonce: int, err: Optional[Exception] = None) -> None:
+        """
+        Returns the last nonce handed out, whose transaction was not accepted
+        by the node, to be reused. Callers send one transaction at a time, so
+        no later nonce can be in flight. A nonce error means the local view is
+        wrong and resyncs the next nonce from the chain.
+        """
+        self.in_flight.pop(nonce, None)
+        if err is not None and is_nonce_error(err):
+            self._stale = True
+        else:
+            self._next = nonce
+
+    def discard(self, nonce: int) -> None:
+        """
+        Drops a nonce that was not accepted while later ones were sent, e.g.
+        in a batch of transactions: the next nonce is resynced from the chain.
+        """
+        self.in_flight.pop(nonce, None)
+        self._stale = True
+
+    def nonce_of(self, tx_hash: int) -> Optional[int]:
+        return next((n for n, h in self.in_flight.items() if h == tx_hash), None)
+
+    def confirmed(self, nonce: int) -> None:
+        """Forgets the nonces up to `nonce`, once its transaction is included."""
+        for n in [n for n in self.in_flight if n <= nonce]:
+            del self.in_flight[n]
+
+    async def resync(self) -> None:
+        async with self._lock.get():
+            await self._sync()
@@ -4,14 +4,13 @@ import logging
 import os
 import traceback
 
-from crypto_cpp_py.cpp_bindings import cpp_hash, get_cpp_lib_file
 from typing import cast, Sequence, List, Union
 
 from starknet_py.cairo.felt import encode_shortstring
 from starknet_py.common import int_from_bytes
 from starknet_py.hash.selector import get_selector_from_name
-from starkware.cairo.lang.vm.crypto import pedersen_hash as default_hash
 
+from helpers.crypto_backend import get_crypto_backend
 from utils import (
     generate_paradex_account,
     get_l1_eth_account,
@@ -201,24 +200,16 @@ def compute_hash_on_elements(data: Sequence) -> int:
     The length is appended in order to avoid collisions of the following kind:
     H([x,y,z]) = h(h(x,y),z) = H([w, z]) where w = h(x,y).
     """
-    return functools.reduce(pedersen_hash, [*data, len(data)], 0)
+    return functools.reduce(get_crypto_backend().pedersen_hash, [*data, len(data)], 0)
 
 
 def pedersen_hash(left: int, right: int) -> int:
     """
     One of two hash functions (along with _starknet_keccak) used throughout StarkNet.
+    The implementation (Rust, C++ or Python) is selected once per process,
+    DISABLE_CRYPTO_C_EXTENSION=true leaves the C++ one out.
     """
-    if use_cpp_variant():
-        return cpp_hash(left, right)
-    return default_hash(left, right)
-
-
-def use_cpp_variant() -> bool:
-    force_disable_ext = (
-        os.getenv("DISABLE_CRYPTO_C_EXTENSION", "false").lower() == "true"
-    )
-    cpp_lib_file = get_cpp_lib_file()
-    return not force_disable_ext and bool(cpp_lib_file)
+    return get_crypto_backend().pedersen_hash(left, right)
 
 
 if __name__ == "__main__":
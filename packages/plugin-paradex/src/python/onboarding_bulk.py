@@ -0,0 +1,85 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_account import Account as EthAccount
+
+from onboarding import get_paradex_urls
+from shared.bulk_onboarding import DEFAULT_CONCURRENCY, OnboardingStatus, onboard_accounts
+from shared.hd_wallet import get_hd_wallet
+
+def parse_list(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+def get_network_urls():
+    networks = parse_list(os.getenv("PARADEX_NETWORKS", "testnet,prod").lower())
+    urls = {"testnet" if "testnet" in url else "prod": url for url in get_paradex_urls()}
+    unknown = [n for n in networks if n not in urls]
+    if unknown:
+        raise ValueError(f"Unknown PARADEX_NETWORKS {unknown}, expected 'testnet' and/or 'prod'")
+    return [urls[n] for n in networks]
+
+def get_eth_accounts():
+    """(address, private key hex) of the listed keys, then of the HD range, if any."""
+    accounts = []
+    for key in parse_list(os.getenv("ETHEREUM_PRIVATE_KEYS", "")):
+        key = key if key.startswith("0x") else "0x" + key
+        accounts.append((EthAccount.from_key(key).address, key))
+    mnemonic = os.getenv("ETHEREUM_HD_PHRASE")
+    if mnemonic:
+        start = int(os.getenv("ONBOARDING_START_INDEX", "0"))
+        count = int(os.getenv("ONBOARDING_COUNT", "1"))
+        accounts.extend(get_hd_wallet(mnemonic).accounts(range(start, start + count)))
+    return accounts
+
+async def main():
+    try:
+        eth_accounts = get_eth_accounts()
+        if not eth_accounts:
+            raise Exception("Set ETHEREUM_PRIVATE_KEYS and/or ETHEREUM_HD_PHRASE")
+        urls = get_network_urls()
+        processes = int(os.getenv("ONBOARDING_PROCESSES", str(os.cpu_count() or 1)))
+        concurrency = int(os.getenv("ONBOARDING_CONCURRENCY", str(DEFAULT_CONCURRENCY)))
+        status_path = os.getenv("ONBOARDING_STATUS_PATH")
+        status = OnboardingStatus(status_path) if status_path else OnboardingStatus()
+
+        # One pool for the derivations of every network
+        with ProcessPoolExecutor(max_workers=max(processes, 1)) as executor:
+            result = await onboard_accounts(
+                eth_accounts,
+                urls,
+                status,
+                processes=processes,
+                executor=executor,
+                concurrency=concurrency,
+            )
+
+        print(json.dumps(result))
+        sys.exit(0 if result["success"] else 1)
+
+    except Exception as e:
+        error_result = {
+            "error": str(e),
+            "type": type(e).__name__,
+            "traceback": traceback.format_exc()
+        }
+        print(json.dumps(error_result), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOGGING_LEVEL", "INFO"),
+        format="%(asctime)s.%(msecs)03d | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr
+    )
+
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        logging.error("Local Main Error", exc_info=True)
+        sys.exit(1)
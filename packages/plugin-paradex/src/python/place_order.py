@@ -9,8 +9,11 @@ from decimal import Decimal, ROUND_DOWN
 from shared.api_config import ApiConfig
 from shared.paradex_api_utils import Order, OrderSide, OrderType
 from shared.api_client import get_jwt_token, get_paradex_config, post_order_payload, sign_order
+from shared.tracing import get_tracer, order_trace_key
 from utils import generate_paradex_account, get_l1_eth_account
 
+tracer = get_tracer()
+
 def get_paradex_url():
     network = os.getenv("PARADEX_NETWORK", "testnet").lower()
     if network not in ["testnet", "prod"]:
@@ -48,19 +51,21 @@ def build_order(config: ApiConfig, params) -> Order:
     for key, value in params.items():
         logging.info(f"  {key}: {value}")
     
-    order = Order(
-        market=params['market'],
-        order_type=params['type'],
-        order_side=params['side'],
-        size=params['size'],
-        limit_price=params.get('price'),
-        client_id=params['client_id'],
-        signature_timestamp=int(time.time() * 1000)
-    )
-    
-    logging.info(f"Created order object: {order}")
-    order.signature = sign_order(config, order)
-    logging.info("Order signed successfully")
+    signature_timestamp = int(time.time() * 1000)
+    with tracer.span(order_trace_key(params['client_id'], signature_timestamp), "build_order"):
+        order = Order(
+            market=params['market'],
+            order_type=params['type'],
+            order_side=params['side'],
+            size=params['size'],
+            limit_price=params.get('price'),
+            client_id=params['client_id'],
+            signature_timestamp=signature_timestamp
+        )
+
+        logging.info(f"Created order object: {order}")
+        order.signature = sign_order(config, order)
+        logging.info("Order signed successfully")
     
     return order
 
@@ -105,8 +110,15 @@ async def main():
         logging.info(f"Order built: {order}")
         
         logging.info("Placing order...")
-        result = await post_order_payload(config.paradex_http_url, jwt_token, order.dump_to_dict())
+        with tracer.span(order_trace_key(order.client_id, order.signature_timestamp), "Order.dump_to_dict"):
+            payload = order.dump_to_dict()
+        result = await post_order_payload(config.paradex_http_url, jwt_token, payload)
         logging.info(f"Order placement result: {result}")
+        logging.info(f"Order latency summary: {tracer.summary()}")
+
+        trace_path = os.getenv("ORDER_TRACE_PATH")
+        if trace_path:
+            tracer.export_jsonl(trace_path)
         
         print(json.dumps(result))
         sys.exit(0)
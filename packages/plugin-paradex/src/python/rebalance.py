@@ -0,0 +1,72 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import traceback
+from shared.api_client import get_paradex_config
+from shared.rebalancer import Rebalancer
+from utils import get_account, get_paradex_account_address
+
+def get_paradex_url():
+    network = os.getenv("PARADEX_NETWORK", "testnet").lower()
+    if network not in ["testnet", "prod"]:
+        raise ValueError("PARADEX_NETWORK must be either 'testnet' or 'prod'")
+    return f"https://api.{network}.paradex.trade/v1"
+
+def parse_list(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+async def main():
+    try:
+        paradex_http_url = get_paradex_url()
+        private_keys = parse_list(os.getenv("PARADEX_ACCOUNT_PRIVATE_KEYS", ""))
+        if len(private_keys) < 2:
+            raise Exception("PARADEX_ACCOUNT_PRIVATE_KEYS needs at least two comma-separated keys")
+        # One weight per account, in the same order (equal split by default)
+        weights = [float(w) for w in parse_list(os.getenv("REBALANCE_WEIGHTS", ""))]
+        if weights and len(weights) != len(private_keys):
+            raise Exception("REBALANCE_WEIGHTS needs one weight per account")
+        min_amount = float(os.getenv("REBALANCE_MIN_AMOUNT", "1"))
+        dry_run = os.getenv("REBALANCE_DRY_RUN", "").lower() in ("1", "true", "yes")
+
+        paradex_config = await get_paradex_config(paradex_http_url)
+        usdc_decimals = paradex_config["bridged_tokens"][0]["decimals"]
+        accounts = [
+            get_account(get_paradex_account_address(paradex_config, key), key, paradex_config)
+            for key in private_keys
+        ]
+
+        rebalancer = Rebalancer(paradex_config, accounts)
+        result = await rebalancer.rebalance(
+            weights=dict(zip(rebalancer.accounts, weights)) if weights else None,
+            min_amount=int(min_amount * 10**usdc_decimals),
+            dry_run=dry_run,
+        )
+
+        print(json.dumps(result))
+        failed = [t for t in result.get("transactions", []) if "error" in t]
+        sys.exit(1 if failed else 0)
+
+    except Exception as e:
+        error_result = {
+            "error": str(e),
+            "type": type(e).__name__,
+            "traceback": traceback.format_exc()
+        }
+        print(json.dumps(error_result), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.getenv("LOGGING_LEVEL", "INFO"),
+        format="%(asctime)s.%(msecs)03d | %(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr
+    )
+
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        logging.error("Local Main Error", exc_info=True)
+        sys.exit(1)
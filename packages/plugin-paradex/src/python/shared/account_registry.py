@@ -0,0 +1,158 @@
+"""
+Description:
+    Process-wide registry of Starknet clients, key pairs and accounts.
+    `get_account` used to build a new FullNodeClient, derive the public key
+    and create an Account on every call, and each client opened a new HTTP
+    session for every request. Here there is one client per node URL, all
+    sharing one pooled aiohttp session (created inside the running event
+    loop), one KeyPair per private key and one Account per (address, chain),
+    so the local nonce state of an account is kept between calls.
+    `close()` releases the session; it is also released at exit.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import warnings
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import HttpMethod, RpcHttpClient
+from starknet_py.net.signer.stark_curve_signer import KeyPair
+
+from helpers.account import Account
+
+# Maximum number of open connections to the Starknet nodes
+CONNECTION_LIMIT = int(os.getenv("STARKNET_RPC_CONNECTION_LIMIT", "20"))
+KEEPALIVE_TIMEOUT = 30
+
+
+class _PooledRpcHttpClient(RpcHttpClient):
+    """Sends every request through the registry session of the running loop."""
+
+    def __init__(self, url: str, registry: "AccountRegistry"):
+        super().__init__(url=url)
+        self._registry = registry
+
+    async def request(
+        self,
+        address: str,
+        http_method: HttpMethod,
+        params: Optional[dict] = None,
+        payload=None,
+    ):
+        return await self._make_request(
+            session=self._registry.session(),
+            address=address,
+            http_method=http_method,
+            params=params,
+            payload=payload,
+        )
+
+
+class PooledFullNodeClient(FullNodeClient):
+    def __init__(self, node_url: str, registry: "AccountRegistry"):
+        super().__init__(node_url=node_url)
+        self._client = _PooledRpcHttpClient(node_url, registry)
+        self._registry = registry
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Pooled session, for the raw JSON-RPC helpers (batching, receipt watcher)."""
+        return self._registry.session()
+
+
+class AccountRegistry:
+    def __init__(self, connection_limit: int = CONNECTION_LIMIT):
+        self.connection_limit = connection_limit
+        self._clients: Dict[str, PooledFullNodeClient] = {}
+        self._key_pairs: Dict[int, KeyPair] = {}
+        self._accounts: Dict[Tuple[int, int], Account] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session of the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._release_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit, keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+
+    def client(self, node_url: str) -> PooledFullNodeClient:
+        client = self._clients.get(node_url)
+        if client is None:
+            client = PooledFullNodeClient(node_url, self)
+            self._clients[node_url] = client
+        return client
+
+    def key_pair(self, private_key: int) -> KeyPair:
+        # Deriving the public key is an elliptic curve multiplication
+        key_pair = self._key_pairs.get(private_key)
+        if key_pair is None:
+            key_pair = KeyPair.from_private_key(key=private_key)
+            self._key_pairs[private_key] = key_pair
+        return key_pair
+
+    def account(self, address: str, private_key: int, node_url: str, chain) -> Account:
+        key = (int(address, 16), int(chain))
+        account = self._accounts.get(key)
+        if (
+            account is None
+            or account.signer.private_key != private_key
+            or account.client.url != node_url
+        ):
+            account = Account(
+                client=self.client(node_url),
+                address=address,
+                key_pair=self.key_pair(private_key),
+                chain=chain,
+            )
+            self._accounts[key] = account
+        return account
+
+    def _release_session(self) -> None:
+        """
+        Closes the connections of the current session without awaiting,
+        so that a session left behind by a finished event loop is released too.
+        """
+        if self._session is None:
+            return
+        if not self._session.closed:
+            with warnings.catch_warnings():
+                # aiohttp 3.x closes connectors synchronously, awaiting is optional
+                warnings.simplefilter("ignore", DeprecationWarning)
+                self._session.connector.close()
+            self._session.detach()
+        self._session = None
+        self._session_loop = None
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            logging.debug("Closing Starknet RPC session")
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def clear(self) -> None:
+        """Forgets every client, key pair and account, and releases the session."""
+        self._release_session()
+        self._clients.clear()
+        self._key_pairs.clear()
+        self._accounts.clear()
+
+
+_account_registry: Optional[AccountRegistry] = None
+
+
+def get_account_registry() -> AccountRegistry:
+    global _account_registry
+    if _account_registry is None:
+        _account_registry = AccountRegistry()
+        atexit.register(_account_registry._release_session)
+    return _account_registry
@@ -11,7 +11,8 @@ import json
 import logging
 import sys
 import time
-from typing import Dict, List, Tuple
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
 import websockets
@@ -30,15 +31,37 @@ from .api_client_utils import (
     stark_key_message,
 )
 from .api_config import ApiConfig
+from .contract_cache import contract_from_address
+from .fee_estimator import get_fee_estimator
+from .json_stream import ACCEPT_ENCODING, read_json
+from .pagination import PageError
 from .paradex_api_utils import Order
+from .rate_limiter import EndpointClass, Priority, get_rate_limiter
+from .response_cache import get_response_cache
+from .rpc_batch import BalanceQuery, read_balances
+from .tracing import get_tracer, order_trace_key
+from .tx_watcher import get_tx_watcher
+from .transfer_store import TransferStore, open_transfer_store, sync_transfers
 from starknet_py.common import int_from_bytes
-from starknet_py.contract import Contract
 from starknet_py.net.signer.stark_curve_signer import KeyPair
-from .starknet_utils import get_proxy_config
 from web3.auto import w3
 
 from helpers.account import Account
 
+rate_limiter = get_rate_limiter()
+response_cache = get_response_cache()
+tracer = get_tracer()
+
+
+@asynccontextmanager
+async def _session_scope(session: Optional[aiohttp.ClientSession] = None):
+    """Reuses the caller's session, or opens one for the duration of the request."""
+    if session is not None:
+        yield session
+    else:
+        async with aiohttp.ClientSession() as new_session:
+            yield new_session
+
 
 # RESToverHTTP Interface
 async def sign_request(
@@ -82,7 +105,8 @@ async def create_rest_headers(
     headers: Dict = {
         # 'Paradex-API-Timestamp': timestamp.decode('utf-8'),
         # 'Paradex-API-Signature': signature.decode('utf-8'),
-        "Authorization": f"Bearer {paradex_jwt}"
+        "Authorization": f"Bearer {paradex_jwt}",
+        "Accept-Encoding": ACCEPT_ENCODING,
     }
 
     return headers
@@ -91,6 +115,7 @@ async def create_rest_headers(
 async def get_open_orders(
     paradex_http_url: str,
     paradex_jwt: str,
+    session: Optional[aiohttp.ClientSession] = None,
 ) -> List[Dict]:
     """
     Paradex RESToverHTTP endpoint.
@@ -108,10 +133,12 @@ async def get_open_orders(
         body="",
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
+    async with _session_scope(session) as session:
+        async with rate_limiter.request(
+            session, "GET", paradex_http_url + path, EndpointClass.PRIVATE, headers=headers
+        ) as response:
             status_code: int = response.status
-            response: Dict = await response.json()
+            response: Dict = await read_json(response)
             logging.debug("GET /orders: ", response)
             check_token_expiry(status_code=status_code, response=response)
             if status_code != 200:
@@ -125,6 +152,7 @@ async def get_open_orders(
 async def fetch_account(
     paradex_http_url: str,
     paradex_jwt: str,
+    session: Optional[aiohttp.ClientSession] = None,
 ) -> List[Dict]:
     """
     Paradex RESToverHTTP endpoint.
@@ -142,8 +170,10 @@ async def fetch_account(
         body="",
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
+    async with _session_scope(session) as session:
+        async with rate_limiter.request(
+            session, "GET", paradex_http_url + path, EndpointClass.PRIVATE, headers=headers
+        ) as response:
             status_code: int = response.status
             response: Dict = await response.json()
             check_token_expiry(status_code=status_code, response=response)
@@ -157,38 +187,39 @@ async def fetch_account(
 async def fetch_transfers(
     paradex_http_url: str,
     paradex_jwt: str,
+    account: str,
+    store: Optional[TransferStore] = None,
+    kind: Optional[str] = None,
+    token: Optional[str] = None,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
 ) -> List[Dict]:
     """
     Paradex RESToverHTTP endpoint.
     [GET] /account/transfers
-    """
-    logging.info("Getting Account state")
-    method: str = "GET"
-    path: str = "/account/transfers"
-
-    headers: Dict = await create_rest_headers(
-        paradex_jwt=paradex_jwt,
-        paradex_maker_secret_key="",
-        method=method,
-        path=path,
-        body="",
-    )
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
-            status_code: int = response.status
-            response: Dict = await response.json()
-            check_token_expiry(status_code=status_code, response=response)
-            if status_code != 200:
-                logging.error("Unable to [{method}] {path}")
-                logging.error(f"Status Code: {status_code}")
-                logging.error(f"Response Text: {response}")
-    return response
+    Syncs the transfers of `account` created since the last call into the
+    local transfer index, then returns the matching transfers from the index.
+    """
+    logging.info("Getting Account transfers")
+    own_store = store is None
+    store = store or open_transfer_store()
+    try:
+        async with aiohttp.ClientSession() as session:
+            try:
+                await sync_transfers(session, paradex_http_url, paradex_jwt, account, store)
+            except PageError as e:
+                check_token_expiry(status_code=e.status_code, response=e.response)
+                raise
+        return store.query(account, kind, token, None, start_ms, end_ms)
+    finally:
+        if own_store:
+            store.close()
 
 
 async def fetch_positions(
     paradex_http_url: str,
     paradex_jwt: str,
+    session: Optional[aiohttp.ClientSession] = None,
 ) -> List[Dict]:
     """
     Paradex RESToverHTTP endpoint.
@@ -207,10 +238,12 @@ async def fetch_positions(
         body="",
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
+    async with _session_scope(session) as session:
+        async with rate_limiter.request(
+            session, "GET", paradex_http_url + path, EndpointClass.PRIVATE, headers=headers
+        ) as response:
             status_code: int = response.status
-            response: Dict = await response.json()
+            response: Dict = await read_json(response)
             check_token_expiry(status_code=status_code, response=response)
             if status_code != 200:
                 logging.error(
@@ -225,6 +258,7 @@ async def fetch_positions(
 async def fetch_tokens(
     paradex_http_url: str,
     paradex_jwt: str,
+    session: Optional[aiohttp.ClientSession] = None,
 ) -> List[Dict]:
     """
     Paradex RESToverHTTP endpoint.
@@ -242,10 +276,12 @@ async def fetch_tokens(
         body="",
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
+    async with _session_scope(session) as session:
+        async with rate_limiter.request(
+            session, "GET", paradex_http_url + path, EndpointClass.PRIVATE, headers=headers
+        ) as response:
             status_code: int = response.status
-            response: Dict = await response.json()
+            response: Dict = await read_json(response)
             check_token_expiry(status_code=status_code, response=response)
             logging.info(f"Token Balances: {response}")
             if status_code != 200:
@@ -274,12 +310,17 @@ async def fetch_trades(paradex_http_url: str, paradex_jwt: str, market: str) ->
     )
     params = {"market": market}
     async with aiohttp.ClientSession() as session:
-        async with session.get(
-            paradex_http_url + path, headers=headers, params=params
+        async with rate_limiter.request(
+            session,
+            "GET",
+            paradex_http_url + path,
+            EndpointClass.PRIVATE,
+            headers=headers,
+            params=params,
         ) as response:
             status_code: int = response.status
             logging.info(f"URL: {response.url}")
-            response: Dict = await response.json()
+            response: Dict = await read_json(response)
             check_token_expiry(status_code=status_code, response=response)
             if status_code != 200:
                 logging.error("Unable to [GET] /trades")
@@ -307,7 +348,9 @@ async def post_order_payload(paradex_http_url: str, paradex_jwt: str, payload: d
     """
     method: str = "POST"
     path: str = "/orders"
-    _payload: str = json.dumps(payload, cls=DecimalEncoder)
+    trace_key = order_trace_key(payload.get("client_id"), payload.get("signature_timestamp"))
+    with tracer.span(trace_key, "json_encode"):
+        _payload: str = json.dumps(payload, cls=DecimalEncoder)
     headers: Dict = await create_rest_headers(
         paradex_jwt=paradex_jwt,
         paradex_maker_secret_key="",
@@ -315,26 +358,38 @@ async def post_order_payload(paradex_http_url: str, paradex_jwt: str, payload: d
         path=path,
         body=_payload,
     )
+    headers["Content-Type"] = "application/json"
     response = {}
     logging.debug(f"post_order_payload:{payload}")
     async with aiohttp.ClientSession() as session:
         try:
-            async with session.post(
-                paradex_http_url + path, headers=headers, json=payload
-            ) as response:
-                status_code: int = response.status
-                response: Dict = await response.json(content_type=None)
-                response["status_code"] = status_code
-                check_token_expiry(status_code=status_code, response=response)
-                if status_code == 201:
-                    logging.info(f"Order Created: {status_code} | Response: {response}")
-                else:
-                    logging.warning(
-                        "Unable to [POST] /orders"
-                        f" Status Code:{status_code}"
-                        f" Response Text:{response}"
-                        f" Order Payload:{payload}"
-                    )
+            with tracer.span(trace_key, "rate_limit_wait"):
+                await rate_limiter.acquire(EndpointClass.ORDERS, Priority.ORDER)
+            with tracer.span(trace_key, "post_orders"):
+                async with rate_limiter.request(
+                    session,
+                    "POST",
+                    paradex_http_url + path,
+                    EndpointClass.ORDERS,
+                    Priority.ORDER,
+                    acquired=True,
+                    headers=headers,
+                    data=_payload,
+                ) as response:
+                    status_code: int = response.status
+                    response: Dict = await response.json(content_type=None)
+            response["status_code"] = status_code
+            check_token_expiry(status_code=status_code, response=response)
+            if status_code == 201:
+                tracer.link(trace_key, response.get("id", ""))
+                logging.info(f"Order Created: {status_code} | Response: {response}")
+            else:
+                logging.warning(
+                    "Unable to [POST] /orders"
+                    f" Status Code:{status_code}"
+                    f" Response Text:{response}"
+                    f" Order Payload:{payload}"
+                )
         except aiohttp.ClientConnectorError as e:
             logging.error(f"[POST] /orders ClientConnectorError: {e}")
     return response
@@ -358,7 +413,14 @@ async def delete_order_payload(paradex_http_url: str, paradex_jwt: str, order_id
 
     async with aiohttp.ClientSession() as session:
         try:
-            async with session.delete(paradex_http_url + path, headers=headers) as response:
+            async with rate_limiter.request(
+                session,
+                "DELETE",
+                paradex_http_url + path,
+                EndpointClass.ORDERS,
+                Priority.CANCEL,
+                headers=headers,
+            ) as response:
                 status_code: int = response.status
                 response: Dict = await response.json(content_type=None)
                 check_token_expiry(status_code=status_code, response=response)
@@ -375,6 +437,54 @@ async def delete_order_payload(paradex_http_url: str, paradex_jwt: str, order_id
     return ret_val
 
 
+async def modify_order_payload(
+    paradex_http_url: str, paradex_jwt: str, order_id: str, payload: dict
+) -> dict:
+    """
+    Paradex RESToverHTTP endpoint.
+    [PUT] /orders/{order_id}
+    """
+    method: str = "PUT"
+    path: str = f"/orders/{order_id}"
+    _payload: str = json.dumps(payload, cls=DecimalEncoder)
+    headers: Dict = await create_rest_headers(
+        paradex_jwt=paradex_jwt,
+        paradex_maker_secret_key="",
+        method=method,
+        path=path,
+        body=_payload,
+    )
+    response = {}
+    logging.debug(f"modify_order_payload:{payload}")
+    async with aiohttp.ClientSession() as session:
+        try:
+            async with rate_limiter.request(
+                session,
+                "PUT",
+                paradex_http_url + path,
+                EndpointClass.ORDERS,
+                Priority.ORDER,
+                headers=headers,
+                json=payload,
+            ) as response:
+                status_code: int = response.status
+                response: Dict = await response.json(content_type=None)
+                response["status_code"] = status_code
+                check_token_expiry(status_code=status_code, response=response)
+                if status_code == 200:
+                    logging.info(f"Order modified: {status_code} | Id: {order_id}")
+                else:
+                    logging.warning(
+                        f"Unable to [PUT] {path}"
+                        f" Status Code:{status_code}"
+                        f" Response Text:{response}"
+                        f" Order Payload:{payload}"
+                    )
+        except aiohttp.ClientConnectorError as e:
+            logging.error(f"[PUT] /orders ClientConnectorError: {e}")
+    return response
+
+
 async def get_markets(
     paradex_http_url: str,
     paradex_jwt: str,
@@ -396,18 +506,38 @@ async def get_markets(
         body=payload,
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
-            status_code: int = response.status
-            response: Dict = await response.json()
-            check_token_expiry(status_code=status_code, response=response)
-            logging.debug("GET /markets: ", response)
-            if status_code != 200:
-                message: str = "Unable to [GET] /markets"
-                logging.error(message)
-                logging.error(f"Status Code: {status_code}")
-                logging.error(f"Response Text: {response}")
-            response = response["results"]
+    status_code, response = await response_cache.get(paradex_http_url, path, headers=headers)
+    check_token_expiry(status_code=status_code, response=response)
+    logging.debug("GET /markets: ", response)
+    if status_code != 200:
+        message: str = "Unable to [GET] /markets"
+        logging.error(message)
+        logging.error(f"Status Code: {status_code}")
+        logging.error(f"Response Text: {response}")
+    response = response["results"]
+    return response
+
+
+async def get_markets_summary(
+    paradex_http_url: str,
+    market: str = "ALL",
+) -> List[Dict]:
+    """
+    Paradex RESToverHTTP endpoint.
+    [GET] /markets/summary
+    """
+    logging.info("Getting markets summary...")
+    path: str = "/markets/summary"
+
+    status_code, response = await response_cache.get(
+        paradex_http_url, path, params={"market": market}
+    )
+    if status_code != 200:
+        message: str = "Unable to [GET] /markets/summary"
+        logging.error(message)
+        logging.error(f"Status Code: {status_code}")
+        logging.error(f"Response Text: {response}")
+    response = response["results"]
     return response
 
 
@@ -423,16 +553,13 @@ async def get_paradex_config(
 
     headers = dict()
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(paradex_http_url + path, headers=headers) as response:
-            status_code: int = response.status
-            response: Dict = await response.json()
-            logging.info(response)
-            if status_code != 200:
-                message: str = "Unable to [GET] /system/config"
-                logging.error(message)
-                logging.error(f"Status Code: {status_code}")
-                logging.error(f"Response Text: {response}")
+    status_code, response = await response_cache.get(paradex_http_url, path, headers=headers)
+    logging.info(response)
+    if status_code != 200:
+        message: str = "Unable to [GET] /system/config"
+        logging.error(message)
+        logging.error(f"Status Code: {status_code}")
+        logging.error(f"Response Text: {response}")
     return response
 
 
@@ -498,22 +625,22 @@ async def get_usdc_balance(config: ApiConfig) -> int:
     logging.info("get_usdc_balance")
     usdc_address = config.paradex_config["bridged_tokens"][0]["l2_token_address"]
     account = starknet_account(config)
-    usdc_contract_balance = await account.get_balance(usdc_address)
+    (usdc_contract_balance,) = await read_balances(
+        account.client, [BalanceQuery(account.address, usdc_address)]
+    )
     return usdc_contract_balance
 
 
 async def deposit_to_paraclear(config: ApiConfig, amount: int) -> None:
     paraclear_address = config.paradex_config["paraclear_address"]
     account = starknet_account(config)
-    paraclear_contract = await Contract.from_address(
-        provider=account, address=paraclear_address, proxy_config=get_proxy_config()
-    )
-    logging.info(f"Paraclear Contract: {hex(paraclear_contract.address)}")
     usdc_address = config.paradex_config["bridged_tokens"][0]["l2_token_address"]
     usdc_decimals = config.paradex_config["bridged_tokens"][0]["decimals"]
-    usdc_contract = await Contract.from_address(
-        provider=account, address=usdc_address, proxy_config=get_proxy_config()
+    paraclear_contract, usdc_contract = await asyncio.gather(
+        contract_from_address(paraclear_address, account),
+        contract_from_address(usdc_address, account),
     )
+    logging.info(f"Paraclear Contract: {hex(paraclear_contract.address)}")
     logging.info(f"USDC Contract: {usdc_contract}")
 
     amount_usdc = await get_usdc_balance(config)
@@ -525,10 +652,11 @@ async def deposit_to_paraclear(config: ApiConfig, amount: int) -> None:
         paraclear_contract.functions["deposit"].prepare_invoke_v1(int(usdc_address, 16), amount_paraclear),
     ]
     logging.info(f"Allowance increase to paraclear completed: {calls}")
-    deposit_info = await account.execute_v1(calls=calls, max_fee=int(5 * 1e17))
+    max_fee = await get_fee_estimator().max_fee(account, calls)
+    deposit_info = await account.execute_v1(calls=calls, max_fee=max_fee)
     logging.info(f"Deposit Info: {deposit_info}")
     logging.info(f"Waiting for deposit to complete: {deposit_info.transaction_hash}")
-    tx_status = await account.client.wait_for_tx(deposit_info.transaction_hash)
+    tx_status = await get_tx_watcher(account.client).wait_for_l2(deposit_info.transaction_hash)
     logging.info(f"Deposit completed: {tx_status}")
     return amount / 10**8
 
@@ -557,7 +685,14 @@ async def get_jwt_token(
     path: str = "/auth"
     logging.info(f"get_jwt_token path:{paradex_http_url + path} headers:{headers}")
     async with aiohttp.ClientSession() as session:
-        async with session.post(paradex_http_url + path, headers=headers) as response:
+        async with rate_limiter.request(
+            session,
+            "POST",
+            paradex_http_url + path,
+            EndpointClass.PRIVATE,
+            Priority.WRITE,
+            headers=headers,
+        ) as response:
             status_code: int = response.status
             response: Dict = await response.json()
             if status_code != 200:
@@ -600,7 +735,15 @@ async def onboarding(
 
     logging.info(f"onboarding path:{paradex_http_url + path} headers:{headers}")
     async with aiohttp.ClientSession() as session:
-        async with session.post(paradex_http_url + path, headers=headers, json=body) as response:
+        async with rate_limiter.request(
+            session,
+            "POST",
+            paradex_http_url + path,
+            EndpointClass.PRIVATE,
+            Priority.WRITE,
+            headers=headers,
+            json=body,
+        ) as response:
             status_code: int = response.status
             if status_code != 200:
                 message: str = "Unable to [POST] /onboarding"
@@ -621,9 +764,12 @@ def custom_exception_handler(loop, context):
 
 def sign_order(config: ApiConfig, o: Order) -> Tuple[str, str]:
     account = starknet_account(config)
-    message = order_sign_message(account._chain_id.value, o)
+    trace_key = order_trace_key(o.client_id, o.signature_timestamp)
+    with tracer.span(trace_key, "order_sign_message"):
+        message = order_sign_message(account._chain_id.value, o)
 
-    sig = account.sign_message(message)
+    with tracer.span(trace_key, "Account.sign_message"):
+        sig = account.sign_message(message)
     flat_sig = flatten_signature(sig)
     return flat_sig
 
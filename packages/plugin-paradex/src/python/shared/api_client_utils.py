@@ -1,24 +1,30 @@
-import hashlib
 import json
 import logging
 import os
 from decimal import Decimal
 from enum import IntEnum
-from typing import Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple
 
 from eth_account.hdaccount import generate_mnemonic
-from eth_account.messages import encode_structured_data
+from .account_registry import get_account_registry
+from .hd_wallet import DEFAULT_BASE_PATH, HDWallet, get_hd_wallet
 from .paradex_api_utils import Order
 from starknet_py.hash.address import compute_address
 from starknet_py.hash.selector import get_selector_from_name
-from starknet_py.net.full_node_client import FullNodeClient
 from starknet_py.common import int_from_bytes
 from starknet_py.net.signer.stark_curve_signer import KeyPair
 from starknet_py.utils.typed_data import TypedData
-from starkware.crypto.signature.signature import EC_ORDER
 from web3.auto import w3
 
 from helpers.account import Account
+from helpers.key_derivation import (
+    derive_stark_keys,
+    encode_stark_key_message,
+    grind_key,
+    private_key_from_eth_signature,
+    stark_key_message,
+)
 
 
 class TokenExpired(Exception):
@@ -50,17 +56,13 @@ def get_chain_id(chain_id: str):
     return CustomStarknetChainId.PRIVATE_TESTNET
 
 
-def get_account(account_address: str, account_key: str, paradex_config: dict):
-    client = FullNodeClient(node_url=paradex_config["starknet_fullnode_rpc_url"])
-    key_pair = KeyPair.from_private_key(key=int(account_key, 16))
-    chain = get_chain_id(paradex_config["starknet_chain_id"])
-    account = Account(
-        client=client,
+def get_account(account_address: str, account_key: str, paradex_config: dict) -> Account:
+    return get_account_registry().account(
         address=account_address,
-        key_pair=key_pair,
-        chain=chain,
+        private_key=int(account_key, 16),
+        node_url=paradex_config["starknet_fullnode_rpc_url"],
+        chain=get_chain_id(paradex_config["starknet_chain_id"]),
     )
-    return account
 
 
 # Messages
@@ -114,27 +116,6 @@ def onboarding_message(chainId: int) -> TypedData:
     return message
 
 
-def stark_key_message(chainId: int):
-    message = {
-        "domain": {"name": "Paradex", "version": "1", "chainId": chainId},
-        "primaryType": "Constant",
-        "types": {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-            ],
-            "Constant": [
-                {"name": "action", "type": "string"},
-            ],
-        },
-        "message": {
-            "action": "STARK Key",
-        },
-    }
-    return message
-
-
 def order_sign_message(chainId: int, o: Order):
     message = {
         "domain": {"name": "Paradex", "chainId": hex(chainId), "version": "1"},
@@ -223,42 +204,120 @@ def get_recovery_phrase_dict(config: dict) -> str:
 
 
 def generate_keys(menmonic: str, address_index: str) -> Optional[Tuple[str, str]]:
-    w3.eth.account.enable_unaudited_hdwallet_features()
-    account = w3.eth.account.from_mnemonic(
-        menmonic, account_path=f"m/44'/60'/0'/0/{address_index}"
+    # The seed and the parent node are computed once per mnemonic
+    ((address, private_key),) = get_hd_wallet(menmonic).accounts([int(address_index)])
+    return address, private_key
+
+
+def _paradex_accounts(eth_accounts: List[Tuple[str, str]], paradex_config: dict) -> List[dict]:
+    """Stark key and Paradex address of every (Ethereum address, private key), in one pass."""
+    stark_keys = derive_stark_keys(
+        [key for _, key in eth_accounts], int(paradex_config["l1_chain_id"])
     )
-    return account.address, account.key.hex()
+    accounts = []
+    for (eth_address, eth_private_key), private_key in zip(eth_accounts, stark_keys):
+        key_pair = KeyPair.from_private_key(private_key)
+        accounts.append(
+            {
+                "ethereum_account": eth_address,
+                "ethereum_private_key": eth_private_key,
+                "paradex_account": get_acc_contract_address_and_call_data(
+                    paradex_config["paraclear_account_proxy_hash"],
+                    paradex_config["paraclear_account_hash"],
+                    hex(key_pair.public_key),
+                ),
+                "paradex_account_private_key": hex(private_key),
+            }
+        )
+    return accounts
 
 
-def sign_stark_key_message(eth_private_key: int, stark_key_message) -> str:
-    w3.eth.account.enable_unaudited_hdwallet_features()
-    encoded = encode_structured_data(primitive=stark_key_message)
-    print("encoded", encoded)
-    signed = w3.eth.account.sign_message(encoded, eth_private_key)
-    print("signed object", signed)
-    return signed.signature.hex()
+def _derive_paradex_accounts(
+    indices: List[int], seed: bytes, paradex_config: dict, base_path: str
+) -> List[dict]:
+    accounts = _paradex_accounts(HDWallet(seed).accounts(indices, base_path), paradex_config)
+    return [{"index": index, **account} for index, account in zip(indices, accounts)]
 
 
-def grind_key(key_seed: int, key_value_limit: int) -> int:
-    max_allowed_value = 2**256 - (2**256 % key_value_limit)
-    current_index = 0
+def _account_config(paradex_config: dict) -> dict:
+    # Only what the workers need, so that a full /system/config is not pickled per chunk
+    return {
+        key: paradex_config[key]
+        for key in ("l1_chain_id", "paraclear_account_proxy_hash", "paraclear_account_hash")
+    }
 
-    def indexed_sha256(seed: int, index: int) -> int:
-        def padded_hex(x: int) -> str:
-            # Hex string should have an even
-            # number of characters to convert to bytes.
-            hex_str = hex(x)[2:]
-            return hex_str if len(hex_str) % 2 == 0 else "0" + hex_str
 
-        digest = hashlib.sha256(bytes.fromhex(padded_hex(seed) + padded_hex(index))).hexdigest()
-        return int(digest, 16)
+def map_chunks(
+    fn: Callable, items: List, processes: int, *args, executor: Optional[Executor] = None
+) -> List:
+    """
+    `fn(chunk, *args)` over `processes` contiguous chunks of `items`, flattened in order.
+    The chunks run in `executor`, or else in a new process pool. Without enough
+    items for every process, `fn` runs once in this process.
+    """
+    if processes <= 1 or len(items) < 2 * processes:
+        return fn(items, *args)
+    size = -(-len(items) // processes)
+    chunks = [items[i : i + size] for i in range(0, len(items), size)]
+    repeated = [[arg] * len(chunks) for arg in args]
+    if executor is not None:
+        results = list(executor.map(fn, chunks, *repeated))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(fn, chunks, *repeated))
+    return [item for chunk in results for item in chunk]
+
+
+def paradex_accounts(
+    eth_accounts: Iterable[Tuple[str, str]],
+    paradex_config: dict,
+    processes: int = 0,
+    executor: Optional[Executor] = None,
+) -> List[dict]:
+    """
+    Stark keys and Paradex addresses of many (Ethereum address, private key hex), in order.
+    With `processes` > 1, chunks are derived in parallel, in `executor` when given.
+    """
+    return map_chunks(
+        _paradex_accounts,
+        list(eth_accounts),
+        processes,
+        _account_config(paradex_config),
+        executor=executor,
+    )
 
-    key = indexed_sha256(seed=key_seed, index=current_index)
-    while key >= max_allowed_value:
-        current_index += 1
-        key = indexed_sha256(seed=key_seed, index=current_index)
 
-    return key % key_value_limit
+def derive_paradex_accounts(
+    mnemonic: str,
+    indices: Iterable[int],
+    paradex_config: dict,
+    processes: int = 0,
+    base_path: str = DEFAULT_BASE_PATH,
+    executor: Optional[Executor] = None,
+) -> List[dict]:
+    """
+    Derives many HD accounts with their Paradex keys and addresses, in index order.
+    With `processes` > 1, contiguous chunks of indices are derived in parallel,
+    in `executor` when given.
+    """
+    return map_chunks(
+        _derive_paradex_accounts,
+        [int(i) for i in indices],
+        processes,
+        get_hd_wallet(mnemonic).seed,
+        _account_config(paradex_config),
+        base_path,
+        executor=executor,
+    )
+
+
+def sign_stark_key_message(eth_private_key: int, stark_key_message) -> str:
+    w3.eth.account.enable_unaudited_hdwallet_features()
+    encoded = encode_stark_key_message(stark_key_message)
+    print("encoded", encoded)
+    signed = w3.eth.account.sign_message(encoded, eth_private_key)
+    print("signed object", signed)
+    return signed.signature.hex()
 
 
 # describe('Private stark key from eth signature', () => {
@@ -273,8 +332,7 @@ def grind_key(key_seed: int, key_value_limit: int) -> int:
 #   });
 # });
 def get_private_key_from_eth_signature(eth_signature_hex: str) -> int:
-    r = eth_signature_hex[2 : 64 + 2]
-    return grind_key(int(r, 16), EC_ORDER)
+    return private_key_from_eth_signature(eth_signature_hex)
 
 
 # https://github.com/starkware-libs/\
@@ -294,9 +352,9 @@ def get_private_key_from_eth_signature(eth_signature_hex: str) -> int:
 #   return grindKey(r, ec.n);
 # }
 def derive_stark_key_from_eth_key(msg: str, eth_private_key: str) -> int:
-    signed_message = sign_stark_key_message(eth_private_key, msg)
-    private_key = get_private_key_from_eth_signature(signed_message)
-    return private_key
+    # The encoded STARK Key message is cached per chain
+    signed = w3.eth.account.sign_message(encode_stark_key_message(msg), eth_private_key)
+    return grind_key(signed.r)
 
 
 def generate_accounts_dict(config: dict) -> dict:
@@ -0,0 +1,229 @@
+"""
+Description:
+    Onboarding of a fleet of Ethereum accounts on several Paradex networks.
+    The config of every network is fetched once, concurrently. Stark keys,
+    Paradex addresses and onboarding signatures of all accounts are computed
+    in one process pool, for every network at once. The [POST] /onboarding
+    requests then share one HTTP session and the private rate limit, with at
+    most `concurrency` in flight. Accounts that a previous run onboarded, as
+    recorded in a local status file, are neither derived nor sent again.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from starknet_py.cairo.felt import encode_shortstring
+from starknet_py.common import int_from_bytes
+
+from helpers.typed_data import TypedData
+from helpers.utils import compute_hash_on_elements, message_signature, private_to_stark_key
+
+from .api_client import get_paradex_config
+from .api_client_utils import flatten_signature, map_chunks, onboarding_message, paradex_accounts
+from .rate_limiter import EndpointClass, Priority, get_rate_limiter
+
+DEFAULT_STATUS_PATH = os.path.join(
+    os.getenv("PARADEX_DATA_DIR", "data"), "onboarding_status.json"
+)
+DEFAULT_CONCURRENCY = 8
+
+
+def network_name(paradex_http_url: str) -> str:
+    return "testnet" if "testnet" in paradex_http_url else "prod"
+
+
+class OnboardingStatus:
+    """
+    Accounts known to be onboarded, per network and Ethereum address, in a JSON file.
+    Records are kept in memory and written back, atomically, by `save`.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATUS_PATH):
+        self.path = path
+        self._networks: Dict[str, Dict[str, Dict]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._networks = json.load(f)
+
+    def is_onboarded(self, network: str, ethereum_account: str) -> bool:
+        return ethereum_account.lower() in self._networks.get(network, {})
+
+    def record(self, network: str, ethereum_account: str, paradex_account: str) -> None:
+        self._networks.setdefault(network, {})[ethereum_account.lower()] = {
+            "paradex_account": paradex_account,
+            "onboarded_at": int(time.time() * 1000),
+        }
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._networks, f)
+        os.replace(tmp_path, self.path)
+
+
+@functools.lru_cache(maxsize=None)
+def _onboarding_hash_parts(chain: int) -> Tuple[int, int, int]:
+    # Only the account address changes from one onboarding message hash to the next
+    typed_data = TypedData.from_dict(onboarding_message(chain))
+    return (
+        encode_shortstring("StarkNet Message"),
+        typed_data.struct_hash("StarkNetDomain", typed_data.domain),
+        typed_data.struct_hash(typed_data.primary_type, typed_data.message),
+    )
+
+
+def _prepare_onboarding(eth_accounts: List[Tuple[str, str]], paradex_config: dict) -> List[dict]:
+    """Paradex account, public key and signed onboarding message of every Ethereum account."""
+    prefix, domain_hash, message_hash = _onboarding_hash_parts(
+        int_from_bytes(paradex_config["starknet_chain_id"].encode())
+    )
+    accounts = paradex_accounts(eth_accounts, paradex_config)
+    for account in accounts:
+        private_key = int(account["paradex_account_private_key"], 16)
+        msg_hash = compute_hash_on_elements(
+            [prefix, domain_hash, int(account["paradex_account"], 16), message_hash]
+        )
+        account["public_key"] = hex(private_to_stark_key(private_key))
+        account["signature"] = flatten_signature(
+            [str(v) for v in message_signature(msg_hash, private_key)]
+        )
+    return accounts
+
+
+def _onboarding_config(paradex_config: dict) -> dict:
+    return {
+        key: paradex_config[key]
+        for key in (
+            "starknet_chain_id",
+            "l1_chain_id",
+            "paraclear_account_proxy_hash",
+            "paraclear_account_hash",
+        )
+    }
+
+
+async def _post_onboarding(
+    session: aiohttp.ClientSession, paradex_http_url: str, account: dict
+) -> Tuple[int, str]:
+    headers = {
+        "PARADEX-ETHEREUM-ACCOUNT": account["ethereum_account"],
+        "PARADEX-STARKNET-ACCOUNT": account["paradex_account"],
+        "PARADEX-STARKNET-SIGNATURE": account["signature"],
+    }
+    body = {"public_key": account["public_key"]}
+    async with get_rate_limiter().request(
+        session,
+        "POST",
+        paradex_http_url + "/onboarding",
+        EndpointClass.PRIVATE,
+        Priority.WRITE,
+        headers=headers,
+        json=body,
+    ) as response:
+        return response.status, await response.text()
+
+
+async def onboard_accounts(
+    eth_accounts: Iterable[Tuple[str, str]],
+    paradex_http_urls: Iterable[str],
+    status: OnboardingStatus,
+    processes: int = 0,
+    executor: Optional[Executor] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict:
+    """
+    Onboards every (Ethereum address, private key hex) on every Paradex network.
+    Returns one result per account and network, with totals. Successes are
+    recorded in `status`, which is saved before returning.
+    """
+    eth_accounts = list(eth_accounts)
+    urls = list(paradex_http_urls)
+    started = time.perf_counter()
+    configs = await asyncio.gather(*[get_paradex_config(url) for url in urls])
+
+    results: List[Dict] = []
+    pending: Dict[str, List[Tuple[str, str]]] = {}
+    for url in urls:
+        network = network_name(url)
+        pending[url] = []
+        for eth_address, eth_private_key in eth_accounts:
+            if status.is_onboarded(network, eth_address):
+                results.append(
+                    {"network": network, "ethereum_account": eth_address, "skipped": True}
+                )
+            else:
+                pending[url].append((eth_address, eth_private_key))
+
+    # Every network's derivation is queued on the pool before any of them is awaited
+    loop = asyncio.get_running_loop()
+    derivations = [
+        loop.run_in_executor(
+            None,
+            functools.partial(
+                map_chunks,
+                _prepare_onboarding,
+                pending[url],
+                processes,
+                _onboarding_config(config),
+                executor=executor,
+            ),
+        )
+        for url, config in zip(urls, configs)
+    ]
+    prepared = await asyncio.gather(*derivations)
+    derived_at = time.perf_counter()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def onboard(session: aiohttp.ClientSession, url: str, account: dict) -> Dict:
+        network = network_name(url)
+        result = {
+            "network": network,
+            "ethereum_account": account["ethereum_account"],
+            "paradex_account": account["paradex_account"],
+        }
+        async with semaphore:
+            try:
+                status_code, text = await _post_onboarding(session, url, account)
+            except Exception as e:
+                logging.error(f"Onboarding {account['paradex_account']} on {network}: {e}")
+                return {**result, "success": False, "error": str(e)}
+        if status_code != 200:
+            logging.error(f"Onboarding {result['paradex_account']} on {network}: {text}")
+            return {**result, "success": False, "error": f"HTTP {status_code}", "details": text}
+        status.record(network, account["ethereum_account"], account["paradex_account"])
+        return {**result, "success": True}
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            results.extend(
+                await asyncio.gather(
+                    *[
+                        onboard(session, url, account)
+                        for url, accounts in zip(urls, prepared)
+                        for account in accounts
+                    ]
+                )
+            )
+    finally:
+        status.save()
+
+    sent = [r for r in results if not r.get("skipped")]
+    return {
+        "success": all(r["success"] for r in sent),
+        "networks": [network_name(url) for url in urls],
+        "accounts": len(eth_accounts),
+        "onboarded": sum(1 for r in sent if r["success"]),
+        "skipped": len(results) - len(sent),
+        "failed": sum(1 for r in sent if not r["success"]),
+        "derive_s": round(derived_at - started, 3),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
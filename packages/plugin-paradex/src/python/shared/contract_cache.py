@@ -0,0 +1,307 @@
+"""
+Description:
+    On-disk cache of resolved Starknet contracts for the on-chain flows.
+    `Contract.from_address` walks every proxy check with several RPCs and
+    downloads whole contract classes each time. Here the proxy check that
+    matched, the implementation and its class hash are recorded per
+    address, and the ABI per implementation class hash:
+
+        <root>/addresses/<address>.json
+        <root>/abis/<class hash>.json
+
+    A cached entry is validated with one round trip (class hash of the
+    address and current implementation read in parallel) before use, and
+    is trusted without any RPC for CONTRACT_CACHE_TTL seconds afterwards.
+
+    Like `ContractAbiResolver`, a single level of proxy is resolved: an
+    implementation that is itself a proxy is used with its own ABI.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from starknet_py.constants import (
+    RPC_CLASS_HASH_NOT_FOUND_ERROR,
+    RPC_CONTRACT_ERROR,
+    RPC_CONTRACT_NOT_FOUND_ERROR,
+    RPC_INVALID_MESSAGE_SELECTOR_ERROR,
+)
+from starknet_py.contract import Contract
+from starknet_py.hash.selector import get_selector_from_name
+from starknet_py.hash.storage import get_storage_var_address
+from starknet_py.net.account.base_account import BaseAccount
+from starknet_py.net.client import Client
+from starknet_py.net.client_errors import ClientError, ContractNotFoundError
+from starknet_py.net.client_models import Call, SierraContractClass
+from starknet_py.proxy.contract_abi_resolver import ProxyConfig
+
+from .cache import SingleFlight
+from .starknet_utils import get_proxy_config
+from .trade_store import DEFAULT_DATA_DIR
+
+DEFAULT_CACHE_DIR = os.path.join(DEFAULT_DATA_DIR, "contracts")
+# Seconds during which a validated entry is used without any RPC
+VALIDATION_TTL = float(os.getenv("CONTRACT_CACHE_TTL", "60"))
+
+CLASS_HASH = "class_hash"
+ADDRESS = "address"
+
+# Errors meaning that a proxy check does not apply, as in ContractAbiResolver
+_NOT_FOUND_CODES = (
+    RPC_CLASS_HASH_NOT_FOUND_ERROR,
+    RPC_CONTRACT_NOT_FOUND_ERROR,
+    RPC_CONTRACT_ERROR,
+    RPC_INVALID_MESSAGE_SELECTOR_ERROR,
+)
+_NOT_FOUND_MESSAGE = re.compile(
+    r"(Entry point ((0x[0-9a-f]+)|(EntryPointSelector\(StarkFelt\(\"0x[0-9a-f]+)\"\)\))"
+    r" not found in contract)|(is not declared)|(is not deployed)",
+    re.IGNORECASE,
+)
+
+
+def _is_not_found(err: ClientError) -> bool:
+    return (
+        isinstance(err, ContractNotFoundError)
+        or err.code in _NOT_FOUND_CODES
+        or bool(_NOT_FOUND_MESSAGE.search(err.message or ""))
+    )
+
+
+def _write_json(path: str, value) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(value, f)
+    os.replace(path + ".tmp", path)
+
+
+def _client(provider: Union[BaseAccount, Client]) -> Client:
+    return provider.client if isinstance(provider, BaseAccount) else provider
+
+
+async def _call_first(client: Client, address: int, function: str) -> int:
+    call = Call(to_addr=address, selector=get_selector_from_name(function), calldata=[])
+    (result,) = await client.call_contract(call=call)
+    return result
+
+
+async def _read_implementation(client: Client, address: int, entry: Dict) -> int:
+    """Reads the current implementation the way the recorded proxy check does, in one RPC."""
+    proxy_check = entry["proxy_check"]
+    if proxy_check == "StarkwareETHProxyCheck":
+        return await _call_first(client, address, "implementation")
+    if proxy_check == "ArgentProxyCheck":
+        return await _call_first(client, address, "get_implementation")
+    if proxy_check == "OpenZeppelinProxyCheck":
+        key = (
+            "Proxy_implementation_hash"
+            if entry["implementation_kind"] == CLASS_HASH
+            else "Proxy_implementation_address"
+        )
+        return await client.get_storage_at(
+            contract_address=address, key=get_storage_var_address(key), block_hash="latest"
+        )
+    raise ValueError(f"Unknown proxy check {proxy_check}")
+
+
+class ContractCache:
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, validation_ttl: float = VALIDATION_TTL):
+        self.root = root
+        self.validation_ttl = validation_ttl
+        self._abis: Dict[str, List[Dict]] = {}
+        # address -> (validated at, entry)
+        self._validated: Dict[str, Tuple[float, Dict]] = {}
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, address: str) -> str:
+        return os.path.join(self.root, "addresses", f"{address}.json")
+
+    def _abi_path(self, class_hash: str) -> str:
+        return os.path.join(self.root, "abis", f"{class_hash}.json")
+
+    def _load_entry(self, address: str) -> Optional[Dict]:
+        path = self._entry_path(address)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            entry = json.load(f)
+        if not os.path.exists(self._abi_path(entry["implementation_class_hash"])):
+            return None
+        return entry
+
+    def _load_abi(self, class_hash: str) -> List[Dict]:
+        abi = self._abis.get(class_hash)
+        if abi is None:
+            with open(self._abi_path(class_hash), "r") as f:
+                abi = json.load(f)
+            self._abis[class_hash] = abi
+        return abi
+
+    async def get_contract(
+        self,
+        address: Union[str, int],
+        provider: Union[BaseAccount, Client],
+        proxy_config: Optional[ProxyConfig] = None,
+    ) -> Contract:
+        """Drop-in replacement for `Contract.from_address(address, provider, proxy_config)`."""
+        address_int = int(address, 16) if isinstance(address, str) else address
+        key = hex(address_int)
+        client = _client(provider)
+        entry = await self._flight.do(
+            key, lambda: self._resolve(key, address_int, client, proxy_config)
+        )
+        return Contract(
+            address=address_int,
+            abi=self._load_abi(entry["implementation_class_hash"]),
+            provider=provider,
+            cairo_version=entry["cairo_version"],
+        )
+
+    async def _resolve(
+        self, key: str, address: int, client: Client, proxy_config: Optional[ProxyConfig]
+    ) -> Dict:
+        validated = self._validated.get(key)
+        if validated is not None and time.monotonic() - validated[0] < self.validation_ttl:
+            self.hits += 1
+            return validated[1]
+
+        entry = validated[1] if validated is not None else self._load_entry(key)
+        if entry is not None and await self._is_valid(address, client, entry):
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = await self._discover(key, address, client, proxy_config or get_proxy_config())
+            if not entry["persisted"]:
+                # Discovered again on next use, it may be a proxy whose class is not available yet
+                return entry
+        self._validated[key] = (time.monotonic(), entry)
+        return entry
+
+    async def _is_valid(self, address: int, client: Client, entry: Dict) -> bool:
+        checks = [client.get_class_hash_at(contract_address=address)]
+        expected = [int(entry["class_hash"], 16)]
+        if entry["proxy_check"] is not None:
+            checks.append(_read_implementation(client, address, entry))
+            expected.append(int(entry["implementation"], 16))
+            if entry["implementation_kind"] == ADDRESS:
+                checks.append(
+                    client.get_class_hash_at(contract_address=int(entry["implementation"], 16))
+                )
+                expected.append(int(entry["implementation_class_hash"], 16))
+        try:
+            current = await asyncio.gather(*checks)
+        except ClientError as err:
+            logging.info(f"Contract cache entry of {hex(address)} could not be validated: {err}")
+            return False
+        if list(current) != expected:
+            logging.info(f"Contract at {hex(address)} was upgraded, resolving it again")
+            return False
+        return True
+
+    async def _discover(
+        self, key: str, address: int, client: Client, proxy_config: ProxyConfig
+    ) -> Dict:
+        """
+        Walks the proxy checks like `ContractAbiResolver` and records which one
+        matched. Only errors saying that a check does not apply (entry point,
+        contract or class not found) move on to the next check, others are
+        raised. An implementation was found but its class could not be read:
+        the contract's own ABI is used, but the entry is not written to disk.
+        """
+        logging.info(f"Resolving contract {key}")
+        class_hash = await client.get_class_hash_at(contract_address=address)
+        entry = {
+            "address": key,
+            "class_hash": hex(class_hash),
+            "proxy_check": None,
+            "implementation_kind": None,
+            "implementation": None,
+        }
+        contract_class = None
+        unresolved = False
+        for proxy_check in proxy_config.get("proxy_checks", []):
+            for kind, implementation_of in (
+                (CLASS_HASH, proxy_check.implementation_hash),
+                (ADDRESS, proxy_check.implementation_address),
+            ):
+                try:
+                    implementation = await implementation_of(address=address, client=client)
+                except ClientError as err:
+                    if not _is_not_found(err):
+                        raise
+                    continue
+                if implementation is None:
+                    continue
+                try:
+                    implementation_class_hash = (
+                        implementation
+                        if kind == CLASS_HASH
+                        else await client.get_class_hash_at(contract_address=implementation)
+                    )
+                    contract_class = await client.get_class_by_hash(implementation_class_hash)
+                except ClientError as err:
+                    if not _is_not_found(err):
+                        raise
+                    unresolved = True
+                    continue
+                if contract_class.abi is None:
+                    contract_class = None
+                    continue
+                entry.update(
+                    proxy_check=type(proxy_check).__name__,
+                    implementation_kind=kind,
+                    implementation=hex(implementation),
+                )
+                break
+            if contract_class is not None:
+                break
+
+        if contract_class is None:
+            # Not a proxy, the ABI is the one of the contract itself
+            implementation_class_hash = class_hash
+            contract_class = await client.get_class_by_hash(class_hash)
+
+        is_sierra = isinstance(contract_class, SierraContractClass)
+        abi = json.loads(contract_class.abi) if is_sierra else contract_class.abi
+        entry["implementation_class_hash"] = hex(implementation_class_hash)
+        entry["cairo_version"] = 1 if is_sierra else 0
+        entry["persisted"] = not (unresolved and entry["proxy_check"] is None)
+
+        self._abis[entry["implementation_class_hash"]] = abi
+        if entry["persisted"]:
+            _write_json(self._abi_path(entry["implementation_class_hash"]), abi)
+            _write_json(self._entry_path(key), entry)
+        else:
+            logging.warning(f"Proxy implementation of {key} could not be read, not caching it")
+        return entry
+
+    def invalidate(self, address: Optional[Union[str, int]] = None) -> None:
+        if address is None:
+            self._validated.clear()
+            return
+        address = int(address, 16) if isinstance(address, str) else address
+        self._validated.pop(hex(address), None)
+
+
+_contract_cache: Optional[ContractCache] = None
+
+
+def get_contract_cache() -> ContractCache:
+    global _contract_cache
+    if _contract_cache is None:
+        _contract_cache = ContractCache()
+    return _contract_cache
+
+
+async def contract_from_address(
+    address: Union[str, int],
+    provider: Union[BaseAccount, Client],
+    proxy_config: Optional[ProxyConfig] = None,
+) -> Contract:
+    return await get_contract_cache().get_contract(address, provider, proxy_config)
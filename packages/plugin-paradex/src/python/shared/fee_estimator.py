@@ -0,0 +1,75 @@
+"""
+Description:
+    Max fee estimation for Starknet invokes, replacing random or hard-coded
+    max fees. Fees are estimated by the node and multiplied by a safety
+    margin (STARKNET_FEE_MULTIPLIER, default 1.5). Estimates are cached for
+    STARKNET_FEE_CACHE_TTL seconds (default 60) per transaction shape, the
+    (contract, entrypoint, calldata length) of each of its calls, so repeated
+    operations only pay for the extra RPC once. A sequence of invokes is
+    estimated in a single `estimate_fee` request.
+"""
+import logging
+import os
+from typing import Hashable, List, Optional, Tuple
+
+from starknet_py.net.client_models import Call, Calls
+
+from helpers.account import Account
+
+from .cache import SingleFlight, TTLCache
+
+FEE_MULTIPLIER = float(os.getenv("STARKNET_FEE_MULTIPLIER", "1.5"))
+FEE_CACHE_TTL = float(os.getenv("STARKNET_FEE_CACHE_TTL", "60"))
+
+
+def fee_key(calls: Calls) -> Tuple[Tuple[int, int, int], ...]:
+    """Shape of an invoke: the fee depends on what is called, not on the argument values."""
+    if isinstance(calls, Call):
+        calls = [calls]
+    return tuple((call.to_addr, call.selector, len(call.calldata)) for call in calls)
+
+
+class FeeEstimator:
+    def __init__(self, multiplier: float = FEE_MULTIPLIER, ttl: float = FEE_CACHE_TTL):
+        self.multiplier = multiplier
+        self.cache = TTLCache(ttl, maxsize=1024)
+        self._flight = SingleFlight()
+        self.estimates = 0
+
+    async def max_fee(self, account: Account, calls: Calls) -> int:
+        (fee,) = await self.max_fees(account, [calls])
+        return fee
+
+    async def max_fees(self, account: Account, sequence: List[Calls]) -> List[int]:
+        """Max fees of consecutive invokes of `account`, in order."""
+        keys = [fee_key(calls) for calls in sequence]
+        fees = [self.cache.get(key) for key in keys]
+        if all(fee is not None for fee in fees):
+            return fees
+
+        flight_key: Hashable = (account.address, tuple(keys))
+        return await self._flight.do(flight_key, lambda: self._estimate(account, sequence, keys))
+
+    async def _estimate(self, account: Account, sequence: List[Calls], keys: List) -> List[int]:
+        self.estimates += 1
+        estimates = await account.estimate_fee_v1(sequence)
+        fees = [int(estimate.overall_fee * self.multiplier) for estimate in estimates]
+        for key, fee in zip(keys, fees):
+            # The same shape may appear several times in a sequence
+            self.cache.set(key, max(fee, self.cache.get(key, 0)))
+        logging.info(f"Estimated max fees: {fees}")
+        return fees
+
+    def invalidate(self, calls: Calls) -> None:
+        """Drops a cached estimate, e.g. after a transaction ran out of fee."""
+        self.cache.pop(fee_key(calls))
+
+
+_fee_estimator: Optional[FeeEstimator] = None
+
+
+def get_fee_estimator() -> FeeEstimator:
+    global _fee_estimator
+    if _fee_estimator is None:
+        _fee_estimator = FeeEstimator()
+    return _fee_estimator
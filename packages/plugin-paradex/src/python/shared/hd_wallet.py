@@ -0,0 +1,101 @@
+"""
+Description:
+    BIP-32 derivation of many Ethereum accounts from one mnemonic.
+    `Account.from_mnemonic` re-runs the BIP-39 seed stretching (2048 rounds
+    of HMAC-SHA512) and the whole derivation path for every account. Here
+    the seed is computed once per mnemonic and every intermediate node is
+    cached, so deriving account `i` of `m/44'/60'/0'/0` only costs the last
+    (non-hardened) step, with the parent public key computed once.
+"""
+import functools
+import hashlib
+import hmac
+from typing import Dict, Iterable, List, Tuple
+
+from eth_account.hdaccount import seed_from_mnemonic
+from eth_keys import keys
+from eth_keys.constants import SECPK1_N
+
+DEFAULT_BASE_PATH = "m/44'/60'/0'/0"
+HARDENED = 2**31
+
+# (private key, chain code)
+ExtendedKey = Tuple[bytes, bytes]
+
+
+def _hmac_sha512(key: bytes, data: bytes) -> bytes:
+    return hmac.new(key, data, hashlib.sha512).digest()
+
+
+def _parse_index(node: str) -> int:
+    if node.endswith("'"):
+        return int(node[:-1]) + HARDENED
+    return int(node)
+
+
+class HDWallet:
+    def __init__(self, seed: bytes):
+        self.seed = seed
+        master = _hmac_sha512(b"Bitcoin seed", seed)
+        self._nodes: Dict[str, ExtendedKey] = {"m": (master[:32], master[32:])}
+        # Compressed public keys of the parents of non-hardened children
+        self._public_keys: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_mnemonic(cls, mnemonic: str, passphrase: str = "") -> "HDWallet":
+        return cls(seed_from_mnemonic(mnemonic, passphrase))
+
+    def _public_key(self, path: str) -> bytes:
+        public_key = self._public_keys.get(path)
+        if public_key is None:
+            private_key = keys.PrivateKey(self.node(path)[0])
+            public_key = private_key.public_key.to_compressed_bytes()
+            self._public_keys[path] = public_key
+        return public_key
+
+    def _child(self, parent_path: str, index: int) -> ExtendedKey:
+        parent_key, chain_code = self.node(parent_path)
+        while True:
+            if index >= HARDENED:
+                data = b"\x00" + parent_key
+            else:
+                data = self._public_key(parent_path)
+            digest = _hmac_sha512(chain_code, data + index.to_bytes(4, "big"))
+            tweak = int.from_bytes(digest[:32], "big")
+            child_key = (tweak + int.from_bytes(parent_key, "big")) % SECPK1_N
+            # Invalid keys (probability below 2**-127) move on to the next index
+            if tweak < SECPK1_N and child_key != 0:
+                return child_key.to_bytes(32, "big"), digest[32:]
+            index += 1
+
+    def node(self, path: str) -> ExtendedKey:
+        """Extended private key at `path`, e.g. m/44'/60'/0'/0, cached with all its parents."""
+        path = path.rstrip("/")
+        extended_key = self._nodes.get(path)
+        if extended_key is None:
+            parent_path, _, node = path.rpartition("/")
+            extended_key = self._child(parent_path, _parse_index(node))
+            self._nodes[path] = extended_key
+        return extended_key
+
+    def private_key(self, index: int, base_path: str = DEFAULT_BASE_PATH) -> bytes:
+        # Leaves are not cached, only their parent is reused
+        return self._child(base_path.rstrip("/"), int(index))[0]
+
+    def accounts(
+        self, indices: Iterable[int], base_path: str = DEFAULT_BASE_PATH
+    ) -> List[Tuple[str, str]]:
+        """(checksum address, private key hex) of every index under `base_path`."""
+        accounts = []
+        for index in indices:
+            private_key = keys.PrivateKey(self.private_key(index, base_path))
+            accounts.append(
+                (private_key.public_key.to_checksum_address(), "0x" + private_key.to_bytes().hex())
+            )
+        return accounts
+
+
+@functools.lru_cache(maxsize=16)
+def get_hd_wallet(mnemonic: str, passphrase: str = "") -> HDWallet:
+    """One wallet, so one seed computation, per mnemonic and process."""
+    return HDWallet.from_mnemonic(mnemonic, passphrase)
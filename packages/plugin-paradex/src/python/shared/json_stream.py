@@ -0,0 +1,155 @@
+"""
+Description:
+    Incremental parsing of Paradex list responses.
+    The body is decoded chunk by chunk as it arrives (gzip / brotli are
+    decompressed on the fly by aiohttp) and the records of the `results`
+    array are materialized one at a time, so the raw body is never held
+    in memory next to the decoded records.
+"""
+import codecs
+import json
+from typing import Dict, List, Optional
+
+import aiohttp
+from aiohttp.compression_utils import HAS_BROTLI
+
+# Sent explicitly so that list endpoints are served compressed
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = set("0123456789.eE+-")
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _ELEMENT, _ELEMENT_SEP, _MEMBER_SEP, _DONE, _RAW = range(9)
+
+
+class JsonResultsParser:
+    """
+    Push parser for a top-level JSON object holding a list under `key`.
+    `feed` returns the list elements completed by a chunk, the other
+    members of the object are available from `close`. Bodies that are
+    not a JSON object are buffered and decoded whole.
+    """
+
+    def __init__(self, key: str = "results"):
+        self.key = key
+        self.members: Dict = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key: Optional[str] = None
+
+    def _skip_whitespace(self) -> bool:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._pos < len(self._buffer)
+
+    def _decode_value(self):
+        """Decodes the value at the cursor, or returns (None, False) when it is incomplete."""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            return None, False
+        # A number cut by the end of the chunk may continue in the next one
+        if end == len(self._buffer) or (
+            isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and self._buffer[end] in _NUMBER_CHARS
+        ):
+            return None, False
+        self._pos = end
+        return value, True
+
+    def _expect(self, char: str) -> None:
+        if self._buffer[self._pos] != char:
+            raise ValueError(
+                f"Unexpected {self._buffer[self._pos]!r} at {self._pos}, expected {char!r}"
+            )
+        self._pos += 1
+
+    def feed(self, chunk: bytes) -> List:
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        elements = []
+        while self._state != _RAW and self._skip_whitespace():
+            char = self._buffer[self._pos]
+            if self._state == _START:
+                if char == "{":
+                    self._pos += 1
+                    self._state = _KEY
+                else:
+                    self._state = _RAW
+            elif self._state == _KEY:
+                if char == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                key, complete = self._decode_value()
+                if not complete:
+                    break
+                self._current_key = key
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(":")
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if self._current_key == self.key and char == "[":
+                    self._pos += 1
+                    self.members[self.key] = None
+                    self._state = _ELEMENT
+                    continue
+                value, complete = self._decode_value()
+                if not complete:
+                    break
+                self.members[self._current_key] = value
+                self._state = _MEMBER_SEP
+            elif self._state == _ELEMENT:
+                if char == "]":
+                    self._pos += 1
+                    self._state = _MEMBER_SEP
+                    continue
+                element, complete = self._decode_value()
+                if not complete:
+                    break
+                elements.append(element)
+                self._state = _ELEMENT_SEP
+            elif self._state == _ELEMENT_SEP:
+                if char not in ",]":
+                    raise ValueError(f"Unexpected {char!r} in {self.key} array")
+                self._pos += 1
+                self._state = _ELEMENT if char == "," else _MEMBER_SEP
+            elif self._state == _MEMBER_SEP:
+                if char not in ",}":
+                    raise ValueError(f"Unexpected {char!r} after member {self._current_key}")
+                self._pos += 1
+                self._state = _KEY if char == "," else _DONE
+            else:
+                raise ValueError(f"Unexpected {char!r} after the end of the JSON object")
+        return elements
+
+    def close(self) -> Dict:
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        if self._state == _RAW:
+            return json.loads(self._buffer)
+        if self._state != _DONE:
+            raise ValueError("Incomplete JSON body")
+        return self.members
+
+
+async def read_json(response: aiohttp.ClientResponse, key: str = "results") -> Dict:
+    """
+    Drop-in replacement for `response.json()` that decodes the `key` array
+    record by record as the body streams in.
+    """
+    parser = JsonResultsParser(key)
+    results = []
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        results.extend(parser.feed(chunk))
+    body = parser.close()
+    if isinstance(body, dict) and key in body:
+        body[key] = results
+    return body
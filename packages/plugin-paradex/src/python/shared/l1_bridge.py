@@ -0,0 +1,264 @@
+"""
+Description:
+    L1 side of USDC withdrawals: claims withdrawals from the L1 bridge once
+    their L2 transaction is accepted on L1.
+    The bridge ABI is loaded once, relative to this package. Nonces are
+    handed out locally, so any number of claims are signed and sent in one
+    JSON-RPC batch, after one batched gas estimation. Gas prices come from
+    `eth_feeHistory` and are reused for GAS_PRICE_TTL seconds. Pending
+    receipts are polled in one batch per tick, together with the account
+    nonce so that replaced transactions are noticed, up to RECEIPT_TIMEOUT.
+    Blocking web3 calls run in the default executor.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from eth_account.signers.local import LocalAccount
+from hexbytes import HexBytes
+from starknet_py.net.client import Client
+from web3 import Web3
+
+from helpers.nonce_manager import NonceManager
+
+from .cache import TTLCache
+from .rpc_batch import batch_request
+from .tx_watcher import get_tx_watcher
+
+L1_BRIDGE_ABI_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "abis", "l1_bridge_abi.json"
+)
+# About one L1 block
+GAS_PRICE_TTL = 12.0
+FEE_HISTORY_BLOCKS = 10
+PRIORITY_FEE_PERCENTILE = 50
+# Headroom over the estimated gas of each claim
+GAS_LIMIT_MARGIN = 1.2
+RECEIPT_POLL_INTERVAL = 6.0
+RECEIPT_TIMEOUT = 1800.0
+
+
+@functools.lru_cache(maxsize=None)
+def load_l1_bridge_abi() -> List[Dict]:
+    with open(L1_BRIDGE_ABI_PATH, "r") as f:
+        return json.load(f)
+
+
+class GasPricer:
+    """EIP-1559 fees from the recent fee history, cached for `ttl` seconds."""
+
+    def __init__(self, w3: Web3, ttl: float = GAS_PRICE_TTL):
+        self.w3 = w3
+        self._cache = TTLCache(ttl)
+
+    async def fees(self) -> Dict[str, int]:
+        fees = self._cache.get("fees")
+        if fees is None:
+            history = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.w3.eth.fee_history,
+                FEE_HISTORY_BLOCKS,
+                "latest",
+                [PRIORITY_FEE_PERCENTILE],
+            )
+            # The last base fee is the one of the next block
+            next_base_fee = history["baseFeePerGas"][-1]
+            rewards = [reward[0] for reward in history.get("reward") or [] if reward]
+            priority_fee = max(int(statistics.median(rewards)) if rewards else 0, 1)
+            # Stays valid through several blocks of base fee increases
+            fees = {
+                "maxFeePerGas": 2 * next_base_fee + priority_fee,
+                "maxPriorityFeePerGas": priority_fee,
+            }
+            logging.info(f"L1 gas fees: {fees}")
+            self._cache.set("fees", fees)
+        return fees
+
+
+def _rpc_url(w3: Web3) -> Optional[str]:
+    return getattr(w3.provider, "endpoint_uri", None) or os.getenv("WEB3_PROVIDER_URI")
+
+
+class L1Bridge:
+    def __init__(
+        self, w3: Web3, eth_account: LocalAccount, config: Dict, rpc_url: Optional[str] = None
+    ):
+        self.w3 = w3
+        self.eth_account = eth_account
+        token = config["bridged_tokens"][0]
+        self.decimals = token["decimals"]
+        self.contract = w3.eth.contract(
+            address=token["l1_bridge_address"], abi=load_l1_bridge_abi()
+        )
+        self.rpc_url = rpc_url or _rpc_url(w3)
+        if self.rpc_url is None:
+            raise ValueError("No L1 RPC URL, set WEB3_PROVIDER_URI")
+        self.gas = GasPricer(w3)
+        self.nonces = NonceManager(self._fetch_nonce)
+        self._chain_id: Optional[int] = None
+
+    async def _fetch_nonce(self) -> int:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.w3.eth.get_transaction_count, self.eth_account.address, "pending"
+        )
+
+    async def chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self.w3.eth.chain_id
+            )
+        return self._chain_id
+
+    async def claim(self, withdrawals: List[Tuple[str, int]]) -> List:
+        """
+        Sends one bridge `withdraw(amount, recipient)` per (recipient, token amount).
+        Returns the transaction hash of each claim, or the error that prevented sending it.
+        """
+        if not withdrawals:
+            return []
+        sender = self.eth_account.address
+        data = [
+            self.contract.encodeABI(
+                fn_name="withdraw", args=[amount, Web3.to_checksum_address(recipient)]
+            )
+            for recipient, amount in withdrawals
+        ]
+        # A claim that cannot be estimated would revert, e.g. not matured yet
+        estimates = await batch_request(
+            self.rpc_url,
+            [
+                ("eth_estimateGas", [{"from": sender, "to": self.contract.address, "data": d}])
+                for d in data
+            ],
+        )
+        fees = await self.gas.fees()
+        chain_id = await self.chain_id()
+
+        results: List = [None] * len(withdrawals)
+        raw_transactions = []
+        for i, (estimate, d) in enumerate(zip(estimates, data)):
+            if isinstance(estimate, Exception):
+                logging.error(f"L1 claim {withdrawals[i]} cannot be sent: {estimate}")
+                results[i] = estimate
+                continue
+            nonce = await self.nonces.acquire()
+            signed = self.eth_account.sign_transaction(
+                {
+                    "type": 2,
+                    "chainId": chain_id,
+                    "nonce": nonce,
+                    "to": self.contract.address,
+                    "data": d,
+                    "value": 0,
+                    "gas": int(int(estimate, 16) * GAS_LIMIT_MARGIN),
+                    **fees,
+                }
+            )
+            raw_transactions.append((i, nonce, signed))
+
+        sent = await batch_request(
+            self.rpc_url,
+            [
+                ("eth_sendRawTransaction", [HexBytes(signed.rawTransaction).hex()])
+                for _, _, signed in raw_transactions
+            ],
+        )
+        # Released last nonce first, so that a failed tail is simply reused, while
+        # a failed nonce below a sent one leaves a gap and resyncs
+        later_sent = False
+        for (i, nonce, _), result in reversed(list(zip(raw_transactions, sent))):
+            if isinstance(result, Exception):
+                logging.error(f"L1 claim {withdrawals[i]} rejected: {result}")
+                if later_sent:
+                    self.nonces.discard(nonce)
+                else:
+                    self.nonces.release(nonce, result)
+                results[i] = result
+            else:
+                self.nonces.sent(nonce, int(result, 16))
+                later_sent = True
+                results[i] = result
+                logging.info(f"L1 withdraw tx hash: {result}")
+        return results
+
+    async def wait_for_receipts(
+        self,
+        tx_hashes: List[str],
+        poll_interval: float = RECEIPT_POLL_INTERVAL,
+        timeout: float = RECEIPT_TIMEOUT,
+    ) -> Dict[str, Dict]:
+        """
+        Receipts of the given transactions, polled together in one batch per tick.
+        A transaction whose nonce was used by another one, or still pending after
+        `timeout` seconds, is left out.
+        """
+        receipts: Dict[str, Dict] = {}
+        nonces = {h: self.nonces.nonce_of(int(h, 16)) for h in tx_hashes}
+        pending = list(tx_hashes)
+        deadline = time.monotonic() + timeout
+        while pending:
+            # The nonce is read first: a receipt still missing after it moved past
+            # the transaction's nonce means that another transaction took its place
+            results = await batch_request(
+                self.rpc_url,
+                [("eth_getTransactionCount", [self.eth_account.address, "latest"])]
+                + [("eth_getTransactionReceipt", [h]) for h in pending],
+            )
+            chain_nonce = results[0] if isinstance(results[0], str) else None
+            dropped = []
+            for tx_hash, receipt in zip(pending, results[1:]):
+                if isinstance(receipt, dict):
+                    receipts[tx_hash] = receipt
+                    if int(receipt.get("status", "0x1"), 16) == 0:
+                        logging.error(f"L1 transaction {tx_hash} reverted")
+                elif (
+                    chain_nonce is not None
+                    and nonces[tx_hash] is not None
+                    and nonces[tx_hash] < int(chain_nonce, 16)
+                ):
+                    logging.error(f"L1 transaction {tx_hash} was replaced or dropped")
+                    dropped.append(tx_hash)
+            pending = [h for h in pending if h not in receipts and h not in dropped]
+            if pending and time.monotonic() >= deadline:
+                logging.error(f"L1 transactions {pending} still pending after {timeout}s")
+                break
+            if pending:
+                await asyncio.sleep(poll_interval)
+        done = [nonces[h] for h in tx_hashes if h not in pending and nonces[h] is not None]
+        if done:
+            self.nonces.confirmed(max(done))
+        return receipts
+
+
+async def claim_when_matured(
+    bridge: L1Bridge, client: Client, withdrawals: List[Tuple[str, str, int]]
+) -> Dict[str, object]:
+    """
+    Claims (L2 transaction hash, L1 recipient, token amount) withdrawals on L1.
+    Every L2 transaction is tracked by the shared receipt watcher until it is
+    accepted on L1, and the withdrawals that matured since the last send are
+    claimed together. Returns the L1 transaction hash (or error) per L2 hash.
+    """
+    watcher = get_tx_watcher(client)
+    waiting = {
+        watcher.watch(withdrawal[0], until_l1=True).l1: withdrawal for withdrawal in withdrawals
+    }
+    claimed: Dict[str, object] = {}
+    while waiting:
+        done, _ = await asyncio.wait(waiting.keys(), return_when=asyncio.FIRST_COMPLETED)
+        matured = []
+        for future in done:
+            l2_hash, recipient, amount = waiting.pop(future)
+            if future.exception() is not None:
+                claimed[l2_hash] = future.exception()
+            else:
+                matured.append((l2_hash, recipient, amount))
+        results = await bridge.claim([(r, a) for _, r, a in matured])
+        for (l2_hash, _, _), result in zip(matured, results):
+            claimed[l2_hash] = result
+    return claimed
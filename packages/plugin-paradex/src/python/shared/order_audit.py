@@ -0,0 +1,243 @@
+"""
+Description:
+    Batch audit of order signatures.
+    Every order's message hash is recomputed from its stored fields (as
+    returned by [GET] /orders and /orders-history) and its signature is
+    checked against the public key of the account that placed it. The
+    domain and type hashes are computed once per chain, so one order costs
+    its struct hash, its message hash and one signature verification.
+    Orders are streamed in batches, and the chunks of each batch are
+    verified across a process pool. Fills are matched to the verified
+    orders by order id.
+"""
+import functools
+import itertools
+import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import Executor
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from starknet_py.cairo.felt import encode_shortstring
+from starknet_py.constants import EC_ORDER
+
+from helpers.typed_data import TypedData
+from helpers.utils import compute_hash_on_elements, verify_message_signature
+
+from .api_client_utils import map_chunks, order_sign_message
+from .paradex_api_utils import Order, OrderSide, OrderType
+
+DEFAULT_BATCH_SIZE = 100_000
+DEFAULT_MAX_REPORTED = 1_000
+# What the workers need of each order, the rest is not sent to them
+AUDIT_FIELDS = (
+    "id",
+    "client_id",
+    "account",
+    "market",
+    "side",
+    "type",
+    "size",
+    "price",
+    "signature",
+    "signature_timestamp",
+)
+
+_CHAIN_SIDES = {side.value: int(side.chain_side()) for side in OrderSide}
+
+
+@functools.lru_cache(maxsize=None)
+def _encoded_shortstring(value: str) -> int:
+    return encode_shortstring(value)
+
+
+def _quantum(value) -> int:
+    # Same 8-decimal quantization as Order.chain_size and Order.chain_price
+    return int(Decimal(str(value)).scaleb(8))
+
+
+def parse_signature(signature) -> Tuple[int, int]:
+    """
+    (r, s) of a signature stored as '["r","s"]' or as a list, in decimal or hex.
+    Raises ValueError for values outside [1, EC_ORDER), which no signature has.
+    """
+    if isinstance(signature, str):
+        signature = json.loads(signature)
+    r, s = (int(v, 0) if isinstance(v, str) else int(v) for v in signature)
+    if not (0 < r < EC_ORDER and 0 < s < EC_ORDER):
+        raise ValueError("signature value out of range")
+    return r, s
+
+
+class OrderHasher:
+    """Message hashes of signed orders on one chain, without rebuilding the typed data."""
+
+    def __init__(self, chain_id: int):
+        order = Order(
+            market="", order_type=OrderType.Market, order_side=OrderSide.Buy, size=Decimal(0)
+        )
+        template = TypedData.from_dict(order_sign_message(chain_id, order))
+        self.chain_id = chain_id
+        self._prefix = encode_shortstring("StarkNet Message")
+        self._domain_hash = template.struct_hash("StarkNetDomain", template.domain)
+        self._type_hash = template.type_hash("Order")
+
+    def struct_hash(self, order: Dict) -> int:
+        # Fields in the order of the Order type of order_sign_message
+        price = 0 if order["type"] == OrderType.Market.value else _quantum(order["price"])
+        return compute_hash_on_elements(
+            [
+                self._type_hash,
+                int(order["signature_timestamp"]),
+                _encoded_shortstring(order["market"]),
+                _CHAIN_SIDES[order["side"]],
+                _encoded_shortstring(order["type"]),
+                _quantum(order["size"]),
+                price,
+            ]
+        )
+
+    def message_hash(self, order: Dict, account: int) -> int:
+        return compute_hash_on_elements(
+            [self._prefix, self._domain_hash, account, self.struct_hash(order)]
+        )
+
+
+@functools.lru_cache(maxsize=8)
+def get_order_hasher(chain_id: int) -> OrderHasher:
+    return OrderHasher(chain_id)
+
+
+def _mismatch(order: Dict, reason: str, detail: str = "") -> Dict:
+    mismatch = {
+        "id": order.get("id", ""),
+        "client_id": order.get("client_id", ""),
+        "account": order.get("account", ""),
+        "reason": reason,
+    }
+    if detail:
+        mismatch["detail"] = detail
+    return mismatch
+
+
+def _verify_orders(
+    orders: List[Dict], chain_id: int, public_keys: Dict[int, int], default_account: Optional[int]
+) -> List[Dict]:
+    """Mismatches among `orders`, each order verified against its account's public key."""
+    hasher = get_order_hasher(chain_id)
+    mismatches = []
+    for order in orders:
+        if not order.get("signature"):
+            mismatches.append(_mismatch(order, "missing_signature"))
+            continue
+        try:
+            account = int(order["account"], 16) if order.get("account") else default_account
+            public_key = public_keys.get(account)
+            if public_key is None:
+                mismatches.append(_mismatch(order, "unknown_account"))
+                continue
+            msg_hash = hasher.message_hash(order, account)
+            signature = parse_signature(order["signature"])
+        except (KeyError, ValueError, TypeError, ArithmeticError) as e:
+            mismatches.append(_mismatch(order, "malformed", f"{type(e).__name__}: {e}"))
+            continue
+        try:
+            valid = verify_message_signature(msg_hash, list(signature), public_key)
+        except (ValueError, ArithmeticError, AssertionError) as e:
+            # Backends reject some in-range values, e.g. s without a small inverse
+            mismatches.append(_mismatch(order, "invalid_signature", f"{type(e).__name__}: {e}"))
+            continue
+        if not valid:
+            mismatches.append(_mismatch(order, "invalid_signature"))
+    return mismatches
+
+
+def _batches(records: Iterable[Dict], size: int) -> Iterable[List[Dict]]:
+    iterator = iter(records)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def audit_orders(
+    orders: Iterable[Dict],
+    chain_id: int,
+    public_keys: Dict[str, str],
+    processes: int = 0,
+    executor: Optional[Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_reported: int = DEFAULT_MAX_REPORTED,
+    valid_ids: Optional[Set[str]] = None,
+) -> Dict:
+    """
+    Verifies the signature of every order against `public_keys` (account address ->
+    public key). Orders without an account field are attributed to the only
+    account, when there is one. Returns the counts, the throughput and the first
+    `max_reported` mismatches. The ids of the valid orders are added to `valid_ids`.
+    """
+    keys = {int(account, 16): int(key, 16) for account, key in public_keys.items()}
+    default_account = next(iter(keys)) if len(keys) == 1 else None
+
+    started = time.perf_counter()
+    checked = 0
+    reasons: Counter = Counter()
+    reported: List[Dict] = []
+    for batch in _batches(orders, batch_size):
+        batch = [{k: o[k] for k in AUDIT_FIELDS if k in o} for o in batch]
+        mismatches = map_chunks(
+            _verify_orders,
+            batch,
+            processes,
+            chain_id,
+            keys,
+            default_account,
+            executor=executor,
+        )
+        checked += len(batch)
+        failed_ids = set()
+        for mismatch in mismatches:
+            reasons[mismatch["reason"]] += 1
+            failed_ids.add(mismatch["id"])
+            if len(reported) < max_reported:
+                reported.append(mismatch)
+        if valid_ids is not None:
+            valid_ids.update(o["id"] for o in batch if o.get("id") and o["id"] not in failed_ids)
+        logging.info(f"Audited {checked} orders, {sum(reasons.values())} mismatches")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "orders": checked,
+        "valid": checked - sum(reasons.values()),
+        "mismatches": sum(reasons.values()),
+        "by_reason": dict(reasons),
+        "elapsed_s": round(elapsed, 3),
+        "orders_per_s": round(checked / elapsed) if elapsed > 0 else None,
+        "reported": reported,
+    }
+
+
+def audit_fills(
+    fills: Iterable[Dict], valid_order_ids: Set[str], max_reported: int = DEFAULT_MAX_REPORTED
+) -> Dict:
+    """Fills whose order is not among the orders with a valid signature."""
+    checked = 0
+    reported: List[Dict] = []
+    unmatched = 0
+    for fill in fills:
+        checked += 1
+        if fill.get("order_id") not in valid_order_ids:
+            unmatched += 1
+            if len(reported) < max_reported:
+                reported.append(
+                    {
+                        "id": fill.get("id", ""),
+                        "order_id": fill.get("order_id", ""),
+                        "market": fill.get("market", ""),
+                        "reason": "no_valid_order",
+                    }
+                )
+    return {"fills": checked, "mismatches": unmatched, "reported": reported}
@@ -0,0 +1,105 @@
+"""
+Description:
+    Streaming iteration over cursor-paginated Paradex endpoints.
+    The next page is requested while the current one is being consumed,
+    and at most two pages are held in memory at any time.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .json_stream import ACCEPT_ENCODING, read_json
+from .rate_limiter import EndpointClass, get_rate_limiter
+
+
+class PageError(Exception):
+    """A page request that failed, with its status code and decoded body."""
+
+    def __init__(self, url: str, status_code: int, response):
+        super().__init__(f"Failed to [GET] {url}. Status: {status_code}")
+        self.status_code = status_code
+        self.response = response
+
+
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict,
+    params: Optional[Dict] = None,
+    cursor: Optional[str] = None,
+    endpoint_class: EndpointClass = EndpointClass.PRIVATE,
+    raise_on_error: bool = False,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    [GET] one page, returns its results and the cursor of the next page.
+    A failed request ends the iteration, or raises if `raise_on_error` is set.
+    """
+    page_params = dict(params or {})
+    if cursor:
+        page_params["cursor"] = cursor
+
+    headers = {"Accept-Encoding": ACCEPT_ENCODING, **headers}
+    async with get_rate_limiter().request(
+        session, "GET", url, endpoint_class, headers=headers, params=page_params
+    ) as response:
+        status_code: int = response.status
+        # Records are decoded as the compressed body streams in
+        response: Dict = await read_json(response)
+    if status_code != 200:
+        logging.error(f"Unable to [GET] {url}")
+        logging.error(f"Status Code: {status_code}")
+        logging.error(f"Response Text: {response}")
+        if raise_on_error:
+            raise PageError(url, status_code, response)
+        return [], None
+    return response.get("results", []), response.get("next")
+
+
+async def iter_pages(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict,
+    params: Optional[Dict] = None,
+    cursor: Optional[str] = None,
+    endpoint_class: EndpointClass = EndpointClass.PRIVATE,
+    raise_on_error: bool = False,
+) -> AsyncIterator[Tuple[List[Dict], Optional[str]]]:
+    """
+    Yields (results, next cursor) for every page, starting at `cursor`.
+    The request for the following page is in flight while the caller
+    processes the current one.
+    """
+    pending = asyncio.ensure_future(
+        fetch_page(session, url, headers, params, cursor, endpoint_class, raise_on_error)
+    )
+    try:
+        while pending is not None:
+            results, next_cursor = await pending
+            pending = (
+                asyncio.ensure_future(
+                    fetch_page(
+                        session, url, headers, params, next_cursor, endpoint_class, raise_on_error
+                    )
+                )
+                if next_cursor
+                else None
+            )
+            yield results, next_cursor
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def iter_records(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict,
+    params: Optional[Dict] = None,
+    endpoint_class: EndpointClass = EndpointClass.PRIVATE,
+) -> AsyncIterator[Dict]:
+    """Yields the records of every page as they arrive."""
+    async for results, _ in iter_pages(session, url, headers, params, None, endpoint_class):
+        for record in results:
+            yield record
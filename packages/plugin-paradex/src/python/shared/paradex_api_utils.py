@@ -201,6 +201,28 @@ class Order:
         return str(int(self.size.scaleb(8)))
 
 
+def order_from_dict(order_dict: dict) -> Order:
+    """Builds an Order from a [GET] /orders result."""
+    price = order_dict.get("price")
+    order = Order(
+        market=order_dict["market"],
+        order_type=OrderType(order_dict["type"]),
+        order_side=OrderSide(order_dict["side"]),
+        size=Decimal(str(order_dict["size"])),
+        limit_price=Decimal(str(price)) if price not in (None, "", "0") else None,
+        client_id=order_dict.get("client_id", ""),
+        instruction=order_dict.get("instruction", "GTC"),
+    )
+    order.id = order_dict.get("id", "")
+    order.account = order_dict.get("account", "")
+    order.remaining = Decimal(str(order_dict.get("remaining_size", order_dict["size"])))
+    if order_dict.get("created_at"):
+        order.created_at = int(order_dict["created_at"])
+    if order_dict.get("status") in ("OPEN", "CLOSED"):
+        order.status = OrderStatus(order_dict["status"])
+    return order
+
+
 def calc_order_age_stats(orders: list) -> dict:
     age_stats = {}
     if orders:
@@ -0,0 +1,208 @@
+"""
+Description:
+    Vectorized PnL and position analytics over the columnar fill store.
+    Every computation works on whole NumPy columns of one market's fills,
+    ordered by created_at, without a Python loop per fill, except for the
+    average entry price which loops over the fills that change it.
+
+    Positions are rebuilt from the first fill read, so the full history of
+    a market should be read when positions or unrealized PnL matter. Fills
+    are counted once per id, and only those of the given account.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .trade_store import ColumnarStore
+
+FIFO = "fifo"
+AVERAGE_COST = "average_cost"
+
+# Fill sizes are decimals, positions are rounded to drop float residue
+POSITION_DECIMALS = 9
+
+FILL_COLUMNS = ["id", "side", "size", "price", "fee", "realized_funding", "created_at"]
+
+
+def load_fills(
+    store: ColumnarStore,
+    market: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    account: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Columns of the fills of `market`, with `qty` signed positive for buys.
+    A fill stored more than once is only kept at its first occurrence.
+    """
+    table = store.read(FILL_COLUMNS, market, start_ms, end_ms, account)
+    columns = {
+        name: table.column(name).to_numpy(zero_copy_only=False) for name in FILL_COLUMNS
+    }
+    _, first = np.unique(columns["id"], return_index=True)
+    if len(first) < len(columns["id"]):
+        keep = np.sort(first)
+        columns = {name: values[keep] for name, values in columns.items()}
+    for name in ("size", "price", "fee", "realized_funding"):
+        columns[name] = np.nan_to_num(columns[name].astype(np.float64))
+    columns["qty"] = signed_sizes(columns["side"], columns["size"])
+    return columns
+
+
+def signed_sizes(side: np.ndarray, size: np.ndarray) -> np.ndarray:
+    return np.where(side == "BUY", size, -size)
+
+
+def running_position(qty: np.ndarray) -> np.ndarray:
+    """Position after each fill."""
+    return np.round(np.cumsum(qty), POSITION_DECIMALS)
+
+
+def fifo_realized_pnl(qty: np.ndarray, price: np.ndarray) -> np.ndarray:
+    """
+    Realized PnL of each fill under FIFO matching.
+
+    With a single instrument the FIFO queue only ever holds one side, so the
+    k-th unit bought is always matched with the k-th unit sold, whatever the
+    order of the fills. Matched volume is split at every cumulative buy and
+    sell boundary, and each matched slice is realized by the later of its
+    two fills.
+    """
+    n = len(qty)
+    realized = np.zeros(n)
+    buys = np.flatnonzero(qty > 0)
+    sells = np.flatnonzero(qty < 0)
+    if len(buys) == 0 or len(sells) == 0:
+        return realized
+
+    buy_volume = np.cumsum(qty[buys])
+    sell_volume = np.cumsum(-qty[sells])
+    matched = min(buy_volume[-1], sell_volume[-1])
+    bounds = np.union1d(buy_volume, sell_volume)
+    bounds = np.concatenate(([0.0], bounds[bounds < matched], [matched]))
+    slice_start, slice_qty = bounds[:-1], np.diff(bounds)
+
+    buy_fill = buys[np.searchsorted(buy_volume, slice_start, side="right")]
+    sell_fill = sells[np.searchsorted(sell_volume, slice_start, side="right")]
+    pnl = slice_qty * (price[sell_fill] - price[buy_fill])
+    realized += np.bincount(np.maximum(buy_fill, sell_fill), weights=pnl, minlength=n)
+    return realized
+
+
+def average_cost(qty: np.ndarray, price: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Realized PnL of each fill and average entry price after each fill,
+    under average cost accounting.
+
+    A fill reducing the position leaves the entry price unchanged, so it is
+    only recomputed at the fills opening, adding to or flipping the position,
+    and carried forward over the reductions. The recomputation is a short loop
+    over those fills: a product of position ratios would underflow over a
+    long-lived position.
+    """
+    n = len(qty)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+    position = running_position(qty)
+    previous = np.concatenate(([0.0], position[:-1]))
+
+    reducing = (previous != 0) & (np.sign(qty) == -np.sign(previous))
+    flipping = reducing & (np.sign(position) != np.sign(previous))
+
+    changes = np.flatnonzero(~reducing | flipping)
+    entries = np.zeros(len(changes))
+    entry = 0.0
+    for j, k in enumerate(changes):
+        if position[k] == 0:
+            entry = 0.0
+        elif flipping[k] or previous[k] == 0:
+            entry = price[k]
+        else:
+            entry = (entry * abs(previous[k]) + abs(qty[k]) * price[k]) / abs(position[k])
+        entries[j] = entry
+    entry_price = entries[np.searchsorted(changes, np.arange(n), side="right") - 1]
+    previous_entry = np.concatenate(([0.0], entry_price[:-1]))
+
+    closed = np.where(reducing, np.minimum(np.abs(qty), np.abs(previous)), 0.0)
+    realized = closed * np.sign(previous) * (price - previous_entry)
+    return realized, entry_price
+
+
+def realized_pnl(qty: np.ndarray, price: np.ndarray, method: str = FIFO) -> np.ndarray:
+    if method == FIFO:
+        return fifo_realized_pnl(qty, price)
+    if method == AVERAGE_COST:
+        return average_cost(qty, price)[0]
+    raise ValueError(f"Unknown PnL method {method}")
+
+
+def open_position_cost(qty: np.ndarray, price: np.ndarray, method: str = FIFO) -> float:
+    """Cost of the position left open after the last fill."""
+    if len(qty) == 0:
+        return 0.0
+    if method == AVERAGE_COST:
+        _, entry_price = average_cost(qty, price)
+        return float(entry_price[-1] * running_position(qty)[-1])
+    # Under FIFO the open units are the last ones of the side in excess
+    position = float(running_position(qty)[-1])
+    if position == 0:
+        return 0.0
+    side = qty > 0 if position > 0 else qty < 0
+    units = np.abs(qty[side])[::-1]
+    prices = price[side][::-1]
+    left = np.clip(abs(position) - (np.cumsum(units) - units), 0.0, units)
+    return float(np.sign(position) * np.sum(left * prices))
+
+
+def market_pnl(
+    store: ColumnarStore,
+    market: str,
+    mark_price: Optional[float] = None,
+    method: str = FIFO,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    account: Optional[str] = None,
+) -> Dict:
+    """PnL, position, fee and funding totals of one market."""
+    fills = load_fills(store, market, start_ms, end_ms, account)
+    qty, price = fills["qty"], fills["price"]
+    position = float(running_position(qty)[-1]) if len(qty) else 0.0
+    realized = float(np.sum(realized_pnl(qty, price, method)))
+    cost = open_position_cost(qty, price, method)
+    unrealized = None
+    if mark_price is not None:
+        unrealized = position * mark_price - cost
+    return {
+        "market": market,
+        "method": method,
+        "fills": len(qty),
+        "position": position,
+        "entry_price": cost / position if position else 0.0,
+        "realized_pnl": realized,
+        "unrealized_pnl": unrealized,
+        "fees": float(np.sum(fills["fee"])),
+        "funding": float(np.sum(fills["realized_funding"])),
+        "volume": float(np.sum(np.abs(qty) * price)),
+    }
+
+
+def funding_accrual(
+    store: ColumnarStore, market: str, account: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """created_at and cumulative realized funding after each fill."""
+    fills = load_fills(store, market, account=account)
+    return fills["created_at"], np.cumsum(fills["realized_funding"])
+
+
+def pnl_by_market(
+    store: ColumnarStore,
+    mark_prices: Optional[Dict[str, float]] = None,
+    method: str = FIFO,
+    account: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """market_pnl of every market with fills, of `account` only when it is given."""
+    mark_prices = mark_prices or {}
+    return {
+        market: market_pnl(store, market, mark_prices.get(market), method, account=account)
+        for market in store.markets(account)
+    }
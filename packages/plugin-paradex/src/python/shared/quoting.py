@@ -0,0 +1,358 @@
+"""
+Description:
+    Quoting engine. Diffs the desired quotes of a market against the orders
+    live on Paradex and emits the minimal set of cancels, new orders and
+    amendments, coalescing updates within the quote refresh boundaries.
+    `QuoteRefresher` is the driver: it wakes up whenever a market becomes
+    due and applies that market's diff. A market whose refresh failed is
+    retried with an exponential backoff, with its quotes kept pending.
+"""
+import asyncio
+import logging
+import time
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .api_client import (
+    delete_order_payload,
+    modify_order_payload,
+    post_order_payload,
+    sign_order,
+)
+from .api_config import ApiConfig
+from .paradex_api_utils import (
+    Order,
+    OrderSide,
+    OrderType,
+    order_from_dict,
+    time_millis,
+)
+
+# (first delay, maximum delay) in seconds before retrying a failed market refresh
+RETRY_BACKOFF = (1.0, 60.0)
+
+
+class QuoteDiff:
+    def __init__(
+        self,
+        market: str,
+        cancels: List[Order] = None,
+        new_orders: List[Order] = None,
+        amends: List[Tuple[Order, Order]] = None,
+    ):
+        self.market = market
+        self.cancels: List[Order] = cancels or []
+        self.new_orders: List[Order] = new_orders or []
+        # (live order, desired order) pairs
+        self.amends: List[Tuple[Order, Order]] = amends or []
+
+    def __repr__(self):
+        return (
+            f"{self.market} cancels:{len(self.cancels)}"
+            f" new:{len(self.new_orders)} amends:{len(self.amends)}"
+        )
+
+    def is_empty(self) -> bool:
+        return not (self.cancels or self.new_orders or self.amends)
+
+    def request_count(self) -> int:
+        return len(self.cancels) + len(self.new_orders) + len(self.amends)
+
+
+class _PendingQuotes:
+    def __init__(self, desired: List[Order], now: float):
+        self.desired = desired
+        self.first_update = now
+        self.last_update = now
+
+
+class QuoteEngine:
+    """
+    Keeps the latest desired quotes per market and decides when to refresh them.
+
+    Updates for a market are coalesced: a refresh is due once no new update
+    arrived for `quote_refresh_lower_boundary` seconds, and at the latest
+    `quote_refresh_higher_boundary` seconds after the first pending update.
+    """
+
+    def __init__(
+        self,
+        config: ApiConfig,
+        price_tolerance: Decimal = Decimal("0"),
+        size_tolerance: Decimal = Decimal("0"),
+    ):
+        self.lower_boundary = config.quote_refresh_lower_boundary
+        self.higher_boundary = max(
+            config.quote_refresh_higher_boundary, config.quote_refresh_lower_boundary
+        )
+        self.price_tolerance = price_tolerance
+        self.size_tolerance = size_tolerance
+        self._pending: Dict[str, _PendingQuotes] = {}
+        # Consecutive failed refreshes and retry time of the markets backing off
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    def submit(self, market: str, desired: List[Order], now: Optional[float] = None) -> None:
+        """Records the desired quotes of a market, replacing any pending ones."""
+        now = time.time() if now is None else now
+        pending = self._pending.get(market)
+        if pending is None:
+            self._pending[market] = _PendingQuotes(desired, now)
+        else:
+            pending.desired = desired
+            pending.last_update = now
+
+    def due_at(self, market: str) -> Optional[float]:
+        """Time at which the pending quotes of a market become due, None if there are none."""
+        pending = self._pending.get(market)
+        if pending is None:
+            return None
+        due_at = min(
+            pending.last_update + self.lower_boundary,
+            pending.first_update + self.higher_boundary,
+        )
+        return max(due_at, self._retry_at.get(market, due_at))
+
+    def desired(self, market: str) -> Optional[List[Order]]:
+        """The pending desired quotes of a market, None if there are none."""
+        pending = self._pending.get(market)
+        return None if pending is None else pending.desired
+
+    def defer(
+        self, market: str, now: Optional[float] = None, desired: Optional[List[Order]] = None
+    ) -> float:
+        """
+        Reschedules a market whose refresh failed, after a delay doubling with
+        each consecutive failure. `desired` puts back quotes already flushed,
+        unless newer ones were submitted since. Returns the retry time.
+        """
+        now = time.time() if now is None else now
+        if desired is not None and market not in self._pending:
+            self._pending[market] = _PendingQuotes(desired, now)
+        failures = self._failures.get(market, 0)
+        self._failures[market] = failures + 1
+        first, maximum = RETRY_BACKOFF
+        self._retry_at[market] = now + min(first * 2**failures, maximum)
+        return self._retry_at[market]
+
+    def refreshed(self, market: str) -> None:
+        """Ends the backoff of a market once its refresh succeeded."""
+        self._failures.pop(market, None)
+        self._retry_at.pop(market, None)
+
+    def next_due(self) -> Optional[float]:
+        """Earliest due time over all the markets with pending quotes."""
+        return min((self.due_at(m) for m in self._pending), default=None)
+
+    def is_due(self, market: str, now: Optional[float] = None) -> bool:
+        due_at = self.due_at(market)
+        now = time.time() if now is None else now
+        return due_at is not None and now >= due_at
+
+    def due_markets(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        return [m for m in self._pending if self.is_due(m, now)]
+
+    def flush(
+        self, market: str, live: List[Order], now: Optional[float] = None
+    ) -> Optional[QuoteDiff]:
+        """Returns the diff for a market if its refresh is due, None otherwise."""
+        if not self.is_due(market, now):
+            return None
+        pending = self._pending.pop(market)
+        self._retry_at.pop(market, None)
+        return diff_quotes(
+            market,
+            pending.desired,
+            live,
+            price_tolerance=self.price_tolerance,
+            size_tolerance=self.size_tolerance,
+        )
+
+
+class QuoteRefresher:
+    """
+    Drives a QuoteEngine: every market is flushed as soon as it becomes due,
+    with its live orders fetched at that time, and its diff is applied.
+    Quotes are submitted with `submit`, `run` does the flushing until `stop`.
+    A market whose live orders cannot be fetched, or whose diff cannot be
+    applied, is deferred by the engine with its quotes kept pending.
+    """
+
+    def __init__(
+        self,
+        engine: QuoteEngine,
+        live_orders: Callable[[str], Awaitable[List[Order]]],
+        apply: Callable[[QuoteDiff], Awaitable],
+        clock: Callable[[], float] = time.time,
+    ):
+        self.engine = engine
+        self.live_orders = live_orders
+        self.apply = apply
+        self.clock = clock
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopped = False
+
+    def submit(self, market: str, desired: List[Order]) -> None:
+        self.engine.submit(market, desired, self.clock())
+        if self._wakeup is not None:
+            # The new update may move the next due time
+            self._wakeup.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def refresh_due(self) -> List[QuoteDiff]:
+        """Flushes and applies every market that is due now, returns the applied diffs."""
+        applied = []
+        for market in self.engine.due_markets(self.clock()):
+            desired = self.engine.desired(market)
+            try:
+                live = await self.live_orders(market)
+                diff = self.engine.flush(market, live, self.clock())
+                if diff is not None and not diff.is_empty():
+                    await self.apply(diff)
+                    applied.append(diff)
+            except Exception as e:
+                retry_at = self.engine.defer(market, self.clock(), desired)
+                logging.error(
+                    f"Quote refresh of {market} failed, retrying in"
+                    f" {retry_at - self.clock():.1f}s: {e}"
+                )
+                continue
+            self.engine.refreshed(market)
+        return applied
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+        while not self._stopped:
+            await self.refresh_due()
+            next_due = self.engine.next_due()
+            timeout = None if next_due is None else max(0.0, next_due - self.clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+def _same_quote(
+    desired: Order, live: Order, price_tolerance: Decimal, size_tolerance: Decimal
+) -> bool:
+    return (
+        live.order_type == OrderType.Limit
+        and desired.instruction == live.instruction
+        and abs(desired.limit_price - live.limit_price) <= price_tolerance
+        and abs(desired.size - live.remaining) <= size_tolerance
+    )
+
+
+def _by_aggressiveness(orders: List[Order], side: OrderSide) -> List[Order]:
+    return sorted(orders, key=lambda o: o.limit_price, reverse=side == OrderSide.Buy)
+
+
+def diff_quotes(
+    market: str,
+    desired: List[Order],
+    live: List[Order],
+    price_tolerance: Decimal = Decimal("0"),
+    size_tolerance: Decimal = Decimal("0"),
+) -> QuoteDiff:
+    """
+    Computes the minimal set of requests turning `live` into `desired`.
+    Live orders already matching a desired quote are left untouched, the
+    remaining ones are amended in place when possible, and only the excess
+    is cancelled or newly placed.
+    """
+    diff = QuoteDiff(market)
+    desired = [o for o in desired if o.market == market]
+    live = [o for o in live if o.market == market]
+
+    # Market orders are never resting, they are always sent as new
+    diff.new_orders.extend(o for o in desired if o.order_type == OrderType.Market)
+
+    for side in OrderSide:
+        side_desired = _by_aggressiveness(
+            [
+                o
+                for o in desired
+                if o.order_side == side and o.order_type == OrderType.Limit
+            ],
+            side,
+        )
+        side_live = [o for o in live if o.order_side == side]
+        unmatched_desired = []
+        for d in side_desired:
+            match = next(
+                (
+                    o
+                    for o in side_live
+                    if _same_quote(d, o, price_tolerance, size_tolerance)
+                ),
+                None,
+            )
+            if match is None:
+                unmatched_desired.append(d)
+            else:
+                side_live.remove(match)
+
+        amendable = _by_aggressiveness(
+            [o for o in side_live if o.order_type == OrderType.Limit], side
+        )
+        for d in unmatched_desired:
+            live_order = next((o for o in amendable if o.instruction == d.instruction), None)
+            if live_order is None:
+                diff.new_orders.append(d)
+            else:
+                amendable.remove(live_order)
+                side_live.remove(live_order)
+                diff.amends.append((live_order, d))
+        diff.cancels.extend(side_live)
+
+    return diff
+
+
+async def apply_quote_diff(config: ApiConfig, paradex_jwt: str, diff: QuoteDiff) -> Dict:
+    """
+    Sends the requests of a diff. Cancels go first so that the
+    new orders and amendments never breach position or margin limits.
+    """
+    logging.info(f"Applying quote diff: {diff}")
+    cancelled = await asyncio.gather(
+        *[
+            delete_order_payload(config.paradex_http_url, paradex_jwt, o.id)
+            for o in diff.cancels
+        ]
+    )
+
+    requests = []
+    for o in diff.new_orders:
+        o.signature_timestamp = time_millis()
+        o.signature = sign_order(config, o)
+        requests.append(
+            post_order_payload(config.paradex_http_url, paradex_jwt, o.dump_to_dict())
+        )
+    for live_order, o in diff.amends:
+        o.signature_timestamp = time_millis()
+        o.signature = sign_order(config, o)
+        payload = o.dump_to_dict()
+        payload["id"] = live_order.id
+        requests.append(
+            modify_order_payload(config.paradex_http_url, paradex_jwt, live_order.id, payload)
+        )
+    responses = await asyncio.gather(*requests)
+
+    return {
+        "market": diff.market,
+        "cancelled": sum(1 for ok in cancelled if ok),
+        "created": responses[: len(diff.new_orders)],
+        "amended": responses[len(diff.new_orders):],
+    }
+
+
+def live_orders_from_api(open_orders: List[Dict]) -> List[Order]:
+    """Converts a [GET] /orders result into Order objects."""
+    return [order_from_dict(o) for o in open_orders]
@@ -0,0 +1,314 @@
+"""
+Description:
+    Client-side rate limiting for the Paradex REST API.
+    One token bucket per endpoint class, with priority lanes so that
+    cancels go before new orders, then other account writes (/auth,
+    /onboarding), then reads. Requests made through RateLimiter.request are
+    retried after a 429, once the bucket's back-off has passed.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum, IntEnum
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+class EndpointClass(Enum):
+    PUBLIC = "public"
+    PRIVATE = "private"
+    ORDERS = "orders"
+
+
+class Priority(IntEnum):
+    CANCEL = 0
+    ORDER = 1
+    WRITE = 2
+    READ = 3
+
+
+# Order entry is counted against both its own budget and the account budget
+ENDPOINT_BUCKETS: Dict[EndpointClass, List[str]] = {
+    EndpointClass.PUBLIC: ["public"],
+    EndpointClass.PRIVATE: ["private"],
+    EndpointClass.ORDERS: ["orders", "private"],
+}
+
+WAIT_SAMPLES = 1024
+MAX_RETRIES = 3
+MIN_RATE_FRACTION = 0.1
+RECOVERY_FRACTION = 0.05
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, capacity: float):
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._drain_task: Optional[asyncio.Task] = None
+        self._acquired = 0
+        self._throttled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples = deque(maxlen=WAIT_SAMPLES)
+
+    def reset_loop(self) -> None:
+        """Forgets the waiters of a previous event loop, keeps the rate and metrics."""
+        self._waiters = []
+        self._drain_task = None
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _record_wait(self, wait: float) -> None:
+        self._acquired += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._wait_samples.append(wait)
+
+    async def acquire(self, priority: Priority = Priority.READ) -> float:
+        """Waits for a token and returns the time spent waiting in seconds."""
+        start = time.monotonic()
+        self._refill(start)
+        if not self._waiters and start >= self._blocked_until and self.tokens >= 1:
+            self.tokens -= 1
+            self._record_wait(0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        self._ensure_drain()
+        await future
+        wait = time.monotonic() - start
+        self._record_wait(wait)
+        return wait
+
+    def _ensure_drain(self) -> None:
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while True:
+            while self._waiters and self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                return
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._refill(now)
+            while self._waiters and self.tokens >= 1:
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():
+                    continue
+                self.tokens -= 1
+                future.set_result(None)
+            if self._waiters:
+                await asyncio.sleep(max(0.0, 1 - self.tokens) / self.rate)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Backs off after a 429: empties the bucket and halves the rate."""
+        now = time.monotonic()
+        self._throttled += 1
+        self.tokens = 0
+        self._updated = now
+        self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+        self._blocked_until = max(
+            self._blocked_until, now + (retry_after if retry_after else 1 / self.rate)
+        )
+        logging.warning(
+            f"Rate limited on {self.name} bucket, rate lowered to {self.rate:.2f}/s"
+        )
+
+    def recover(self) -> None:
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_FRACTION)
+
+    def sync(self, remaining: Optional[float], reset_after: Optional[float]) -> None:
+        """Aligns the local budget with the server's rate limit headers."""
+        now = time.monotonic()
+        self._refill(now)
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+            if remaining <= 0 and reset_after:
+                self._blocked_until = max(self._blocked_until, now + reset_after)
+
+    def metrics(self) -> Dict:
+        lanes = {p.name.lower(): 0 for p in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                lanes[Priority(priority).name.lower()] += 1
+        samples = list(self._wait_samples)
+        return {
+            "rate": self.rate,
+            "base_rate": self.base_rate,
+            "tokens": self.tokens,
+            "queue_depth": sum(lanes.values()),
+            "queue_depth_by_lane": lanes,
+            "acquired": self._acquired,
+            "throttled": self._throttled,
+            "wait_avg": self._wait_total / self._acquired if self._acquired else 0.0,
+            "wait_max": self._wait_max,
+            "wait_p50": _percentile(samples, 50),
+            "wait_p99": _percentile(samples, 99),
+        }
+
+
+def _header_float(headers: Mapping, *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+def _reset_after(reset: Optional[float]) -> Optional[float]:
+    """Rate limit reset headers are either a delay or an epoch in s or ms."""
+    if reset is None:
+        return None
+    if reset > 1e12:
+        return max(0.0, reset / 1000 - time.time())
+    if reset > 1e9:
+        return max(0.0, reset - time.time())
+    return reset
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_retries: int = MAX_RETRIES):
+        self.buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(name, rate, capacity) for name, (rate, capacity) in limits.items()
+        }
+        self.max_retries = max_retries
+        self._loop = None
+
+    def _check_loop(self) -> None:
+        # Waiters and drain tasks are bound to a loop, the learned rates are not
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            for bucket in self.buckets.values():
+                bucket.reset_loop()
+
+    def _buckets_for(self, endpoint_class: EndpointClass) -> List[TokenBucket]:
+        return [self.buckets[name] for name in ENDPOINT_BUCKETS[endpoint_class]]
+
+    async def acquire(
+        self, endpoint_class: EndpointClass, priority: Priority = Priority.READ
+    ) -> float:
+        self._check_loop()
+        wait = 0.0
+        for bucket in self._buckets_for(endpoint_class):
+            wait += await bucket.acquire(priority)
+        return wait
+
+    @asynccontextmanager
+    async def limit(self, endpoint_class: EndpointClass, priority: Priority = Priority.READ):
+        await self.acquire(endpoint_class, priority)
+        yield
+
+    @asynccontextmanager
+    async def request(
+        self,
+        session,
+        method: str,
+        url: str,
+        endpoint_class: EndpointClass,
+        priority: Priority = Priority.READ,
+        acquired: bool = False,
+        **kwargs,
+    ):
+        """
+        Sends a request through the buckets of `endpoint_class` and yields its
+        response. A 429 is retried up to `max_retries` times, each retry waits
+        for a token again, so for the Retry-After delay or the lowered rate.
+        `acquired` means the token of the first attempt was already taken.
+        """
+        attempt = 0
+        while True:
+            if not acquired or attempt:
+                await self.acquire(endpoint_class, priority)
+            response = await session.request(method, url, **kwargs)
+            self.observe(endpoint_class, response.status, response.headers)
+            if response.status != 429 or attempt >= self.max_retries:
+                break
+            response.release()
+            attempt += 1
+            logging.warning(f"[{method}] {url} rate limited, retry {attempt}/{self.max_retries}")
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def observe(self, endpoint_class: EndpointClass, status_code: int, headers: Mapping) -> None:
+        """Feeds a response back into the buckets of its endpoint class."""
+        retry_after = _header_float(headers, "Retry-After")
+        remaining = _header_float(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+        reset_after = _reset_after(
+            _header_float(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+        )
+        for bucket in self._buckets_for(endpoint_class):
+            if status_code == 429:
+                bucket.penalize(retry_after or reset_after)
+            else:
+                bucket.recover()
+                bucket.sync(remaining, reset_after)
+
+    def metrics(self) -> Dict:
+        return {name: bucket.metrics() for name, bucket in self.buckets.items()}
+
+
+def _env_limit(name: str, default_rate: float) -> Tuple[float, float]:
+    rate = float(os.getenv(f"PARADEX_RATE_LIMIT_{name.upper()}", default_rate))
+    burst = float(os.getenv(f"PARADEX_RATE_BURST_{name.upper()}", rate * 2))
+    if rate <= 0:
+        raise ValueError(f"PARADEX_RATE_LIMIT_{name.upper()} must be > 0, got {rate}")
+    if burst < 1:
+        raise ValueError(f"PARADEX_RATE_BURST_{name.upper()} must be >= 1, got {burst}")
+    return rate, burst
+
+
+def default_limits() -> Dict[str, Tuple[float, float]]:
+    """Requests per second and burst size per bucket, overridable from env."""
+    return {
+        "public": _env_limit("public", 20),
+        "private": _env_limit("private", 40),
+        "orders": _env_limit("orders", 20),
+    }
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            default_limits(), int(os.getenv("PARADEX_RATE_LIMIT_RETRIES", MAX_RETRIES))
+        )
+    return _rate_limiter
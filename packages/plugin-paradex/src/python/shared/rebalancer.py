@@ -0,0 +1,230 @@
+"""
+Description:
+    Rebalancing of Paraclear USDC across a fleet of Paradex accounts.
+    A target allocation is turned into transfers by matching the largest
+    surpluses with the largest deficits, which needs at most N - 1 transfers
+    for N accounts. Each sending account then submits one multicall (one
+    Paraclear withdraw and one USDC transfer per recipient) and each
+    receiving account one multicall (allowance and deposit of everything it
+    received). All accounts run concurrently: senders submit right away with
+    locally managed nonces, and each receiver deposits as soon as its
+    incoming transfers are accepted on L2, tracked by the shared receipt watcher.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from starknet_py.contract import Contract
+
+from helpers.account import Account
+
+from .contract_cache import contract_from_address
+from .fee_estimator import get_fee_estimator
+from .rpc_batch import BalanceQuery, read_balances
+from .tx_watcher import get_tx_watcher
+
+
+class Transfer:
+    """`amount` of USDC, in token base units, from `source` to `recipient`."""
+
+    def __init__(self, source: str, recipient: str, amount: int):
+        self.source = source
+        self.recipient = recipient
+        self.amount = amount
+
+    def to_dict(self) -> Dict:
+        return {"from": self.source, "to": self.recipient, "amount": self.amount}
+
+    def __repr__(self) -> str:
+        return f"Transfer({self.source} -> {self.recipient}: {self.amount})"
+
+
+def target_balances(balances: Dict[str, int], weights: Dict[str, float]) -> Dict[str, int]:
+    """
+    Splits the total balance of the fleet by weight. Amounts are floored and
+    the remaining base units go to the largest remainders, so the targets
+    add up to the total exactly.
+    """
+    total = sum(balances.values())
+    weight_sum = sum(weights.get(account, 0) for account in balances)
+    if weight_sum <= 0:
+        raise ValueError("Rebalancing weights must add up to a positive value")
+    shares = {account: total * weights.get(account, 0) / weight_sum for account in balances}
+    targets = {account: int(share) for account, share in shares.items()}
+    leftover = total - sum(targets.values())
+    by_remainder = sorted(shares, key=lambda a: shares[a] - targets[a], reverse=True)
+    for account in by_remainder[:leftover]:
+        targets[account] += 1
+    return targets
+
+
+def plan_transfers(
+    balances: Dict[str, int], targets: Dict[str, int], min_amount: int = 0
+) -> List[Transfer]:
+    """
+    Transfers moving `balances` to `targets`, largest surplus to largest deficit.
+    Differences below `min_amount` are left alone.
+    """
+    surpluses = {a: balances[a] - targets.get(a, 0) for a in balances}
+    surpluses = {a: s for a, s in surpluses.items() if s >= max(min_amount, 1)}
+    deficits = {a: targets[a] - balances.get(a, 0) for a in targets}
+    deficits = {a: d for a, d in deficits.items() if d >= max(min_amount, 1)}
+
+    transfers = []
+    while surpluses and deficits:
+        source = max(surpluses, key=surpluses.get)
+        recipient = max(deficits, key=deficits.get)
+        amount = min(surpluses[source], deficits[recipient])
+        transfers.append(Transfer(source, recipient, amount))
+        for pending, account in ((surpluses, source), (deficits, recipient)):
+            pending[account] -= amount
+            if pending[account] < max(min_amount, 1):
+                del pending[account]
+    return transfers
+
+
+class Rebalancer:
+    def __init__(self, paradex_config: Dict, accounts: List[Account]):
+        self.accounts = {hex(account.address): account for account in accounts}
+        self.paraclear_address = paradex_config["paraclear_address"]
+        self.paraclear_decimals = paradex_config["paraclear_decimals"]
+        token = paradex_config["bridged_tokens"][0]
+        self.usdc_address = token["l2_token_address"]
+        self.usdc_decimals = token["decimals"]
+        # Paraclear amounts have more decimals than the token
+        self.paraclear_scale = 10 ** (self.paraclear_decimals - self.usdc_decimals)
+        self._contracts: Optional[Dict[str, Contract]] = None
+
+    @property
+    def client(self):
+        return next(iter(self.accounts.values())).client
+
+    async def contracts(self) -> Dict[str, Contract]:
+        # Only used to build calls, so resolved once for the whole fleet
+        if self._contracts is None:
+            account = next(iter(self.accounts.values()))
+            paraclear, usdc = await asyncio.gather(
+                contract_from_address(self.paraclear_address, account),
+                contract_from_address(self.usdc_address, account),
+            )
+            self._contracts = {"paraclear": paraclear, "usdc": usdc}
+        return self._contracts
+
+    async def balances(self) -> Dict[str, int]:
+        """Paraclear USDC balance of every account, in token base units, in one round trip."""
+        queries = [
+            BalanceQuery(address, self.usdc_address, self.paraclear_address)
+            for address in self.accounts
+        ]
+        results = await read_balances(self.client, queries)
+        return {
+            address: max(balance, 0) // self.paraclear_scale
+            for address, balance in zip(self.accounts, results)
+        }
+
+    def _send_calls(self, contracts: Dict[str, Contract], transfers: List[Transfer]) -> List:
+        total = sum(t.amount for t in transfers)
+        calls = [
+            contracts["paraclear"].functions["withdraw"].prepare_invoke_v1(
+                token_address=int(self.usdc_address, 16),
+                amount=total * self.paraclear_scale,
+            )
+        ]
+        for transfer in transfers:
+            calls.append(
+                contracts["usdc"].functions["transfer"].prepare_invoke_v1(
+                    recipient=int(transfer.recipient, 16), amount=transfer.amount
+                )
+            )
+        return calls
+
+    def _deposit_calls(self, contracts: Dict[str, Contract], total: int) -> List:
+        return [
+            contracts["usdc"].functions["increaseAllowance"].prepare_invoke_v1(
+                spender=int(self.paraclear_address, 16), addedValue=total
+            ),
+            contracts["paraclear"].functions["deposit"].prepare_invoke_v1(
+                token_address=int(self.usdc_address, 16),
+                amount=total * self.paraclear_scale,
+            ),
+        ]
+
+    async def _submit(self, address: str, calls: List) -> int:
+        account = self.accounts[address]
+        max_fee = await get_fee_estimator().max_fee(account, calls)
+        response = await account.submit_v1(calls, max_fee=max_fee)
+        logging.info(f"{address} submitted {hex(response.transaction_hash)}")
+        return response.transaction_hash
+
+    async def execute(self, transfers: List[Transfer]) -> List[Dict]:
+        """Runs a plan, returns one report per submitted multicall."""
+        contracts = await self.contracts()
+        watcher = get_tx_watcher(self.client)
+        outgoing: Dict[str, List[Transfer]] = {}
+        incoming: Dict[str, List[Transfer]] = {}
+        for transfer in transfers:
+            outgoing.setdefault(transfer.source, []).append(transfer)
+            incoming.setdefault(transfer.recipient, []).append(transfer)
+
+        async def send(source: str) -> int:
+            tx_hash = await self._submit(source, self._send_calls(contracts, outgoing[source]))
+            await watcher.wait_for_l2(tx_hash, self.accounts[source].nonce_manager)
+            return tx_hash
+
+        sends = {source: asyncio.ensure_future(send(source)) for source in outgoing}
+
+        async def receive(recipient: str) -> Dict:
+            arrived = []
+            for transfer in incoming[recipient]:
+                try:
+                    await asyncio.shield(sends[transfer.source])
+                    arrived.append(transfer)
+                except Exception:
+                    logging.warning(f"{transfer} failed, not deposited")
+            total = sum(t.amount for t in arrived)
+            if total == 0:
+                raise ValueError("No incoming transfer arrived")
+            tx_hash = await self._submit(recipient, self._deposit_calls(contracts, total))
+            await watcher.wait_for_l2(tx_hash, self.accounts[recipient].nonce_manager)
+            return {"tx_hash": hex(tx_hash), "amount": total}
+
+        receives = {recipient: receive(recipient) for recipient in incoming}
+        results = await asyncio.gather(
+            *sends.values(), *receives.values(), return_exceptions=True
+        )
+
+        reports = []
+        kinds = ["send"] * len(sends) + ["deposit"] * len(receives)
+        for kind, address, result in zip(kinds, [*sends, *receives], results):
+            report = {"account": address, "kind": kind}
+            if isinstance(result, Exception):
+                logging.error(f"{kind} of {address} failed: {result}")
+                report["error"] = str(result)
+            elif kind == "send":
+                report["tx_hash"] = hex(result)
+                report["amount"] = sum(t.amount for t in outgoing[address])
+            else:
+                report.update(result)
+            reports.append(report)
+        return reports
+
+    async def rebalance(
+        self, weights: Optional[Dict[str, float]] = None, min_amount: int = 0, dry_run=False
+    ) -> Dict:
+        """
+        Moves the fleet to the allocation given by `weights` (equal split by
+        default). Amounts are in token base units.
+        """
+        balances = await self.balances()
+        weights = weights or {address: 1.0 for address in self.accounts}
+        targets = target_balances(balances, weights)
+        transfers = plan_transfers(balances, targets, min_amount)
+        logging.info(f"Rebalancing plan: {transfers}")
+        result = {
+            "balances": balances,
+            "targets": targets,
+            "transfers": [t.to_dict() for t in transfers],
+        }
+        if not dry_run and transfers:
+            result["transactions"] = await self.execute(transfers)
+        return result
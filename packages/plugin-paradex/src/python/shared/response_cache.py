@@ -0,0 +1,185 @@
+"""
+Description:
+    HTTP response cache for public, slow-changing Paradex endpoints.
+    Entries live for a per-endpoint TTL, are revalidated with
+    ETag / Last-Modified when the server supports it, and are evicted
+    least recently used first. Private endpoints are never cached.
+    Callers get their own copy of a cached body.
+"""
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+from .cache import SingleFlight
+from .json_stream import ACCEPT_ENCODING, read_json
+from .rate_limiter import EndpointClass, get_rate_limiter
+
+# Seconds a response stays fresh, per public endpoint
+PUBLIC_ENDPOINT_TTLS: Dict[str, float] = {
+    "/system/config": 3600.0,
+    "/markets": 300.0,
+    "/markets/summary": 2.0,
+}
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class CachedResponse:
+    def __init__(self, status: int, body: Dict, etag: str, last_modified: str, ttl: float):
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = time.monotonic() + ttl
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def conditional_headers(self) -> Dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttls: Dict[str, float] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttls = dict(PUBLIC_ENDPOINT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def is_cacheable(self, path: str) -> bool:
+        return path in self.ttls
+
+    @staticmethod
+    def _key(base_url: str, path: str, params: Optional[Dict]) -> Tuple:
+        return (base_url, path, tuple(sorted((params or {}).items())))
+
+    def _store(self, key: Tuple, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(
+        self,
+        base_url: str,
+        path: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Tuple[int, Dict]:
+        """
+        [GET] a public endpoint through the cache.
+        Returns the status code and the decoded JSON body, a copy that the
+        caller may modify without affecting the cache.
+        """
+        if not self.is_cacheable(path):
+            raise ValueError(f"{path} is not a cacheable public endpoint")
+
+        key = self._key(base_url, path, params)
+        entry = self._entries.get(key)
+        if entry is not None and entry.is_fresh():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.status, copy.deepcopy(entry.body)
+
+        self.misses += 1
+        # Concurrent callers share one fetch, so each one copies the body it gets
+        status, body = await self._flight.do(
+            key, lambda: self._fetch(key, base_url, path, params, headers, session)
+        )
+        return status, copy.deepcopy(body)
+
+    async def _fetch(
+        self,
+        key: Tuple,
+        base_url: str,
+        path: str,
+        params: Optional[Dict],
+        headers: Optional[Dict],
+        session: Optional[aiohttp.ClientSession],
+    ) -> Tuple[int, Dict]:
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self._fetch(key, base_url, path, params, headers, session)
+
+        entry = self._entries.get(key)
+        request_headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        if entry is not None:
+            request_headers.update(entry.conditional_headers())
+
+        async with get_rate_limiter().request(
+            session,
+            "GET",
+            base_url + path,
+            EndpointClass.PUBLIC,
+            headers=request_headers,
+            params=params,
+        ) as response:
+            status_code: int = response.status
+            ttl = self.ttls[path]
+            if status_code == 304 and entry is not None:
+                logging.debug(f"[GET] {path} not modified")
+                self.revalidated += 1
+                entry.expires_at = time.monotonic() + ttl
+                self._store(key, entry)
+                return entry.status, entry.body
+
+            body: Dict = await read_json(response)
+            if status_code == 200:
+                self._store(
+                    key,
+                    CachedResponse(
+                        status_code,
+                        body,
+                        response.headers.get("ETag", ""),
+                        response.headers.get("Last-Modified", ""),
+                        ttl,
+                    ),
+                )
+            return status_code, body
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        if path is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[1] == path]:
+            del self._entries[key]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
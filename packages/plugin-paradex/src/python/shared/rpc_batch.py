@@ -0,0 +1,219 @@
+"""
+Description:
+    JSON-RPC batching for Starknet nodes, and a balance reader built on it.
+    Any number of read requests are sent as JSON-RPC batches (one HTTP
+    round trip per MAX_BATCH_SIZE requests). Nodes that answer a batch
+    with a parse or invalid request error do not accept batches, they are
+    queried with concurrent single requests instead for UNBATCHED_TTL
+    seconds, then batches are tried again.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import aiohttp
+from starknet_py.hash.selector import get_selector_from_name
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import Call
+from starknet_py.net.full_node_client import FullNodeClient
+
+MAX_BATCH_SIZE = 100
+FIELD_PRIME = 2**251 + 17 * 2**192 + 1
+UNBATCHED_TTL = 600.0
+
+# JSON-RPC errors and HTTP statuses of nodes that reject a batch as such
+BATCH_UNSUPPORTED_CODES = (-32700, -32600)
+BATCH_UNSUPPORTED_STATUSES = ("400", "405", "415", "501")
+
+# Node URL -> time it rejected a JSON-RPC batch
+_unbatched_nodes: Dict[str, float] = {}
+
+
+async def _post(session: aiohttp.ClientSession, url: str, payload) -> Any:
+    async with session.post(url, json=payload) as response:
+        if response.status >= 300:
+            raise ClientError(code=str(response.status), message=await response.text())
+        return await response.json(content_type=None)
+
+
+def _batch_unsupported(response: Any) -> bool:
+    if isinstance(response, ClientError):
+        return str(response.code) in BATCH_UNSUPPORTED_STATUSES
+    error = response.get("error") if isinstance(response, dict) else None
+    return isinstance(error, dict) and error.get("code") in BATCH_UNSUPPORTED_CODES
+
+
+def _is_unbatched(node_url: str) -> bool:
+    marked_at = _unbatched_nodes.get(node_url)
+    if marked_at is None:
+        return False
+    if time.monotonic() - marked_at >= UNBATCHED_TTL:
+        del _unbatched_nodes[node_url]
+        return False
+    return True
+
+
+def _result(response: Dict) -> Any:
+    """Result of one JSON-RPC response, or the ClientError it carries."""
+    if "result" in response:
+        return response["result"]
+    error = response.get("error") or {}
+    return ClientError(
+        code=error.get("code"), message=error.get("message", str(response)), data=error.get("data")
+    )
+
+
+async def batch_request(
+    node_url: str,
+    requests: List[Tuple[str, Dict]],
+    session: Optional[aiohttp.ClientSession] = None,
+) -> List[Any]:
+    """
+    Sends (method, params) JSON-RPC requests in batches.
+    Returns one result per request, in order; a failed request yields
+    its ClientError instead of a result.
+    """
+    if not requests:
+        return []
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await batch_request(node_url, requests, session)
+
+    payloads = [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(requests)
+    ]
+    if _is_unbatched(node_url):
+        return await _request_each(session, node_url, payloads)
+
+    chunks = [
+        payloads[i : i + MAX_BATCH_SIZE] for i in range(0, len(payloads), MAX_BATCH_SIZE)
+    ]
+    responses = await asyncio.gather(
+        *[_post(session, node_url, c) for c in chunks], return_exceptions=True
+    )
+    if any(_batch_unsupported(r) for r in responses):
+        logging.info(f"JSON-RPC batches not supported by {node_url}, sending single requests")
+        _unbatched_nodes[node_url] = time.monotonic()
+        return await _request_each(session, node_url, payloads)
+
+    # Responses of a batch may come back in any order, a failed chunk fails its requests
+    results: Dict[Any, Any] = {}
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, list):
+            results.update((r.get("id"), _result(r)) for r in response)
+            continue
+        if isinstance(response, BaseException) and not isinstance(response, Exception):
+            raise response
+        error = response if isinstance(response, Exception) else _result(response)
+        results.update((p["id"], error) for p in chunk)
+    return [results.get(p["id"], _result({})) for p in payloads]
+
+
+async def _request_each(
+    session: aiohttp.ClientSession, node_url: str, payloads: List[Dict]
+) -> List[Any]:
+    responses = await asyncio.gather(
+        *[_post(session, node_url, p) for p in payloads], return_exceptions=True
+    )
+    return [r if isinstance(r, Exception) else _result(r) for r in responses]
+
+
+def _call_params(call: Call, block_id: Union[str, Dict]) -> Dict:
+    return {
+        "request": {
+            "contract_address": hex(call.to_addr),
+            "entry_point_selector": hex(call.selector),
+            "calldata": [hex(c) for c in call.calldata],
+        },
+        "block_id": block_id,
+    }
+
+
+async def batch_call(
+    client: FullNodeClient,
+    calls: List[Call],
+    block_id: Union[str, Dict] = "latest",
+    session: Optional[aiohttp.ClientSession] = None,
+) -> List[List[int]]:
+    """`client.call_contract` for many calls in one round trip, all against the same block."""
+    # Registry clients carry a pooled session
+    session = session or getattr(client, "session", None)
+    results = await batch_request(
+        client.url, [("starknet_call", _call_params(c, block_id)) for c in calls], session
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return [[int(felt, 16) for felt in result] for result in results]
+
+
+def to_signed(felt: int) -> int:
+    """Felts above half the field are negative values."""
+    return felt - FIELD_PRIME if felt > FIELD_PRIME // 2 else felt
+
+
+class BalanceQuery:
+    """
+    One balance to read: the ERC20 balance of `account` for `token`, or,
+    when `paraclear` is set, the Paraclear asset balance of `account` in `token`.
+    """
+
+    def __init__(self, account: Union[str, int], token: Union[str, int], paraclear=None):
+        self.account = int(account, 16) if isinstance(account, str) else account
+        self.token = int(token, 16) if isinstance(token, str) else token
+        self.paraclear = int(paraclear, 16) if isinstance(paraclear, str) else paraclear
+
+    def to_call(self) -> Call:
+        if self.paraclear is None:
+            return Call(
+                to_addr=self.token,
+                selector=get_selector_from_name("balanceOf"),
+                calldata=[self.account],
+            )
+        return Call(
+            to_addr=self.paraclear,
+            selector=get_selector_from_name("getTokenAssetBalance"),
+            calldata=[self.account, self.token],
+        )
+
+    def decode(self, result: List[int]) -> int:
+        if self.paraclear is None:
+            # Uint256 (low, high)
+            low, high = result
+            return (high << 128) + low
+        return to_signed(result[0])
+
+
+async def read_balances(
+    client: FullNodeClient,
+    queries: List[BalanceQuery],
+    session: Optional[aiohttp.ClientSession] = None,
+) -> List[int]:
+    """Raw balances of every query, read in one round trip."""
+    results = await batch_call(client, [q.to_call() for q in queries], session=session)
+    return [q.decode(r) for q, r in zip(queries, results)]
+
+
+async def read_fleet_balances(
+    client: FullNodeClient,
+    paradex_config: Dict,
+    accounts: List[str],
+    session: Optional[aiohttp.ClientSession] = None,
+) -> Dict[str, Dict[str, float]]:
+    """L2 USDC and Paraclear USDC balances of every account, in token units."""
+    token = paradex_config["bridged_tokens"][0]
+    paraclear_address = paradex_config["paraclear_address"]
+    queries = []
+    for account in accounts:
+        queries.append(BalanceQuery(account, token["l2_token_address"]))
+        queries.append(BalanceQuery(account, token["l2_token_address"], paraclear_address))
+    balances = await read_balances(client, queries, session)
+    return {
+        account: {
+            "usdc": balances[2 * i] / 10 ** token["decimals"],
+            "paraclear_usdc": balances[2 * i + 1] / 10 ** paradex_config["paraclear_decimals"],
+        }
+        for i, account in enumerate(accounts)
+    }
@@ -0,0 +1,147 @@
+"""
+Description:
+    Order latency tracing. Records span timings along the order path
+    (build, sign, encode, rate limiter wait, POST /orders) per order in a
+    bounded in-memory buffer, with percentile summaries and JSON lines
+    export. Orders are keyed by (client_id, signature_timestamp), and can
+    also be looked up by the exchange order id once it is known.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_MAX_ORDERS = 10_000
+
+TraceKey = Tuple[str, int]
+
+
+def order_trace_key(client_id: Optional[str], signature_timestamp) -> Optional[TraceKey]:
+    """
+    An order is identified by its client id and signature timestamp together,
+    the client id alone is optional and may be reused. None without a valid
+    timestamp: the order is then not traced.
+    """
+    try:
+        return (client_id or "", int(signature_timestamp))
+    except (TypeError, ValueError):
+        return None
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class OrderTrace:
+    def __init__(self, key: TraceKey):
+        self.key = key
+        self.order_id = ""
+        self.started_at = time.time()
+        self.origin_ns = time.perf_counter_ns()
+        # name -> (start offset, duration) in ns, relative to origin_ns
+        self.spans: Dict[str, tuple] = {}
+
+    def add_span(self, name: str, start_ns: int, end_ns: int) -> None:
+        self.spans[name] = (start_ns - self.origin_ns, end_ns - start_ns)
+
+    def to_dict(self) -> Dict:
+        client_id, signature_timestamp = self.key
+        return {
+            "client_id": client_id,
+            "signature_timestamp": signature_timestamp,
+            "order_id": self.order_id,
+            "started_at": self.started_at,
+            "spans_ms": {
+                name: {"start": start / 1e6, "duration": duration / 1e6}
+                for name, (start, duration) in self.spans.items()
+            },
+        }
+
+
+class OrderTracer:
+    def __init__(self, max_orders: int = DEFAULT_MAX_ORDERS):
+        self.max_orders = max_orders
+        self._traces: "OrderedDict[TraceKey, OrderTrace]" = OrderedDict()
+        self._order_ids: Dict[str, TraceKey] = {}
+
+    def _trace(self, key: TraceKey) -> OrderTrace:
+        trace = self._traces.get(key)
+        if trace is None:
+            trace = OrderTrace(key)
+            self._traces[key] = trace
+            while len(self._traces) > self.max_orders:
+                _, evicted = self._traces.popitem(last=False)
+                self._order_ids.pop(evicted.order_id, None)
+        return trace
+
+    def _lookup(self, key: Union[TraceKey, str]) -> Optional[OrderTrace]:
+        # A trace key, or the exchange order id of a linked trace
+        if isinstance(key, str):
+            key = self._order_ids.get(key)
+        return None if key is None else self._traces.get(key)
+
+    @contextmanager
+    def span(self, key: Optional[TraceKey], name: str):
+        if key is None:
+            yield
+            return
+        trace = self._trace(key)
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            trace.add_span(name, start_ns, time.perf_counter_ns())
+
+    def link(self, key: Optional[TraceKey], order_id: str) -> None:
+        """Associates the exchange order id returned by POST /orders with a trace."""
+        if key is None or not order_id:
+            return
+        trace = self._trace(key)
+        trace.order_id = order_id
+        self._order_ids[order_id] = key
+
+    def get(self, key: Union[TraceKey, str]) -> Optional[Dict]:
+        trace = self._lookup(key)
+        return None if trace is None else trace.to_dict()
+
+    def summary(self) -> Dict[str, Dict]:
+        """Count, mean, p50 and p99 in ms per span."""
+        samples: Dict[str, List[float]] = {}
+        for trace in self._traces.values():
+            for name, (_, duration) in trace.spans.items():
+                samples.setdefault(name, []).append(duration / 1e6)
+        return {
+            name: {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values),
+                "p50_ms": _percentile(values, 50),
+                "p99_ms": _percentile(values, 99),
+            }
+            for name, values in samples.items()
+        }
+
+    def export_jsonl(self, path: str) -> int:
+        """Appends one JSON line per traced order to `path`, returns the count."""
+        with open(path, "a") as f:
+            for trace in self._traces.values():
+                f.write(json.dumps(trace.to_dict()) + "\n")
+        logging.info(f"Exported {len(self._traces)} order traces to {path}")
+        return len(self._traces)
+
+    def clear(self) -> None:
+        self._traces.clear()
+        self._order_ids.clear()
+
+
+_tracer: Optional[OrderTracer] = None
+
+
+def get_tracer() -> OrderTracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = OrderTracer()
+    return _tracer
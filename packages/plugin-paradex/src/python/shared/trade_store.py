@@ -0,0 +1,275 @@
+"""
+Description:
+    Append-only columnar storage for trade and fill history.
+    Records are written as compressed Parquet files partitioned by market
+    and UTC day, so a single column over a time range can be read without
+    parsing the whole history. Records are deduplicated by id when they
+    are appended, and fills carry the account they belong to.
+
+    Layout: <root>/<kind>/market=<market>/date=<YYYY-MM-DD>/part-<ms>-<n>.parquet
+"""
+import itertools
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_DATA_DIR = os.getenv("PARADEX_DATA_DIR", "data")
+COMPRESSION = "zstd"
+
+# Market trades as returned by [GET] /trades
+TRADE_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("market", pa.string()),
+        ("side", pa.string()),
+        ("size", pa.float64()),
+        ("price", pa.float64()),
+        ("trade_type", pa.string()),
+        ("created_at", pa.int64()),
+    ]
+)
+
+# Account fills as returned by [GET] /fills, with the account they were synced for
+FILL_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("account", pa.string()),
+        ("market", pa.string()),
+        ("order_id", pa.string()),
+        ("client_id", pa.string()),
+        ("side", pa.string()),
+        ("liquidity", pa.string()),
+        ("fill_type", pa.string()),
+        ("size", pa.float64()),
+        ("price", pa.float64()),
+        ("fee", pa.float64()),
+        ("fee_currency", pa.string()),
+        ("realized_pnl", pa.float64()),
+        ("realized_funding", pa.float64()),
+        ("created_at", pa.int64()),
+    ]
+)
+
+
+def _day(created_at_ms: int) -> str:
+    return datetime.fromtimestamp(created_at_ms / 1000, tz=timezone.utc).date().isoformat()
+
+
+def _convert(value, field: pa.Field):
+    if value is None or value == "":
+        return None
+    if pa.types.is_floating(field.type):
+        return float(value)
+    if pa.types.is_integer(field.type):
+        return int(value)
+    return str(value)
+
+
+class ColumnarStore:
+    def __init__(self, root: str, kind: str, schema: pa.Schema):
+        self.root = os.path.join(root, kind)
+        self.kind = kind
+        self.schema = schema
+        self._seq = itertools.count()
+
+    def _partition_dir(self, market: str, day: str) -> str:
+        return os.path.join(self.root, f"market={market}", f"date={day}")
+
+    def _to_table(self, records: List[Dict]) -> pa.Table:
+        columns = {
+            field.name: pa.array(
+                [_convert(r.get(field.name), field) for r in records], field.type
+            )
+            for field in self.schema
+        }
+        return pa.table(columns, schema=self.schema)
+
+    def _partition_files(self, directory: str) -> List[str]:
+        if not os.path.isdir(directory):
+            return []
+        return [
+            os.path.join(directory, f)
+            for f in sorted(os.listdir(directory))
+            if f.endswith(".parquet")
+        ]
+
+    def _stored_ids(self, directory: str) -> set:
+        files = self._partition_files(directory)
+        if not files:
+            return set()
+        table = ds.dataset(files, schema=self.schema, format="parquet").to_table(columns=["id"])
+        return set(table.column("id").to_pylist())
+
+    def _write(self, directory: str, table: pa.Table) -> str:
+        name = f"part-{int(time.time() * 1000)}-{next(self._seq)}.parquet"
+        path = os.path.join(directory, name)
+        # Write then rename so that readers never see a partial file
+        pq.write_table(table, path + ".tmp", compression=COMPRESSION)
+        os.replace(path + ".tmp", path)
+        return path
+
+    def append(self, records: Iterable[Dict], account: Optional[str] = None) -> int:
+        """
+        Appends records, one new file per touched partition. Records whose id is
+        already stored in their partition, or repeated in `records`, are skipped.
+        `account` fills the account column of stores that have one.
+        Existing files are never rewritten. Returns the number of records written.
+        """
+        with_account = account is not None and "account" in self.schema.names
+        partitions: Dict[tuple, List[Dict]] = {}
+        for record in records:
+            if with_account:
+                record = {**record, "account": account}
+            key = (record["market"], _day(int(record["created_at"])))
+            partitions.setdefault(key, []).append(record)
+
+        written = 0
+        for (market, day), rows in partitions.items():
+            directory = self._partition_dir(market, day)
+            seen = self._stored_ids(directory)
+            unique = []
+            for row in rows:
+                if row["id"] not in seen:
+                    seen.add(row["id"])
+                    unique.append(row)
+            if not unique:
+                continue
+            os.makedirs(directory, exist_ok=True)
+            table = self._to_table(unique).sort_by("created_at")
+            self._write(directory, table)
+            written += len(unique)
+        logging.debug(f"{self.kind}: appended {written} records to {len(partitions)} partitions")
+        return written
+
+    def markets(self, account: Optional[str] = None) -> List[str]:
+        """Stored markets, or only those with records of `account`."""
+        if not os.path.isdir(self.root):
+            return []
+        markets = sorted(
+            d.split("=", 1)[1] for d in os.listdir(self.root) if d.startswith("market=")
+        )
+        if account is None:
+            return markets
+        table = self.read(["market"], account=account)
+        return sorted(set(table.column("market").to_pylist()))
+
+    def files(
+        self,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> List[str]:
+        """Data files of the partitions overlapping [start_ms, end_ms)."""
+        start_day = _day(start_ms) if start_ms is not None else None
+        end_day = _day(end_ms - 1) if end_ms is not None else None
+        files = []
+        for m in [market] if market else self.markets():
+            market_dir = os.path.join(self.root, f"market={m}")
+            if not os.path.isdir(market_dir):
+                continue
+            for date_dir in sorted(os.listdir(market_dir)):
+                day = date_dir.split("=", 1)[1]
+                if (start_day and day < start_day) or (end_day and day > end_day):
+                    continue
+                files.extend(self._partition_files(os.path.join(market_dir, date_dir)))
+        return files
+
+    def read(
+        self,
+        columns: Optional[List[str]] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        account: Optional[str] = None,
+    ) -> pa.Table:
+        """
+        Reads `columns` of the records with start_ms <= created_at < end_ms,
+        only those of `account` when it is given.
+        """
+        files = self.files(market, start_ms, end_ms)
+        if not files:
+            return self.schema.empty_table().select(columns or self.schema.names)
+        dataset = ds.dataset(files, schema=self.schema, format="parquet")
+        conditions = []
+        if start_ms is not None:
+            conditions.append(ds.field("created_at") >= start_ms)
+        if end_ms is not None:
+            conditions.append(ds.field("created_at") < end_ms)
+        if account is not None:
+            conditions.append(ds.field("account") == account)
+        condition = None
+        for c in conditions:
+            condition = c if condition is None else condition & c
+        table = dataset.to_table(columns=columns, filter=condition)
+        if "created_at" in table.column_names:
+            table = table.sort_by("created_at")
+        return table
+
+    def column(
+        self,
+        name: str,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        account: Optional[str] = None,
+    ) -> np.ndarray:
+        """One column as a NumPy array, ordered by created_at."""
+        columns = [name] if name == "created_at" else [name, "created_at"]
+        table = self.read(columns, market, start_ms, end_ms, account)
+        return table.column(name).to_numpy(zero_copy_only=False)
+
+    def count(self, market: Optional[str] = None) -> int:
+        return sum(pq.ParquetFile(f).metadata.num_rows for f in self.files(market))
+
+    def compact(self, market: str, day: str) -> int:
+        """
+        Merges the files of one partition into a single file, deduplicated by id.
+        Every sync appends one file per page and partition, compacting keeps the
+        number of files read per partition low. Returns the number of files left.
+        """
+        directory = self._partition_dir(market, day)
+        files = self._partition_files(directory)
+        if len(files) < 2:
+            return len(files)
+        table = ds.dataset(files, schema=self.schema, format="parquet").to_table()
+        _, first = np.unique(table.column("id").to_numpy(zero_copy_only=False), return_index=True)
+        table = table.take(pa.array(np.sort(first))).sort_by("created_at")
+        self._write(directory, table)
+        for f in files:
+            os.remove(f)
+        return 1
+
+    def compact_range(
+        self, market: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None
+    ) -> int:
+        """Compacts the partitions of `market` overlapping [start_ms, end_ms), returns how many."""
+        files_per_day: Dict[str, int] = {}
+        for f in self.files(market, start_ms, end_ms):
+            day = os.path.basename(os.path.dirname(f)).split("=", 1)[1]
+            files_per_day[day] = files_per_day.get(day, 0) + 1
+        compacted = [day for day, count in files_per_day.items() if count > 1]
+        for day in compacted:
+            self.compact(market, day)
+        return len(compacted)
+
+
+def open_trade_store(root: str = DEFAULT_DATA_DIR) -> ColumnarStore:
+    return ColumnarStore(root, "trades", TRADE_SCHEMA)
+
+
+def open_fill_store(root: str = DEFAULT_DATA_DIR) -> ColumnarStore:
+    return ColumnarStore(root, "fills", FILL_SCHEMA)
+
+
+def day_range_ms(day: str, days: int = 1) -> tuple:
+    """[start, end) in ms of `days` UTC days starting at `day` (YYYY-MM-DD)."""
+    start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+    end = start + timedelta(days=days)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
@@ -0,0 +1,227 @@
+"""
+Description:
+    Local index of the account transfer history ([GET] /account/transfers).
+    Transfers are kept in SQLite, indexed by kind, token and time, and are
+    synced incrementally: a sync only requests transfers created since the
+    watermark, or since the oldest transfer still in flight, whose status
+    may have changed since the last sync.
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from .pagination import iter_pages
+from .rate_limiter import EndpointClass
+from .trade_store import DEFAULT_DATA_DIR
+
+TRANSFERS_DB = "transfers.sqlite"
+DEFAULT_PAGE_SIZE = 1000
+# Transfers in these states will not change anymore
+FINAL_STATUSES = ("COMPLETED", "FAILED")
+SETTLE_DELAY_MS = 5_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    id TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    token TEXT NOT NULL,
+    amount REAL NOT NULL,
+    created_at INTEGER NOT NULL,
+    last_updated_at INTEGER,
+    txn_hash TEXT,
+    external_txn_hash TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transfers_kind ON transfers (account, kind, created_at);
+CREATE INDEX IF NOT EXISTS transfers_token ON transfers (account, token, created_at);
+CREATE INDEX IF NOT EXISTS transfers_time ON transfers (account, created_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account TEXT PRIMARY KEY,
+    synced_until INTEGER,
+    pending TEXT
+);
+"""
+
+
+class TransferStore:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def upsert(self, transfers: List[Dict], account: Optional[str] = None) -> int:
+        """
+        Inserts new transfers and updates the status of known ones,
+        indexed under `account` when given.
+        """
+        rows = [
+            (
+                t["id"],
+                t.get("account", "") if account is None else account,
+                t.get("kind", ""),
+                t.get("status", ""),
+                t.get("token", ""),
+                float(t.get("amount") or 0),
+                int(t["created_at"]),
+                int(t["last_updated_at"]) if t.get("last_updated_at") else None,
+                t.get("txn_hash"),
+                t.get("external_txn_hash"),
+                json.dumps(t),
+            )
+            for t in transfers
+        ]
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def query(
+        self,
+        account: Optional[str] = None,
+        kind: Optional[str] = None,
+        token: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> List[Dict]:
+        """Transfers matching every given filter, oldest first, as returned by the API."""
+        conditions, params = self._conditions(account, kind, token, status, start_ms, end_ms)
+        rows = self._db.execute(
+            f"SELECT record FROM transfers {conditions} ORDER BY created_at", params
+        )
+        return [json.loads(row["record"]) for row in rows]
+
+    def totals(
+        self,
+        account: Optional[str] = None,
+        token: Optional[str] = None,
+        status: Optional[str] = "COMPLETED",
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """Sum of the transfer amounts per token and kind, e.g. for deposit reconciliation."""
+        conditions, params = self._conditions(account, None, token, status, start_ms, end_ms)
+        rows = self._db.execute(
+            f"SELECT token, kind, SUM(amount) AS amount FROM transfers {conditions}"
+            " GROUP BY token, kind",
+            params,
+        )
+        totals: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            totals.setdefault(row["token"], {})[row["kind"]] = row["amount"]
+        return totals
+
+    @staticmethod
+    def _conditions(account, kind, token, status, start_ms, end_ms):
+        clauses, params = [], []
+        filters = (("account", account), ("kind", kind), ("token", token), ("status", status))
+        for column, value in filters:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start_ms is not None:
+            clauses.append("created_at >= ?")
+            params.append(start_ms)
+        if end_ms is not None:
+            clauses.append("created_at < ?")
+            params.append(end_ms)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def sync_state(self, account: str) -> Dict:
+        row = self._db.execute(
+            "SELECT synced_until, pending FROM sync_state WHERE account = ?", (account,)
+        ).fetchone()
+        if row is None:
+            return {"synced_until": None, "pending": None}
+        return {
+            "synced_until": row["synced_until"],
+            "pending": json.loads(row["pending"]) if row["pending"] else None,
+        }
+
+    def save_sync_state(self, account: str, synced_until: Optional[int], pending: Optional[Dict]):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                (account, synced_until, json.dumps(pending) if pending else None),
+            )
+
+    def resume_point(self, account: str) -> Optional[int]:
+        """Oldest creation time whose transfers may be new or not final yet."""
+        synced_until = self.sync_state(account)["synced_until"]
+        if synced_until is None:
+            return None
+        row = self._db.execute(
+            "SELECT MIN(created_at) AS created_at FROM transfers"
+            f" WHERE account = ? AND status NOT IN ({', '.join('?' * len(FINAL_STATUSES))})",
+            (account, *FINAL_STATUSES),
+        ).fetchone()
+        if row["created_at"] is not None:
+            return min(row["created_at"], synced_until)
+        return synced_until
+
+
+def open_transfer_store(root: str = DEFAULT_DATA_DIR) -> TransferStore:
+    return TransferStore(os.path.join(root, TRANSFERS_DB))
+
+
+async def sync_transfers(
+    session: aiohttp.ClientSession,
+    paradex_http_url: str,
+    paradex_jwt: str,
+    account: str,
+    store: TransferStore,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> int:
+    """
+    Fetches the transfers of `account` created since the resume point and
+    upserts them page by page. The cursor is saved after every page, so
+    an interrupted sync resumes where it stopped. Returns the number of
+    transfers fetched.
+    """
+    state = store.sync_state(account)
+    pending = state["pending"]
+    if pending is None:
+        pending = {
+            "start_at": store.resume_point(account),
+            "end_at": int(time.time() * 1000) - SETTLE_DELAY_MS,
+            "cursor": None,
+            "fetched": 0,
+        }
+    else:
+        logging.info(f"Resuming transfers sync of {account} at cursor {pending['cursor']}")
+
+    params = {"end_at": pending["end_at"], "page_size": page_size}
+    if pending["start_at"] is not None:
+        params["start_at"] = pending["start_at"]
+    headers = {"Authorization": f"Bearer {paradex_jwt}"}
+
+    async for transfers, next_cursor in iter_pages(
+        session,
+        paradex_http_url + "/account/transfers",
+        headers,
+        params,
+        pending["cursor"],
+        EndpointClass.PRIVATE,
+        raise_on_error=True,
+    ):
+        store.upsert(transfers, account)
+        pending["fetched"] += len(transfers)
+        pending["cursor"] = next_cursor
+        store.save_sync_state(account, state["synced_until"], pending)
+
+    store.save_sync_state(account, pending["end_at"], None)
+    logging.info(f"Synced {pending['fetched']} transfers of {account} up to {pending['end_at']}")
+    return pending["fetched"]
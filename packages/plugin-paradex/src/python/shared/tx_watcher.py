@@ -0,0 +1,211 @@
+"""
+Description:
+    Multiplexed transaction receipt watcher.
+    One background task tracks any number of transaction hashes: every
+    tick, the receipts of the transactions that are due are fetched in a
+    single JSON-RPC batch. Each transaction backs off on its own, tightly
+    while waiting for ACCEPTED_ON_L2 and loosely during the multi-hour wait
+    for ACCEPTED_ON_L1, and exposes one future per finality status.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import aiohttp
+from starknet_py.net.client_models import Hash, TransactionFinalityStatus
+from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.transaction_errors import (
+    TransactionNotReceivedError,
+    TransactionRejectedError,
+    TransactionRevertedError,
+)
+
+from helpers.nonce_manager import NonceManager
+
+from .rpc_batch import batch_request
+
+# (first interval, maximum interval) in seconds while waiting for each status
+L2_INTERVALS = (1.0, 10.0)
+L1_INTERVALS = (30.0, 600.0)
+BACKOFF_FACTOR = 1.5
+# A transaction still unknown to the node after this long is reported as not received
+NOT_RECEIVED_TIMEOUT = 600.0
+
+TxResult = Tuple[int, TransactionFinalityStatus]
+
+
+class WatchedTx:
+    def __init__(self, tx_hash: int, until_l1: bool, nonces: Optional[NonceManager] = None):
+        loop = asyncio.get_running_loop()
+        self.tx_hash = tx_hash
+        self.until_l1 = until_l1
+        # Nonces of the sending account, confirmed once the transaction is accepted on L2
+        self.nonces = nonces
+        # Both resolve to (block number, finality status)
+        self.l2: "asyncio.Future[TxResult]" = loop.create_future()
+        self.l1: "asyncio.Future[TxResult]" = loop.create_future()
+        self.submitted_at = time.monotonic()
+        self.interval = L2_INTERVALS[0]
+        self.next_check = time.monotonic()
+
+    def backoff(self) -> None:
+        maximum = L1_INTERVALS[1] if self.l2.done() else L2_INTERVALS[1]
+        self.interval = min(self.interval * BACKOFF_FACTOR, maximum)
+        self.next_check = time.monotonic() + self.interval
+
+    def fail(self, err: Exception) -> None:
+        logging.warning(f"Transaction {hex(self.tx_hash)} failed: {err}")
+        for future in (self.l2, self.l1):
+            if not future.done():
+                future.set_exception(err)
+                # Marked as retrieved: a caller may only await one of the two
+                future.exception()
+
+    def settle_nonce(self, included: bool) -> None:
+        """
+        Reports a final status to the nonce manager of the sending account: the
+        nonce of an included transaction, even reverted, is used, the nonce of
+        a rejected or lost one is discarded and resynced from the chain.
+        """
+        if self.nonces is None:
+            return
+        nonce = self.nonces.nonce_of(self.tx_hash)
+        if nonce is None:
+            return
+        if included:
+            self.nonces.confirmed(nonce)
+        else:
+            self.nonces.discard(nonce)
+
+    def is_finished(self) -> bool:
+        return self.l1.done() or (self.l2.done() and not self.until_l1)
+
+
+class TxWatcher:
+    def __init__(self, client: FullNodeClient, session: Optional[aiohttp.ClientSession] = None):
+        self.client = client
+        self.session = session
+        self._txs: Dict[int, WatchedTx] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Registry key, set by get_tx_watcher
+        self._key: Optional[Tuple[str, int]] = None
+        self.ticks = 0
+        self.receipts_fetched = 0
+
+    def watch(
+        self, tx_hash: Hash, until_l1: bool = False, nonces: Optional[NonceManager] = None
+    ) -> WatchedTx:
+        """
+        Starts tracking a transaction, returns its futures. With the nonce manager
+        of the sending account, its nonce is confirmed on L2 acceptance.
+        """
+        tx_hash = int(tx_hash, 16) if isinstance(tx_hash, str) else tx_hash
+        tx = self._txs.get(tx_hash)
+        if tx is None:
+            tx = WatchedTx(tx_hash, until_l1, nonces)
+            self._txs[tx_hash] = tx
+        else:
+            tx.until_l1 = tx.until_l1 or until_l1
+            tx.nonces = tx.nonces or nonces
+        if self._task is None or self._task.done():
+            if self._key is not None:
+                _watchers.setdefault(self._key, self)
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+        return tx
+
+    async def wait_for_l2(self, tx_hash: Hash, nonces: Optional[NonceManager] = None) -> TxResult:
+        return await self.watch(tx_hash, nonces=nonces).l2
+
+    async def wait_for_l1(self, tx_hash: Hash) -> TxResult:
+        return await self.watch(tx_hash, until_l1=True).l1
+
+    async def _run(self) -> None:
+        try:
+            while self._txs:
+                now = time.monotonic()
+                due = [tx for tx in self._txs.values() if tx.next_check <= now]
+                if due:
+                    await self._check(due)
+                    for tx_hash in [h for h, tx in self._txs.items() if tx.is_finished()]:
+                        del self._txs[tx_hash]
+                    continue
+                delay = min(tx.next_check for tx in self._txs.values()) - now
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Idle watchers leave the registry, so that finished loops are not kept
+            if self._key is not None and _watchers.get(self._key) is self:
+                del _watchers[self._key]
+
+    async def _check(self, due) -> None:
+        self.ticks += 1
+        requests = [
+            ("starknet_getTransactionReceipt", {"transaction_hash": hex(tx.tx_hash)}) for tx in due
+        ]
+        try:
+            session = self.session or getattr(self.client, "session", None)
+            receipts = await batch_request(self.client.url, requests, session)
+        except Exception as err:
+            logging.warning(f"Unable to fetch {len(due)} transaction receipts: {err}")
+            for tx in due:
+                tx.backoff()
+            return
+        self.receipts_fetched += len(due)
+        for tx, receipt in zip(due, receipts):
+            self._update(tx, receipt)
+
+    def _update(self, tx: WatchedTx, receipt: Union[Dict, Exception]) -> None:
+        if isinstance(receipt, Exception):
+            # Not known by the node yet
+            if time.monotonic() - tx.submitted_at > NOT_RECEIVED_TIMEOUT:
+                tx.settle_nonce(included=False)
+                tx.fail(TransactionNotReceivedError())
+            else:
+                tx.backoff()
+            return
+
+        if receipt.get("execution_status") == "REVERTED":
+            tx.settle_nonce(included=True)
+            tx.fail(TransactionRevertedError(message=receipt.get("revert_reason")))
+            return
+        status = receipt.get("finality_status")
+        if status == "REJECTED":
+            tx.settle_nonce(included=False)
+            tx.fail(TransactionRejectedError())
+            return
+
+        block_number = receipt.get("block_number")
+        if status in ("ACCEPTED_ON_L2", "ACCEPTED_ON_L1") and block_number is not None:
+            if not tx.l2.done():
+                logging.info(f"Transaction {hex(tx.tx_hash)} accepted on L2")
+                tx.l2.set_result((block_number, TransactionFinalityStatus(status)))
+                tx.settle_nonce(included=True)
+                tx.interval = L1_INTERVALS[0] / BACKOFF_FACTOR
+            if status == "ACCEPTED_ON_L1" and not tx.l1.done():
+                logging.info(f"Transaction {hex(tx.tx_hash)} accepted on L1")
+                tx.l1.set_result((block_number, TransactionFinalityStatus(status)))
+        tx.backoff()
+
+    def pending(self) -> int:
+        return len(self._txs)
+
+
+_watchers: Dict[Tuple[str, int], TxWatcher] = {}
+
+
+def get_tx_watcher(client: FullNodeClient) -> TxWatcher:
+    """One watcher per node and event loop, while it has transactions to watch."""
+    key = (client.url, id(asyncio.get_running_loop()))
+    watcher = _watchers.get(key)
+    if watcher is None:
+        watcher = TxWatcher(client)
+        watcher._key = key
+        _watchers[key] = watcher
+    return watcher
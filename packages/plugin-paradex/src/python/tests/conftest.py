@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts import `shared` and `helpers` from the python source directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
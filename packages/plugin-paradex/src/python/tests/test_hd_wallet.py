@@ -0,0 +1,36 @@
+from eth_account import Account as EthAccount
+
+from shared.hd_wallet import DEFAULT_BASE_PATH, HDWallet, get_hd_wallet
+
+# BIP-39 test mnemonic
+MNEMONIC = "test test test test test test test test test test test junk"
+
+EthAccount.enable_unaudited_hdwallet_features()
+
+
+def from_mnemonic(index: int, base_path: str = DEFAULT_BASE_PATH, passphrase: str = ""):
+    account = EthAccount.from_mnemonic(
+        MNEMONIC, passphrase=passphrase, account_path=f"{base_path}/{index}"
+    )
+    return account.address, account.key.hex()
+
+
+def test_accounts_match_eth_account():
+    indices = [0, 1, 2, 17, 500]
+    accounts = HDWallet.from_mnemonic(MNEMONIC).accounts(indices)
+    assert accounts == [from_mnemonic(i) for i in indices]
+    # Hardhat's first default account
+    assert accounts[0][0] == "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+
+
+def test_other_paths_and_passphrases_match_eth_account():
+    wallet = HDWallet.from_mnemonic(MNEMONIC, passphrase="paradex")
+    base_path = "m/44'/60'/1'/0"
+    assert wallet.accounts([0, 3], base_path) == [
+        from_mnemonic(i, base_path, "paradex") for i in (0, 3)
+    ]
+
+
+def test_wallets_are_shared_per_mnemonic():
+    assert get_hd_wallet(MNEMONIC) is get_hd_wallet(MNEMONIC)
+    assert get_hd_wallet(MNEMONIC) is not get_hd_wallet(MNEMONIC, "paradex")
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import shared.history_sync as history_sync
+from shared.history_sync import open_watermarks, sync_history
+from shared.trade_store import day_range_ms, open_fill_store
+
+MARKET = "ETH-USD-PERP"
+ACCOUNT = "0xa"
+T0 = day_range_ms("2024-05-01")[0]
+
+
+def fill(i):
+    return {
+        "id": f"f{i}",
+        "market": MARKET,
+        "side": "BUY",
+        "size": "1",
+        "price": "100",
+        "created_at": T0 + i,
+    }
+
+
+class FakeServer:
+    """Pages of `page_size` fills, the cursor is the index of the next page."""
+
+    def __init__(self, fills, page_size, fail_after=None):
+        self.pages = [fills[i : i + page_size] for i in range(0, len(fills), page_size)]
+        self.fail_after = fail_after
+        self.served = []
+
+    async def iter_pages(self, session, url, headers, params, cursor, endpoint_class, **kwargs):
+        index = int(cursor or 0)
+        while index < len(self.pages):
+            if self.fail_after is not None and len(self.served) >= self.fail_after:
+                self.fail_after = None
+                raise ConnectionError("connection lost")
+            self.served.append(index)
+            next_cursor = str(index + 1) if index + 1 < len(self.pages) else None
+            yield self.pages[index], next_cursor
+            index += 1
+
+
+def sync(store, watermarks):
+    return asyncio.run(
+        sync_history(None, "http://x", "jwt", "/fills", MARKET, ACCOUNT, store, watermarks)
+    )
+
+
+def test_interrupted_sync_resumes_at_its_cursor(tmp_path, monkeypatch):
+    store = open_fill_store(str(tmp_path))
+    server = FakeServer([fill(i) for i in range(10)], page_size=3, fail_after=2)
+    monkeypatch.setattr(history_sync, "iter_pages", server.iter_pages)
+
+    with pytest.raises(ConnectionError):
+        sync(store, open_watermarks(store))
+    assert server.served == [0, 1]
+    pending = open_watermarks(store).get(ACCOUNT, MARKET)["pending"]
+    assert pending["cursor"] == "2" and pending["stored"] == 6
+
+    # A new run, as after a restart, continues from the saved cursor
+    assert sync(store, open_watermarks(store)) == 10
+    assert server.served == [0, 1, 2, 3]
+    watermark = open_watermarks(store).get(ACCOUNT, MARKET)
+    assert watermark["pending"] is None and watermark["last_id"] == "f9"
+    assert store.column("id").tolist() == [f"f{i}" for i in range(10)]
+    # The files appended page by page were merged
+    assert len(store.files(MARKET)) == 1
+
+
+def test_page_fetched_twice_is_stored_once(tmp_path, monkeypatch):
+    store = open_fill_store(str(tmp_path))
+    server = FakeServer([fill(i) for i in range(6)], page_size=3)
+    monkeypatch.setattr(history_sync, "iter_pages", server.iter_pages)
+    watermarks = open_watermarks(store)
+
+    # Interrupted after storing page 0 but before its cursor was saved
+    store.append(server.pages[0], ACCOUNT)
+    watermarks.get(ACCOUNT, MARKET)["pending"] = {
+        "start_at": None,
+        "end_at": T0 + 1000,
+        "cursor": None,
+        "newest_id": None,
+        "newest_created_at": None,
+        "end_ids": [],
+        "stored": 0,
+    }
+
+    assert sync(store, watermarks) == 3
+    assert store.column("id").tolist() == [f"f{i}" for i in range(6)]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from shared.json_stream import JsonResultsParser, read_json
+
+BODY = {
+    "next": "cursor=é",
+    "results": [
+        {"id": "1", "size": "0.5", "price": 1234.5, "tags": ["a", "b"], "ok": True},
+        {"id": "2", "nested": {"x": [1, 2, {"y": None}]}, "n": -12e3},
+        42,
+        "naïve ✓",
+    ],
+    "prev": None,
+    "total": 12,
+}
+
+
+def parse(body: bytes, chunk_size: int):
+    parser = JsonResultsParser()
+    elements = []
+    for i in range(0, len(body), chunk_size):
+        elements.extend(parser.feed(body[i : i + chunk_size]))
+    return elements, parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 10_000])
+def test_chunked_body_matches_json_loads(chunk_size):
+    raw = json.dumps(BODY, ensure_ascii=False).encode()
+    elements, members = parse(raw, chunk_size)
+    assert elements == BODY["results"]
+    assert members == {**BODY, "results": None}
+
+
+def test_every_split_point():
+    raw = json.dumps(BODY, indent=1, ensure_ascii=False).encode()
+    for split in range(1, len(raw)):
+        parser = JsonResultsParser()
+        elements = parser.feed(raw[:split]) + parser.feed(raw[split:])
+        assert elements == BODY["results"], split
+        assert parser.close()["total"] == 12
+
+
+def test_numbers_cut_by_a_chunk_boundary():
+    elements, members = parse(b'{"results": [123456, 7.25e-3], "total": 98765}', 4)
+    assert elements == [123456, 7.25e-3]
+    assert members["total"] == 98765
+
+
+def test_elements_are_returned_as_they_complete():
+    parser = JsonResultsParser()
+    assert parser.feed(b'{"results": [{"id": 1}, {"id"') == [{"id": 1}]
+    assert parser.feed(b': 2}]}') == [{"id": 2}]
+    assert parser.close() == {"results": None}
+
+
+def test_other_key_and_empty_list():
+    parser = JsonResultsParser("markets")
+    assert parser.feed(b'{"results": [1], "markets": []}') == []
+    assert parser.close() == {"results": [1], "markets": None}
+
+
+def test_non_object_body_is_decoded_whole():
+    elements, body = parse(b'[{"id": 1}, {"id": 2}]', 5)
+    assert elements == [] and body == [{"id": 1}, {"id": 2}]
+
+
+@pytest.mark.parametrize("raw", [b'{"results": [1, 2', b'{"results": [1] 2}', b'{"a" 1}'])
+def test_malformed_bodies_raise(raw):
+    parser = JsonResultsParser()
+    with pytest.raises(ValueError):
+        parser.feed(raw)
+        parser.close()
+
+
+class FakeContent:
+    def __init__(self, raw: bytes):
+        self.raw = raw
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.raw), 5):
+            yield self.raw[i : i + 5]
+
+
+class FakeResponse:
+    def __init__(self, raw: bytes):
+        self.content = FakeContent(raw)
+
+
+def test_read_json_is_a_drop_in_for_response_json():
+    raw = json.dumps(BODY).encode()
+    assert asyncio.run(read_json(FakeResponse(raw))) == BODY
+    error = {"error": "NOT_FOUND", "message": "no results"}
+    assert asyncio.run(read_json(FakeResponse(json.dumps(error).encode()))) == error
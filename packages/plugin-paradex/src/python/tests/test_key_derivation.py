@@ -0,0 +1,74 @@
+import hashlib
+import random
+
+from eth_account import Account as EthAccount
+from eth_account.messages import encode_structured_data
+from starknet_py.constants import EC_ORDER
+
+from helpers.key_derivation import (
+    derive_stark_key,
+    derive_stark_keys,
+    grind_key,
+    grind_keys,
+    private_key_from_eth_signature,
+    stark_key_message,
+)
+
+CHAIN_ID = 11155111
+
+
+def legacy_grind_key(key_seed: int, key_value_limit: int) -> int:
+    # The hex string implementation grind_key replaced
+    max_allowed_value = 2**256 - (2**256 % key_value_limit)
+    current_index = 0
+
+    def indexed_sha256(seed: int, index: int) -> int:
+        def padded_hex(x: int) -> str:
+            hex_str = hex(x)[2:]
+            return hex_str if len(hex_str) % 2 == 0 else "0" + hex_str
+
+        digest = hashlib.sha256(bytes.fromhex(padded_hex(seed) + padded_hex(index))).hexdigest()
+        return int(digest, 16)
+
+    key = indexed_sha256(seed=key_seed, index=current_index)
+    while key >= max_allowed_value:
+        current_index += 1
+        key = indexed_sha256(seed=key_seed, index=current_index)
+    return key % key_value_limit
+
+
+def legacy_derive_stark_key(eth_private_key: str) -> int:
+    encoded = encode_structured_data(primitive=stark_key_message(CHAIN_ID))
+    signature = EthAccount.sign_message(encoded, eth_private_key).signature.hex()
+    return legacy_grind_key(int(signature[2 : 64 + 2], 16), EC_ORDER)
+
+
+def test_starkware_key_derivation_vector():
+    # Test vector of StarkWare's key_derivation.js
+    eth_signature = (
+        "0x21fbf0696d5e0aa2ef41a2b4ffb623bcaf070461d61cf7251c74161f82fec3a4"
+        "370854bc0a34b3ab487c1bc021cd318c734c51ae29374f2beb0e6f2dd49b4bf41c"
+    )
+    assert private_key_from_eth_signature(eth_signature) == int(
+        "766f11e90cd7c7b43085b56da35c781f8c067ac0d578eabdceebc4886435bda", 16
+    )
+
+
+def test_grind_key_matches_the_previous_implementation():
+    rng = random.Random(0)
+    seeds = [rng.getrandbits(256) for _ in range(1000)] + [0, 1, 255, 256, 2**256 - 1]
+    expected = [legacy_grind_key(s, EC_ORDER) for s in seeds]
+    assert grind_keys(seeds) == expected
+    assert [grind_key(s) for s in seeds[:10]] == expected[:10]
+    # Another limit, where the rejection loop runs much more often
+    assert [grind_key(s, 3 * 2**254) for s in seeds[:50]] == [
+        legacy_grind_key(s, 3 * 2**254) for s in seeds[:50]
+    ]
+
+
+def test_stark_keys_match_the_previous_derivation():
+    rng = random.Random(1)
+    eth_private_keys = ["0x" + rng.getrandbits(256).to_bytes(32, "big").hex() for _ in range(5)]
+    expected = [legacy_derive_stark_key(k) for k in eth_private_keys]
+    assert derive_stark_keys(eth_private_keys, CHAIN_ID) == expected
+    assert derive_stark_key(eth_private_keys[0], CHAIN_ID) == expected[0]
@@ -0,0 +1,95 @@
+import json
+from decimal import Decimal
+
+from starknet_py.constants import EC_ORDER
+
+from helpers.typed_data import TypedData
+from helpers.utils import message_signature, private_to_stark_key
+from shared.api_client_utils import order_sign_message
+from shared.order_audit import _verify_orders, get_order_hasher
+from shared.paradex_api_utils import Order, OrderSide, OrderType
+
+CHAIN_ID = 0x505249564154455F534E5F504F54435F5345504F4C4941
+PRIVATE_KEY = 0x1234
+ACCOUNT = 0xABC
+
+
+def signed_order(**fields):
+    order = {
+        "id": "1",
+        "market": "ETH-USD-PERP",
+        "side": "BUY",
+        "type": "LIMIT",
+        "size": "0.1",
+        "price": "3000",
+        "signature_timestamp": 1700000000000,
+    }
+    msg_hash = get_order_hasher(CHAIN_ID).message_hash(order, ACCOUNT)
+    r, s = message_signature(msg_hash, PRIVATE_KEY)
+    order["signature"] = json.dumps([str(r), str(s)])
+    order.update(fields)
+    return order
+
+
+def reasons(orders, default_account=None):
+    keys = {ACCOUNT: private_to_stark_key(PRIVATE_KEY)}
+    return [m["reason"] for m in _verify_orders(orders, CHAIN_ID, keys, default_account)]
+
+
+def test_valid_signature_passes():
+    assert reasons([signed_order(account=hex(ACCOUNT))]) == []
+    assert reasons([signed_order()], default_account=ACCOUNT) == []
+
+
+def test_tampered_order_is_invalid():
+    assert reasons([signed_order(account=hex(ACCOUNT), size="0.2")]) == ["invalid_signature"]
+
+
+def test_malformed_account_is_reported():
+    assert reasons([signed_order(account="not-hex")]) == ["malformed"]
+    assert reasons([signed_order(account=123)]) == ["malformed"]
+
+
+def test_unknown_and_missing():
+    assert reasons([signed_order(account="0xdef")]) == ["unknown_account"]
+    assert reasons([signed_order()]) == ["unknown_account"]
+    assert reasons([signed_order(account=hex(ACCOUNT), signature="")]) == ["missing_signature"]
+
+
+def test_orders_signed_through_the_typed_data_pass():
+    order = Order(
+        "ETH-USD-PERP",
+        OrderType.Limit,
+        OrderSide.Sell,
+        Decimal("0.25"),
+        Decimal("3123.45"),
+        signature_timestamp=1700000000123,
+    )
+    typed_data = TypedData.from_dict(order_sign_message(CHAIN_ID, order))
+    r, s = message_signature(typed_data.message_hash(ACCOUNT), PRIVATE_KEY)
+    stored = {
+        "id": "2",
+        "account": hex(ACCOUNT),
+        "market": order.market,
+        "side": order.order_side.value,
+        "type": order.order_type.value,
+        "size": "0.25",
+        "price": "3123.45",
+        "signature": json.dumps([hex(r), hex(s)]),
+        "signature_timestamp": order.signature_timestamp,
+    }
+    assert reasons([stored]) == []
+
+
+def test_out_of_range_signature_values_are_malformed():
+    order = signed_order(account=hex(ACCOUNT))
+    r, s = json.loads(order["signature"])
+    for values in ([r, "0"], ["0", s], [r, str(2**252)], [str(EC_ORDER), s]):
+        assert reasons([dict(order, signature=json.dumps(values))]) == ["malformed"]
+
+
+def test_values_rejected_by_the_backend_are_invalid():
+    order = signed_order(account=hex(ACCOUNT))
+    _, s = json.loads(order["signature"])
+    values = [str(2**251 + 1), s]
+    assert reasons([dict(order, signature=json.dumps(values))]) == ["invalid_signature"]
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from shared.pnl import (
+    AVERAGE_COST,
+    FIFO,
+    average_cost,
+    fifo_realized_pnl,
+    market_pnl,
+    open_position_cost,
+    pnl_by_market,
+    running_position,
+)
+from shared.trade_store import day_range_ms, open_fill_store
+
+T0 = day_range_ms("2024-05-01")[0]
+
+
+def arrays(*fills):
+    qty = np.array([q for q, _ in fills], dtype=np.float64)
+    price = np.array([p for _, p in fills], dtype=np.float64)
+    return qty, price
+
+
+def test_fifo_matches_oldest_units_first():
+    qty, price = arrays((1, 100), (1, 110), (-1, 120), (-1, 105))
+    np.testing.assert_allclose(fifo_realized_pnl(qty, price), [0, 0, 20, -5])
+    assert open_position_cost(qty[:3], price[:3], FIFO) == pytest.approx(110)
+
+
+def test_fifo_partial_fills_and_shorts():
+    qty, price = arrays((-2, 100), (0.5, 90), (1.5, 95), (1, 80))
+    np.testing.assert_allclose(fifo_realized_pnl(qty, price), [0, 5, 7.5, 0])
+    assert running_position(qty)[-1] == 1
+    assert open_position_cost(qty, price, FIFO) == pytest.approx(80)
+
+
+def test_average_cost_realizes_against_the_mean_entry():
+    qty, price = arrays((1, 100), (1, 110), (-1, 120), (-1, 105))
+    realized, entry = average_cost(qty, price)
+    np.testing.assert_allclose(realized, [0, 0, 15, 0])
+    np.testing.assert_allclose(entry, [100, 105, 105, 0])
+    assert open_position_cost(qty[:3], price[:3], AVERAGE_COST) == pytest.approx(105)
+
+
+def test_average_cost_restarts_when_the_position_flips():
+    qty, price = arrays((1, 100), (-2, 110), (1, 100))
+    realized, entry = average_cost(qty, price)
+    np.testing.assert_allclose(realized, [0, 10, 10])
+    np.testing.assert_allclose(entry, [100, 110, 0])
+    np.testing.assert_allclose(fifo_realized_pnl(qty, price), [0, 10, 10])
+
+
+def test_average_cost_stays_finite_over_many_partial_reductions():
+    qty = np.array([1000.0] + [-500.0, 500.0] * 3000)
+    realized, entry = average_cost(qty, np.full(len(qty), 100.0))
+    assert np.all(np.isfinite(realized)) and np.all(np.isfinite(entry))
+    np.testing.assert_allclose(entry, 100.0)
+    np.testing.assert_allclose(realized, 0.0)
+
+    price = np.concatenate(([100.0], np.tile([110.0, 90.0], 3000)))
+    realized, entry = average_cost(qty, price)
+    # Each reduction at 110 realizes against the entry left by the adds at 90
+    assert entry[-1] == pytest.approx(90.0, rel=1e-6)
+    assert realized[-2] == pytest.approx(500 * (110 - entry[-3]))
+
+
+def fill(id, side, size, price, created_at):
+    return {
+        "id": id,
+        "market": "ETH-USD-PERP",
+        "side": side,
+        "size": str(size),
+        "price": str(price),
+        "fee": "0.5",
+        "created_at": created_at,
+    }
+
+
+def test_market_pnl_counts_each_fill_once_and_per_account(tmp_path):
+    store = open_fill_store(str(tmp_path))
+    fills = [fill("1", "BUY", 1, 100, T0), fill("2", "SELL", 1, 120, T0 + 1)]
+    store.append(fills, account="0xa")
+    store.append([fill("3", "BUY", 5, 90, T0 + 2)], account="0xb")
+    # A fill already stored under another file, as written before dedup on append
+    directory = store._partition_dir("ETH-USD-PERP", "2024-05-01")
+    store._write(directory, store._to_table([{**fills[0], "account": "0xa"}]))
+
+    result = market_pnl(store, "ETH-USD-PERP", mark_price=110, account="0xa")
+    assert result["fills"] == 2
+    assert result["realized_pnl"] == pytest.approx(20)
+    assert result["position"] == 0 and result["fees"] == pytest.approx(1.0)
+
+    by_market = pnl_by_market(store, {"ETH-USD-PERP": 100}, account="0xb")
+    assert by_market["ETH-USD-PERP"]["position"] == 5
+    assert by_market["ETH-USD-PERP"]["unrealized_pnl"] == pytest.approx(50)
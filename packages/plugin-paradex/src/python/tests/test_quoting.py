@@ -0,0 +1,165 @@
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+from shared.paradex_api_utils import Order, OrderSide, OrderType
+from shared.quoting import QuoteEngine, QuoteRefresher, diff_quotes
+
+MARKET = "ETH-USD-PERP"
+
+
+def limit(side: OrderSide, price: str, size: str = "1", id: str = "") -> Order:
+    order = Order(MARKET, OrderType.Limit, side, Decimal(size), Decimal(price))
+    order.id = id
+    return order
+
+
+def engine(lower: float, higher: float) -> QuoteEngine:
+    config = SimpleNamespace(
+        quote_refresh_lower_boundary=lower, quote_refresh_higher_boundary=higher
+    )
+    return QuoteEngine(config)
+
+
+def test_matching_quotes_are_left_untouched():
+    live = [limit(OrderSide.Buy, "100", id="a"), limit(OrderSide.Sell, "101", id="b")]
+    desired = [limit(OrderSide.Buy, "100"), limit(OrderSide.Sell, "101")]
+    assert diff_quotes(MARKET, desired, live).is_empty()
+
+
+def test_changed_quotes_are_amended_and_excess_cancelled():
+    live = [
+        limit(OrderSide.Buy, "100", id="a"),
+        limit(OrderSide.Buy, "99", id="b"),
+        limit(OrderSide.Sell, "101", id="c"),
+    ]
+    desired = [limit(OrderSide.Buy, "100.5"), limit(OrderSide.Sell, "101")]
+    diff = diff_quotes(MARKET, desired, live)
+    assert [(o.id, d.limit_price) for o, d in diff.amends] == [("a", Decimal("100.5"))]
+    assert [o.id for o in diff.cancels] == ["b"]
+    assert diff.new_orders == []
+
+
+def test_missing_quotes_are_new_orders():
+    desired = [
+        limit(OrderSide.Buy, "100"),
+        Order(MARKET, OrderType.Market, OrderSide.Sell, Decimal("1")),
+    ]
+    diff = diff_quotes(MARKET, desired, [])
+    assert len(diff.new_orders) == 2 and not diff.amends and not diff.cancels
+
+
+def test_tolerances_avoid_amends():
+    live = [limit(OrderSide.Buy, "100", id="a")]
+    desired = [limit(OrderSide.Buy, "100.01")]
+    assert not diff_quotes(MARKET, desired, live).is_empty()
+    assert diff_quotes(MARKET, desired, live, price_tolerance=Decimal("0.05")).is_empty()
+
+
+def test_refresh_waits_for_the_quiet_period():
+    quotes = engine(lower=1.0, higher=5.0)
+    quotes.submit(MARKET, [limit(OrderSide.Buy, "100")], now=0.0)
+    assert not quotes.is_due(MARKET, 0.5)
+    quotes.submit(MARKET, [limit(OrderSide.Buy, "101")], now=0.9)
+    assert not quotes.is_due(MARKET, 1.5)
+    assert quotes.due_at(MARKET) == 1.9
+    assert quotes.flush(MARKET, [], now=1.5) is None
+    diff = quotes.flush(MARKET, [], now=1.9)
+    assert [o.limit_price for o in diff.new_orders] == [Decimal("101")]
+    assert quotes.next_due() is None
+
+
+def test_continuous_updates_are_flushed_at_the_higher_boundary():
+    quotes = engine(lower=1.0, higher=5.0)
+    for i in range(10):
+        quotes.submit(MARKET, [limit(OrderSide.Buy, str(100 + i))], now=i * 0.5)
+    assert quotes.due_at(MARKET) == 5.0
+    assert quotes.due_markets(4.9) == []
+    assert quotes.due_markets(5.0) == [MARKET]
+
+
+def test_refresher_applies_each_market_once_when_due():
+    async def run():
+        quotes = engine(lower=0.05, higher=0.2)
+        applied = []
+
+        async def live_orders(market):
+            return []
+
+        async def apply(diff):
+            applied.append((asyncio.get_running_loop().time(), diff))
+
+        refresher = QuoteRefresher(quotes, live_orders, apply)
+        task = asyncio.ensure_future(refresher.run())
+        started = asyncio.get_running_loop().time()
+        refresher.submit(MARKET, [limit(OrderSide.Buy, "100")])
+        await asyncio.sleep(0.02)
+        assert applied == []
+        await asyncio.sleep(0.1)
+        assert len(applied) == 1 and applied[0][0] - started >= 0.05
+
+        # Updates keep coming faster than the quiet period, flushed at the higher boundary
+        started = asyncio.get_running_loop().time()
+        for i in range(12):
+            refresher.submit(MARKET, [limit(OrderSide.Buy, str(101 + i))])
+            await asyncio.sleep(0.03)
+        assert len(applied) >= 2
+        assert 0.19 <= applied[1][0] - started < 0.3
+        refresher.stop()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_failed_refreshes_back_off_and_keep_the_quotes():
+    async def run():
+        quotes = engine(lower=1.0, higher=5.0)
+        now = [0.0]
+        calls = {"live": 0, "apply": 0}
+        failing = {"live": True, "apply": True}
+
+        async def live_orders(market):
+            calls["live"] += 1
+            if failing["live"]:
+                raise ConnectionError("API unavailable")
+            return []
+
+        async def apply(diff):
+            calls["apply"] += 1
+            if failing["apply"]:
+                raise ConnectionError("API unavailable")
+
+        refresher = QuoteRefresher(quotes, live_orders, apply, clock=lambda: now[0])
+        refresher.submit(MARKET, [limit(OrderSide.Buy, "100")])
+        now[0] = 1.0
+        assert await refresher.refresh_due() == []
+        # Backs off 1s, 2s, 4s... instead of being due again right away
+        assert quotes.next_due() == 2.0
+        assert await refresher.refresh_due() == []
+        assert calls["live"] == 1
+        now[0] = 2.0
+        await refresher.refresh_due()
+        assert quotes.next_due() == 4.0
+
+        # The diff fails to apply: the flushed quotes are put back
+        failing["live"] = False
+        now[0] = 4.0
+        assert await refresher.refresh_due() == []
+        assert calls["apply"] == 1
+        assert [o.limit_price for o in quotes.desired(MARKET)] == [Decimal("100")]
+        assert quotes.next_due() == 8.0
+
+        failing["apply"] = False
+        now[0] = 8.0
+        applied = await refresher.refresh_due()
+        assert [o.limit_price for o in applied[0].new_orders] == [Decimal("100")]
+        assert quotes.next_due() is None
+
+        # A success resets the backoff
+        refresher.submit(MARKET, [limit(OrderSide.Buy, "101")])
+        failing["live"] = True
+        now[0] = 9.0
+        await refresher.refresh_due()
+        assert quotes.next_due() == 10.0
+
+    asyncio.run(run())
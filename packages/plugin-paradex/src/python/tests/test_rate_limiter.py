@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from shared.rate_limiter import EndpointClass, Priority, RateLimiter, default_limits
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        status = self.statuses.pop(0)
+        return FakeResponse(status, {"Retry-After": "0.01"} if status == 429 else {})
+
+
+def limiter(max_retries=3):
+    return RateLimiter(
+        {"public": (1000, 10), "private": (1000, 10), "orders": (1000, 10)}, max_retries
+    )
+
+
+def test_zero_rate_is_rejected(monkeypatch):
+    monkeypatch.setenv("PARADEX_RATE_LIMIT_ORDERS", "0")
+    with pytest.raises(ValueError, match="PARADEX_RATE_LIMIT_ORDERS"):
+        default_limits()
+
+
+def test_429_is_retried_until_success():
+    async def run():
+        rate_limiter = limiter()
+        session = FakeSession([429, 429, 200])
+        async with rate_limiter.request(
+            session, "POST", "http://x/auth", EndpointClass.PRIVATE, Priority.WRITE
+        ) as response:
+            assert response.status == 200
+        assert len(session.requests) == 3
+        assert rate_limiter.buckets["private"].metrics()["throttled"] == 2
+
+    asyncio.run(run())
+
+
+def test_429_is_returned_after_the_last_retry():
+    async def run():
+        session = FakeSession([429, 429])
+        async with limiter(max_retries=1).request(
+            session, "GET", "http://x/orders", EndpointClass.PRIVATE
+        ) as response:
+            assert response.status == 429
+        assert len(session.requests) == 2
+
+    asyncio.run(run())
+
+
+def test_learned_rate_survives_a_new_loop():
+    rate_limiter = limiter()
+
+    async def throttle():
+        await rate_limiter.acquire(EndpointClass.ORDERS, Priority.ORDER)
+        rate_limiter.observe(EndpointClass.ORDERS, 429, {"Retry-After": "0.01"})
+
+    asyncio.run(throttle())
+    rate = rate_limiter.buckets["orders"].rate
+    assert rate < 1000
+
+    asyncio.run(rate_limiter.acquire(EndpointClass.ORDERS, Priority.ORDER))
+    metrics = rate_limiter.buckets["orders"].metrics()
+    assert metrics["rate"] == rate and metrics["acquired"] == 2 and metrics["throttled"] == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from shared.rebalancer import plan_transfers, target_balances
+
+
+def apply(balances, transfers):
+    result = dict(balances)
+    for transfer in transfers:
+        result[transfer.source] -= transfer.amount
+        result[transfer.recipient] = result.get(transfer.recipient, 0) + transfer.amount
+    return result
+
+
+def test_target_balances_split_by_weight():
+    balances = {"a": 600, "b": 300, "c": 100}
+    assert target_balances(balances, {"a": 1, "b": 1, "c": 2}) == {"a": 250, "b": 250, "c": 500}
+
+
+def test_target_balances_add_up_to_the_total():
+    balances = {"a": 50, "b": 25, "c": 25}
+    targets = target_balances(balances, {"a": 1, "b": 1, "c": 1})
+    assert sum(targets.values()) == 100
+    assert sorted(targets.values()) == [33, 33, 34]
+
+
+def test_target_balances_leave_unweighted_accounts_empty():
+    targets = target_balances({"a": 10, "b": 20}, {"a": 1})
+    assert targets == {"a": 30, "b": 0}
+
+
+def test_target_balances_need_a_positive_weight():
+    with pytest.raises(ValueError):
+        target_balances({"a": 10, "b": 20}, {"a": 0, "c": 1})
+
+
+def test_plan_transfers_reaches_the_targets():
+    balances = {"a": 600, "b": 300, "c": 100}
+    targets = target_balances(balances, {"a": 1, "b": 1, "c": 2})
+    transfers = plan_transfers(balances, targets)
+    assert apply(balances, transfers) == targets
+    assert len(transfers) <= len(balances) - 1
+    assert all(t.amount > 0 for t in transfers)
+
+
+def test_plan_transfers_match_largest_surplus_with_largest_deficit():
+    balances = {"a": 100, "b": 40, "c": 0, "d": 0}
+    targets = {"a": 10, "b": 10, "c": 90, "d": 30}
+    transfers = plan_transfers(balances, targets)
+    assert [t.to_dict() for t in transfers] == [
+        {"from": "a", "to": "c", "amount": 90},
+        {"from": "b", "to": "d", "amount": 30},
+    ]
+
+
+def test_plan_transfers_skip_differences_below_min_amount():
+    balances = {"a": 105, "b": 95, "c": 100}
+    targets = {"a": 100, "b": 100, "c": 100}
+    assert plan_transfers(balances, targets, min_amount=10) == []
+    transfers = plan_transfers(balances, targets, min_amount=5)
+    assert [t.to_dict() for t in transfers] == [{"from": "a", "to": "b", "amount": 5}]
+
+
+def test_plan_transfers_nothing_when_balanced():
+    balances = {"a": 10, "b": 10}
+    assert plan_transfers(balances, dict(balances)) == []
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import pytest
+
+from shared import response_cache as response_cache_module
+from shared.rate_limiter import RateLimiter
+from shared.response_cache import ResponseCache
+
+BASE_URL = "https://api.testnet.paradex.trade/v1"
+MARKETS = {"results": [{"symbol": "ETH-USD-PERP"}, {"symbol": "BTC-USD-PERP"}]}
+
+
+class FakeContent:
+    def __init__(self, raw: bytes):
+        self.raw = raw
+
+    async def iter_chunked(self, size):
+        yield self.raw
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.content = FakeContent(json.dumps(body).encode() if body is not None else b"")
+
+    def release(self):
+        pass
+
+
+class FakeSession:
+    """Answers with `responses` in order, after `delay` seconds."""
+
+    def __init__(self, responses, delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((url, kwargs.get("headers", {}), kwargs.get("params")))
+        await asyncio.sleep(self.delay)
+        return self.responses.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter(monkeypatch):
+    limiter = RateLimiter({"public": (1000, 100), "private": (1000, 100), "orders": (1000, 100)})
+    monkeypatch.setattr(response_cache_module, "get_rate_limiter", lambda: limiter)
+
+
+def test_fresh_entries_are_served_from_the_cache():
+    async def run():
+        cache = ResponseCache({"/markets": 60.0})
+        session = FakeSession([FakeResponse(200, MARKETS)])
+        first = await cache.get(BASE_URL, "/markets", session=session)
+        second = await cache.get(BASE_URL, "/markets", session=session)
+        return cache, session, first, second
+
+    cache, session, first, second = asyncio.run(run())
+    assert first == second == (200, MARKETS)
+    assert len(session.requests) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_callers_cannot_modify_the_cached_body():
+    async def run():
+        cache = ResponseCache({"/markets": 60.0})
+        session = FakeSession([FakeResponse(200, MARKETS)])
+        _, body = await cache.get(BASE_URL, "/markets", session=session)
+        body["results"].clear()
+        _, cached = await cache.get(BASE_URL, "/markets", session=session)
+        cached["results"][0]["symbol"] = "changed"
+        return (await cache.get(BASE_URL, "/markets", session=session))[1]
+
+    assert asyncio.run(run()) == MARKETS
+
+
+def test_expired_entries_are_revalidated_with_their_etag():
+    async def run():
+        cache = ResponseCache({"/markets": 0.0})
+        session = FakeSession(
+            [FakeResponse(200, MARKETS, {"ETag": '"v1"'}), FakeResponse(304)]
+        )
+        await cache.get(BASE_URL, "/markets", session=session)
+        result = await cache.get(BASE_URL, "/markets", session=session)
+        return cache, session, result
+
+    cache, session, result = asyncio.run(run())
+    assert result == (200, MARKETS)
+    assert "If-None-Match" not in session.requests[0][1]
+    assert session.requests[1][1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_errors_are_not_cached():
+    async def run():
+        cache = ResponseCache({"/markets": 60.0})
+        session = FakeSession(
+            [FakeResponse(500, {"error": "INTERNAL"}), FakeResponse(200, MARKETS)]
+        )
+        first = await cache.get(BASE_URL, "/markets", session=session)
+        second = await cache.get(BASE_URL, "/markets", session=session)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first[0] == 500
+    assert second == (200, MARKETS)
+
+
+def test_least_recently_used_entries_are_evicted():
+    async def run():
+        cache = ResponseCache({"/markets": 60.0}, max_entries=2)
+        session = FakeSession([FakeResponse(200, {"market": m}) for m in "abc"])
+        for market in "ab":
+            await cache.get(BASE_URL, "/markets", {"market": market}, session=session)
+        # "a" is used again, so "b" is the least recently used entry
+        await cache.get(BASE_URL, "/markets", {"market": "a"}, session=session)
+        await cache.get(BASE_URL, "/markets", {"market": "c"}, session=session)
+        await cache.get(BASE_URL, "/markets", {"market": "a"}, session=session)
+        return cache, session
+
+    cache, session = asyncio.run(run())
+    assert [params for _, _, params in session.requests] == [
+        {"market": "a"},
+        {"market": "b"},
+        {"market": "c"},
+    ]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_misses_share_one_request():
+    async def run():
+        cache = ResponseCache({"/markets": 60.0})
+        session = FakeSession([FakeResponse(200, MARKETS)], delay=0.01)
+        results = await asyncio.gather(
+            *[cache.get(BASE_URL, "/markets", session=session) for _ in range(5)]
+        )
+        return session, results
+
+    session, results = asyncio.run(run())
+    assert len(session.requests) == 1
+    assert all(r == (200, MARKETS) for r in results)
+    # Each caller has its own copy
+    assert len({id(body) for _, body in results}) == 5
+
+
+def test_private_endpoints_are_refused():
+    with pytest.raises(ValueError):
+        asyncio.run(ResponseCache({"/markets": 60.0}).get(BASE_URL, "/account"))
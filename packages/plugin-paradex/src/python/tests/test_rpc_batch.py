@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+from starknet_py.net.client_errors import ClientError
+
+from shared import rpc_batch
+from shared.rpc_batch import batch_request
+
+NODE_URL = "http://node"
+
+
+class FakeNode:
+    """Answers batches and single requests with the params of each request."""
+
+    def __init__(self, batch_error=None, failing=()):
+        self.batch_error = batch_error
+        self.failing = set(failing)
+        self.batches = []
+        self.singles = []
+
+    def answer(self, payload):
+        if payload["id"] in self.failing:
+            return {"id": payload["id"], "error": {"code": 20, "message": "not found"}}
+        return {"id": payload["id"], "result": payload["params"]}
+
+    async def post(self, session, url, payload):
+        if isinstance(payload, dict):
+            self.singles.append(payload)
+            return self.answer(payload)
+        self.batches.append(payload)
+        if isinstance(self.batch_error, Exception):
+            raise self.batch_error
+        if self.batch_error is not None:
+            return {"id": None, "error": self.batch_error}
+        # Batch responses may come back in any order
+        return [self.answer(p) for p in reversed(payload)]
+
+
+@pytest.fixture
+def node(monkeypatch):
+    node = FakeNode()
+    monkeypatch.setattr(rpc_batch, "_post", node.post)
+    monkeypatch.setattr(rpc_batch, "_unbatched_nodes", {})
+    return node
+
+
+def requests(n):
+    return [("starknet_call", [i]) for i in range(n)]
+
+
+def run(reqs):
+    # Any non-None session, the fake node does not use it
+    return asyncio.run(batch_request(NODE_URL, reqs, session=object()))
+
+
+def test_results_are_matched_by_id_and_chunked(node, monkeypatch):
+    monkeypatch.setattr(rpc_batch, "MAX_BATCH_SIZE", 2)
+    assert run(requests(5)) == [[i] for i in range(5)]
+    assert [len(b) for b in node.batches] == [2, 2, 1]
+    assert node.singles == []
+
+
+def test_failed_requests_yield_their_error(node):
+    node.failing = {1}
+    results = run(requests(3))
+    assert results[0] == [0] and results[2] == [2]
+    assert isinstance(results[1], ClientError) and results[1].code == 20
+
+
+def test_errors_are_mapped_per_item(monkeypatch):
+    async def post(session, url, payload):
+        return [
+            {"id": 0, "result": "0x1"},
+            {"id": 1, "error": {"code": 20, "message": "Contract not found", "data": "x"}},
+        ]
+
+    monkeypatch.setattr(rpc_batch, "_post", post)
+    monkeypatch.setattr(rpc_batch, "_unbatched_nodes", {})
+    ok, error = run(requests(3))[:2]
+    assert ok == "0x1"
+    assert isinstance(error, ClientError) and error.code == 20
+    # A request missing from the response is an error too
+    assert isinstance(run(requests(3))[2], ClientError)
+
+
+@pytest.mark.parametrize(
+    "batch_error",
+    [{"code": -32600, "message": "Invalid request"}, ClientError(code="405", message="")],
+)
+def test_nodes_rejecting_batches_get_single_requests(node, batch_error):
+    node.batch_error = batch_error
+    assert run(requests(3)) == [[0], [1], [2]]
+    assert len(node.batches) == 1 and len(node.singles) == 3
+
+    # Marked as unbatched: no batch is tried again until the mark expires
+    assert run(requests(2)) == [[0], [1]]
+    assert len(node.batches) == 1 and len(node.singles) == 5
+
+
+def test_the_unbatched_mark_expires(node):
+    rpc_batch._unbatched_nodes[NODE_URL] = time.monotonic() - rpc_batch.UNBATCHED_TTL
+    assert run(requests(2)) == [[0], [1]]
+    assert len(node.batches) == 1 and node.singles == []
+    assert NODE_URL not in rpc_batch._unbatched_nodes
+
+
+def test_other_failures_do_not_mark_the_node(node):
+    node.batch_error = ClientError(code="503", message="unavailable")
+    results = run(requests(2))
+    assert all(isinstance(r, ClientError) and r.code == "503" for r in results)
+    assert node.singles == []
+    assert NODE_URL not in rpc_batch._unbatched_nodes
@@ -0,0 +1,24 @@
+from shared.tracing import OrderTracer, order_trace_key
+
+
+def test_orders_are_traced_by_client_id_and_timestamp():
+    tracer = OrderTracer()
+    key = order_trace_key("quote-1", "1700000000000")
+    assert key == ("quote-1", 1700000000000)
+    with tracer.span(key, "post_orders"):
+        pass
+    tracer.link(key, "order-1")
+    assert tracer.get("order-1")["client_id"] == "quote-1"
+    assert tracer.summary()["post_orders"]["count"] == 1
+
+
+def test_orders_without_timestamp_are_not_traced():
+    tracer = OrderTracer()
+    for timestamp in (None, "", "not-a-number"):
+        key = order_trace_key("quote-1", timestamp)
+        assert key is None
+        with tracer.span(key, "post_orders"):
+            pass
+        tracer.link(key, "order-1")
+    assert tracer.summary() == {}
+    assert tracer.get("order-1") is None
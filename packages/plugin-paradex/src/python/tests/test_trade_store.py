@@ -0,0 +1,65 @@
+from shared.trade_store import day_range_ms, open_fill_store, open_trade_store
+
+DAY_MS = 86_400_000
+T0 = day_range_ms("2024-05-01")[0]
+
+
+def trade(id, created_at, market="ETH-USD-PERP", price=100.0):
+    return {
+        "id": id,
+        "market": market,
+        "side": "BUY",
+        "size": "1",
+        "price": str(price),
+        "trade_type": "FILL",
+        "created_at": created_at,
+    }
+
+
+def fill(id, created_at, market="ETH-USD-PERP"):
+    return {**trade(id, created_at, market), "order_id": f"o{id}", "fee": "0.1"}
+
+
+def test_append_partitions_by_market_and_day(tmp_path):
+    store = open_trade_store(str(tmp_path))
+    written = store.append(
+        [trade("1", T0), trade("2", T0 + DAY_MS), trade("3", T0, market="BTC-USD-PERP")]
+    )
+    assert written == 3
+    assert store.markets() == ["BTC-USD-PERP", "ETH-USD-PERP"]
+    assert len(store.files("ETH-USD-PERP")) == 2
+    assert store.read(["id"], "ETH-USD-PERP", T0, T0 + DAY_MS).column("id").to_pylist() == ["1"]
+
+
+def test_append_skips_stored_and_repeated_ids(tmp_path):
+    store = open_trade_store(str(tmp_path))
+    assert store.append([trade("1", T0), trade("2", T0 + 1), trade("2", T0 + 1)]) == 2
+    assert store.append([trade("2", T0 + 1), trade("3", T0 + 2)]) == 1
+    assert store.append([trade("3", T0 + 2)]) == 0
+    assert store.column("id").tolist() == ["1", "2", "3"]
+
+
+def test_created_at_column(tmp_path):
+    store = open_trade_store(str(tmp_path))
+    store.append([trade("2", T0 + 5), trade("1", T0)])
+    assert store.column("created_at").tolist() == [T0, T0 + 5]
+
+
+def test_fills_are_filtered_by_account(tmp_path):
+    store = open_fill_store(str(tmp_path))
+    store.append([fill("1", T0), fill("2", T0 + 1)], account="0xa")
+    store.append([fill("3", T0 + 2, market="BTC-USD-PERP")], account="0xb")
+    assert store.column("id", account="0xa").tolist() == ["1", "2"]
+    assert store.markets(account="0xb") == ["BTC-USD-PERP"]
+    assert sorted(store.read(["account"]).column("account").to_pylist()) == ["0xa", "0xa", "0xb"]
+
+
+def test_compact_range_merges_partition_files(tmp_path):
+    store = open_trade_store(str(tmp_path))
+    for i in range(3):
+        store.append([trade(str(i), T0 + i)])
+    store.append([trade("9", T0 + DAY_MS)])
+    assert len(store.files("ETH-USD-PERP")) == 4
+    assert store.compact_range("ETH-USD-PERP") == 1
+    assert len(store.files("ETH-USD-PERP")) == 2
+    assert store.column("id").tolist() == ["0", "1", "2", "9"]
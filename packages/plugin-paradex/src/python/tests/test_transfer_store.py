@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+import shared.transfer_store as transfer_store
+from shared.transfer_store import open_transfer_store, sync_transfers
+
+ACCOUNT = "0xa"
+
+
+def transfer(i, created_at, status="COMPLETED", kind="DEPOSIT", amount="10"):
+    return {
+        "id": f"t{i}",
+        "account": ACCOUNT,
+        "kind": kind,
+        "status": status,
+        "token": "USDC",
+        "amount": amount,
+        "created_at": created_at,
+    }
+
+
+class FakeServer:
+    """Serves the transfers created in [start_at, end_at), `page_size` per page."""
+
+    def __init__(self, transfers, page_size=2, fail_after=None):
+        self.transfers = transfers
+        self.page_size = page_size
+        self.fail_after = fail_after
+        self.requests = []
+
+    async def iter_pages(self, session, url, headers, params, cursor, endpoint_class, **kwargs):
+        start = params.get("start_at", 0)
+        records = [t for t in self.transfers if start <= t["created_at"] < params["end_at"]]
+        pages = [records[i : i + self.page_size] for i in range(0, len(records), self.page_size)]
+        index = int(cursor or 0)
+        while index < len(pages):
+            if self.fail_after is not None and len(self.requests) >= self.fail_after:
+                self.fail_after = None
+                raise ConnectionError("connection lost")
+            self.requests.append((params.get("start_at"), index))
+            next_cursor = str(index + 1) if index + 1 < len(pages) else None
+            yield pages[index], next_cursor
+            index += 1
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_transfer_store(str(tmp_path))
+    yield store
+    store.close()
+
+
+def sync(store, monkeypatch, server, now_ms):
+    monkeypatch.setattr(transfer_store, "iter_pages", server.iter_pages)
+    monkeypatch.setattr(
+        transfer_store.time, "time", lambda: (now_ms + transfer_store.SETTLE_DELAY_MS) / 1000
+    )
+    return asyncio.run(sync_transfers(None, "http://x", "jwt", ACCOUNT, store))
+
+
+def test_watermark_advances_to_the_end_of_the_sync(store, monkeypatch):
+    server = FakeServer([transfer(i, 100 + i) for i in range(5)])
+    assert sync(store, monkeypatch, server, now_ms=200) == 5
+    assert store.sync_state(ACCOUNT) == {"synced_until": 200, "pending": None}
+    assert store.resume_point(ACCOUNT) == 200
+
+    # The next sync only asks for what was created since the watermark
+    server.transfers.append(transfer(9, 250))
+    assert sync(store, monkeypatch, server, now_ms=300) == 1
+    assert server.requests[-1] == (200, 0)
+    assert [t["id"] for t in store.query(ACCOUNT)] == ["t0", "t1", "t2", "t3", "t4", "t9"]
+
+
+def test_resume_point_goes_back_to_the_oldest_transfer_in_flight(store, monkeypatch):
+    server = FakeServer([transfer(0, 100), transfer(1, 110, status="PENDING"), transfer(2, 120)])
+    sync(store, monkeypatch, server, now_ms=200)
+    assert store.resume_point(ACCOUNT) == 110
+
+    # The in-flight transfer completes, it is refetched and updated in place
+    server.transfers[1] = transfer(1, 110, status="COMPLETED")
+    sync(store, monkeypatch, server, now_ms=300)
+    assert server.requests[-1][0] == 110
+    assert [t["status"] for t in store.query(ACCOUNT)] == ["COMPLETED"] * 3
+    assert store.resume_point(ACCOUNT) == 300
+
+
+def test_interrupted_sync_resumes_at_its_cursor(store, monkeypatch):
+    server = FakeServer([transfer(i, 100 + i) for i in range(6)], fail_after=2)
+    with pytest.raises(ConnectionError):
+        sync(store, monkeypatch, server, now_ms=200)
+    state = store.sync_state(ACCOUNT)
+    assert state["synced_until"] is None and state["pending"]["cursor"] == "2"
+
+    assert sync(store, monkeypatch, server, now_ms=500) == 6
+    assert server.requests == [(None, 0), (None, 1), (None, 2)]
+    # The resumed sync keeps the end of the interrupted one
+    assert store.sync_state(ACCOUNT)["synced_until"] == 200
+
+
+def test_totals_and_filters(store):
+    store.upsert(
+        [
+            transfer(0, 100),
+            transfer(1, 110, kind="WITHDRAWAL", amount="4"),
+            transfer(2, 120, status="FAILED"),
+        ]
+    )
+    assert store.totals(ACCOUNT) == {"USDC": {"DEPOSIT": 10.0, "WITHDRAWAL": 4.0}}
+    assert [t["id"] for t in store.query(ACCOUNT, kind="DEPOSIT", start_ms=105)] == ["t2"]
+
+
+def test_fetch_transfers_exits_on_expired_token_and_closes_its_store(tmp_path, monkeypatch):
+    import shared.api_client as api_client
+    from shared.pagination import PageError
+
+    opened = []
+
+    def open_store():
+        opened.append(open_transfer_store(str(tmp_path)))
+        return opened[-1]
+
+    async def expired(*args):
+        raise PageError("http://x", 401, {"message": "invalid bearer jwt: token is expired by 1s"})
+
+    monkeypatch.setattr(api_client, "open_transfer_store", open_store)
+    monkeypatch.setattr(api_client, "sync_transfers", expired)
+    with pytest.raises(SystemExit):
+        asyncio.run(api_client.fetch_transfers("http://x", "jwt", ACCOUNT))
+    with pytest.raises(Exception, match="closed"):
+        opened[0].query(ACCOUNT)
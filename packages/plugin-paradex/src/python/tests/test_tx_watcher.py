@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from starknet_py.transaction_errors import (
+    TransactionNotReceivedError,
+    TransactionRejectedError,
+    TransactionRevertedError,
+)
+
+from helpers.nonce_manager import NonceManager
+from shared import tx_watcher
+from shared.tx_watcher import TxWatcher
+
+
+class FakeClient:
+    url = "http://node"
+    session = None
+
+
+def receipt(finality_status, execution_status="SUCCEEDED", block_number=10):
+    return {
+        "finality_status": finality_status,
+        "execution_status": execution_status,
+        "block_number": block_number,
+    }
+
+
+def watch_one(monkeypatch, result, chain_nonce_after):
+    """Nonce manager state after watching one transaction sent with nonce 5."""
+    chain_nonce = [5]
+
+    async def fetch_nonce():
+        return chain_nonce[0]
+
+    async def batch_request(url, requests, session=None):
+        return [result for _ in requests]
+
+    monkeypatch.setattr(tx_watcher, "batch_request", batch_request)
+
+    async def run():
+        nonces = NonceManager(fetch_nonce)
+        nonce = await nonces.acquire()
+        nonces.sent(nonce, 0xAB)
+        watcher = TxWatcher(FakeClient())
+        try:
+            outcome = await watcher.wait_for_l2(0xAB, nonces)
+        except Exception as err:
+            outcome = err
+        chain_nonce[0] = chain_nonce_after
+        return outcome, dict(nonces.in_flight), await nonces.acquire()
+
+    return asyncio.run(run())
+
+
+def test_accepted_transactions_confirm_their_nonce(monkeypatch):
+    outcome, in_flight, next_nonce = watch_one(monkeypatch, receipt("ACCEPTED_ON_L2"), 6)
+    assert outcome[0] == 10
+    assert in_flight == {}
+    assert next_nonce == 6
+
+
+def test_reverted_transactions_confirm_their_nonce(monkeypatch):
+    outcome, in_flight, next_nonce = watch_one(
+        monkeypatch, receipt("ACCEPTED_ON_L2", execution_status="REVERTED"), 6
+    )
+    assert isinstance(outcome, TransactionRevertedError)
+    assert in_flight == {}
+    assert next_nonce == 6
+
+
+def test_rejected_transactions_resync_the_nonce(monkeypatch):
+    outcome, in_flight, next_nonce = watch_one(monkeypatch, receipt("REJECTED"), 5)
+    assert isinstance(outcome, TransactionRejectedError)
+    assert in_flight == {}
+    # Resynced from the chain instead of going on from 6
+    assert next_nonce == 5
+
+
+def test_lost_transactions_resync_the_nonce(monkeypatch):
+    monkeypatch.setattr(tx_watcher, "NOT_RECEIVED_TIMEOUT", -1.0)
+    outcome, in_flight, next_nonce = watch_one(monkeypatch, ValueError("not found"), 5)
+    assert isinstance(outcome, TransactionNotReceivedError)
+    assert in_flight == {}
+    assert next_nonce == 5
+
+
+@pytest.mark.parametrize("status", ["REJECTED", "ACCEPTED_ON_L2"])
+def test_unwatched_nonces_are_left_alone(monkeypatch, status):
+    async def batch_request(url, requests, session=None):
+        return [receipt(status) for _ in requests]
+
+    monkeypatch.setattr(tx_watcher, "batch_request", batch_request)
+
+    async def run():
+        watcher = TxWatcher(FakeClient())
+        try:
+            await watcher.wait_for_l2(0xCD)
+        except TransactionRejectedError:
+            pass
+        return watcher.pending()
+
+    assert asyncio.run(run()) == 0
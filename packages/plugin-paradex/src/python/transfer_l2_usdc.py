@@ -2,15 +2,15 @@ import asyncio
 import logging
 import os
 
-from starknet_py.contract import Contract
-
 from helpers.account import Account
 from shared.api_client import get_paradex_config
+from shared.contract_cache import contract_from_address
+from shared.fee_estimator import get_fee_estimator
+from shared.rpc_batch import BalanceQuery, read_balances
+from shared.tx_watcher import get_tx_watcher
 from utils import (
     get_account,
     get_paradex_account_address,
-    get_proxy_config,
-    get_random_max_fee,
     hex_to_int,
 )
 
@@ -25,22 +25,18 @@ async def paraclear_transfer(
     usdc_address = config["bridged_tokens"][0]["l2_token_address"]
     usdc_decimals = config["bridged_tokens"][0]["decimals"]
 
-    paraclear_contract = await Contract.from_address(
-        provider=old_account, address=paraclear_address, proxy_config=get_proxy_config()
-    )
-    paraclear_contract_new = await Contract.from_address(
-        provider=new_account, address=paraclear_address, proxy_config=get_proxy_config()
-    )
-    usdc_contract = await Contract.from_address(
-        provider=old_account, address=usdc_address, proxy_config=get_proxy_config()
+    # Resolved once from the contract cache, without proxy discovery round trips
+    paraclear_contract, paraclear_contract_new, usdc_contract = await asyncio.gather(
+        contract_from_address(paraclear_address, old_account),
+        contract_from_address(paraclear_address, new_account),
+        contract_from_address(usdc_address, old_account),
     )
 
     # Set transfer amount to available balance if not specified
     if (transfer_amount is None):
-        old_acc_token_asset_bal = await paraclear_contract.functions["getTokenAssetBalance"].call(
-            account=old_account.address, token_address=hex_to_int(usdc_address)
+        (available_balance_paraclear,) = await read_balances(
+            old_account.client, [BalanceQuery(old_account.address, usdc_address, paraclear_address)]
         )
-        available_balance_paraclear = old_acc_token_asset_bal.balance
         available_balance = available_balance_paraclear / 10**paraclear_decimals
         logging.info(f"USDC balance on paraclear: {available_balance} (old account)")
         transfer_amount = available_balance
@@ -61,10 +57,14 @@ async def paraclear_transfer(
             amount=transfer_amount_usdc,
         ),
     ]
-    transfer_info = await old_account.execute_v1(calls=calls, max_fee=get_random_max_fee())
+    max_fee = await get_fee_estimator().max_fee(old_account, calls)
+    transfer_info = await old_account.submit_v1(calls, max_fee=max_fee)
     transfer_tx_hash = hex(transfer_info.transaction_hash)
+    # The deposit spends the transferred USDC from another account, so it has to wait
     logging.info(f"Waiting for transfer to complete: {transfer_tx_hash}")
-    tx_status = await old_account.client.wait_for_tx(tx_hash=transfer_tx_hash)
+    tx_status = await get_tx_watcher(old_account.client).wait_for_l2(
+        transfer_tx_hash, old_account.nonce_manager
+    )
     logging.info(f"L2 transfer completed: {tx_status}")
 
     # 3. Increase USDC allowance for Paraclear (new account)
@@ -78,31 +78,37 @@ async def paraclear_transfer(
             amount=transfer_amount_paraclear,
         )
     ]
-    deposit_info = await new_account.execute_v1(calls=deposit_calls, max_fee=get_random_max_fee())
+    max_fee = await get_fee_estimator().max_fee(new_account, deposit_calls)
+    deposit_info = await new_account.submit_v1(deposit_calls, max_fee=max_fee)
     deposit_tx_hash = hex(deposit_info.transaction_hash)
     logging.info(f"Waiting for deposit to complete: {deposit_tx_hash}")
-    tx_status = await old_account.client.wait_for_tx(tx_hash=deposit_tx_hash)
+    tx_status = await get_tx_watcher(old_account.client).wait_for_l2(
+        deposit_tx_hash, new_account.nonce_manager
+    )
     logging.info(f"L2 deposit completed: {tx_status}")
 
-    # Check balance on USDC
-    old_acc_usdc_bal = await usdc_contract.functions["balanceOf"].call(account=old_account.address)
-    logging.info(f"USDC L2 balance is {old_acc_usdc_bal.balance / 10**usdc_decimals} (old account)")
-
-    new_acc_usdc_bal = await usdc_contract.functions["balanceOf"].call(account=new_account.address)
-    logging.info(f"USDC L2 balance is {new_acc_usdc_bal.balance / 10**usdc_decimals} (new account)")
-
-    # Check balance on Paraclear
-    old_acc_token_asset_bal = await paraclear_contract.functions["getTokenAssetBalance"].call(
-        account=old_account.address, token_address=hex_to_int(usdc_address)
+    # Check balances on USDC and Paraclear, in one round trip
+    (
+        old_acc_usdc_bal,
+        new_acc_usdc_bal,
+        old_acc_token_asset_bal,
+        new_acc_token_asset_bal,
+    ) = await read_balances(
+        old_account.client,
+        [
+            BalanceQuery(old_account.address, usdc_address),
+            BalanceQuery(new_account.address, usdc_address),
+            BalanceQuery(old_account.address, usdc_address, paraclear_address),
+            BalanceQuery(new_account.address, usdc_address, paraclear_address),
+        ],
     )
+    logging.info(f"USDC L2 balance is {old_acc_usdc_bal / 10**usdc_decimals} (old account)")
+    logging.info(f"USDC L2 balance is {new_acc_usdc_bal / 10**usdc_decimals} (new account)")
     logging.info(
-        f"USDC balance on paraclear: {old_acc_token_asset_bal.balance / 10**paraclear_decimals} (old account)"
-    )
-    new_acc_token_asset_bal = await paraclear_contract_new.functions["getTokenAssetBalance"].call(
-        account=new_account.address, token_address=hex_to_int(usdc_address)
+        f"USDC balance on paraclear: {old_acc_token_asset_bal / 10**paraclear_decimals} (old account)"
     )
     logging.info(
-        f"USDC balance on paraclear: {new_acc_token_asset_bal.balance / 10**paraclear_decimals} (new account)"
+        f"USDC balance on paraclear: {new_acc_token_asset_bal / 10**paraclear_decimals} (new account)"
     )
 
 
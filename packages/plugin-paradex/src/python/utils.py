@@ -1,15 +1,13 @@
 import aiohttp
 import asyncio
-import hashlib
 import logging
-import random
 import re
 import time
 import os
+import warnings
 from enum import IntEnum
 from typing import Callable, Dict, Optional, Tuple
 
-from eth_account.messages import encode_structured_data
 from eth_account.signers.local import LocalAccount
 from web3.auto import Web3, w3
 from web3.middleware import construct_sign_and_send_raw_middleware
@@ -20,20 +18,23 @@ from starknet_py.hash.address import compute_address
 from starknet_py.hash.selector import get_selector_from_name
 from starknet_py.net.client import Client
 from starknet_py.net.client_errors import ClientError
-from starknet_py.net.client_models import Call, Hash, TransactionExecutionStatus, TransactionFinalityStatus
-from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.client_models import Call, Hash, TransactionFinalityStatus
 from starknet_py.net.models import Address
 from starknet_py.net.signer.stark_curve_signer import KeyPair
 from starknet_py.proxy.contract_abi_resolver import ProxyConfig
 from starknet_py.proxy.proxy_check import ArgentProxyCheck, OpenZeppelinProxyCheck, ProxyCheck
-from starknet_py.transaction_errors import (
-    TransactionRevertedError,
-    TransactionNotReceivedError,
-)
+from starknet_py.transaction_errors import TransactionNotReceivedError
 from starknet_py.utils.typed_data import TypedData
-from starkware.crypto.signature.signature import EC_ORDER
 
 from helpers.account import Account
+from helpers.key_derivation import (
+    encode_stark_key_message,
+    grind_key,
+    private_key_from_eth_signature,
+    stark_key_message,
+)
+from shared.account_registry import get_account_registry
+from shared.tx_watcher import get_tx_watcher
 
 
 def get_paradex_url():
@@ -74,24 +75,7 @@ def build_auth_message(chainId: int, now: int, expiry: int) -> TypedData:
 
 
 def build_stark_key_message(chain_id: int) -> TypedData:
-    message = {
-        "domain": {"name": "Paradex", "version": "1", "chainId": chain_id},
-        "primaryType": "Constant",
-        "types": {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-            ],
-            "Constant": [
-                {"name": "action", "type": "string"},
-            ],
-        },
-        "message": {
-            "action": "STARK Key",
-        },
-    }
-    return message
+    return stark_key_message(chain_id)
 
 
 def build_onboarding_message(chainId: int) -> TypedData:
@@ -116,42 +100,19 @@ def build_onboarding_message(chainId: int) -> TypedData:
 
 
 def sign_stark_key_message(eth_private_key: int, stark_key_message) -> str:
-    encoded = encode_structured_data(primitive=stark_key_message)
+    encoded = encode_stark_key_message(stark_key_message)
     signed = w3.eth.account.sign_message(encoded, eth_private_key)
     return signed.signature.hex()
 
 
-def grind_key(key_seed: int, key_value_limit: int) -> int:
-    max_allowed_value = 2**256 - (2**256 % key_value_limit)
-    current_index = 0
-
-    def indexed_sha256(seed: int, index: int) -> int:
-        def padded_hex(x: int) -> str:
-            # Hex string should have an even
-            # number of characters to convert to bytes.
-            hex_str = hex(x)[2:]
-            return hex_str if len(hex_str) % 2 == 0 else "0" + hex_str
-
-        digest = hashlib.sha256(bytes.fromhex(padded_hex(seed) + padded_hex(index))).hexdigest()
-        return int(digest, 16)
-
-    key = indexed_sha256(seed=key_seed, index=current_index)
-    while key >= max_allowed_value:
-        current_index += 1
-        key = indexed_sha256(seed=key_seed, index=current_index)
-
-    return key % key_value_limit
-
-
 def get_private_key_from_eth_signature(eth_signature_hex: str) -> int:
-    r = eth_signature_hex[2 : 64 + 2]
-    return grind_key(int(r, 16), EC_ORDER)
+    return private_key_from_eth_signature(eth_signature_hex)
 
 
 def derive_stark_key_from_eth_key(msg: str, eth_private_key: str) -> int:
-    message_signature = sign_stark_key_message(eth_private_key, msg)
-    private_key = get_private_key_from_eth_signature(message_signature)
-    return private_key
+    # The encoded STARK Key message is cached per chain
+    signed = w3.eth.account.sign_message(encode_stark_key_message(msg), eth_private_key)
+    return grind_key(signed.r)
 
 
 def get_acc_contract_address_and_call_data(
@@ -205,21 +166,14 @@ def get_chain_id(chain_id: str):
     return CustomStarknetChainId.PRIVATE_TESTNET
 
 
-def get_account(account_address: str, account_key: str, paradex_config: dict):
-    client = FullNodeClient(node_url=paradex_config["starknet_fullnode_rpc_url"])
-    key_pair = KeyPair.from_private_key(key=hex_to_int(account_key))
-    chain = get_chain_id(paradex_config["starknet_chain_id"])
-    account = Account(
-        client=client,
+# Accounts, key pairs and node clients are shared through the process-wide registry
+def get_account(account_address: str, account_key: str, paradex_config: dict) -> Account:
+    return get_account_registry().account(
         address=account_address,
-        key_pair=key_pair,
-        chain=chain,
+        private_key=hex_to_int(account_key),
+        node_url=paradex_config["starknet_fullnode_rpc_url"],
+        chain=get_chain_id(paradex_config["starknet_chain_id"]),
     )
-    return account
-
-
-def get_random_max_fee(start=1e18, end=1e19) -> int:
-    return random.randint(start, end)
 
 
 def get_proxy_config():
@@ -270,36 +224,29 @@ class StarkwareETHProxyCheck(ProxyCheck):
         )
 
 
-# Forked from https://github.com/software-mansion/starknet.py/blob/development/starknet_py/net/client.py#L134
-# Method tweaked to wait for `ACCEPTED_ON_L1` status
+# Waits for `ACCEPTED_ON_L1` status through the shared receipt watcher,
+# which polls all watched transactions in one batch per tick
 async def wait_for_tx(
-    client: Client, tx_hash: Hash, check_interval=5
+    client: Client, tx_hash: Hash, check_interval: Optional[float] = None
 ) -> Tuple[int, TransactionFinalityStatus]:
     """
-    Awaits for transaction to get accepted or at least pending by polling its status
+    Awaits for transaction to get accepted on L1
 
-    :param client: Instance of Client
+    :param client: Instance of FullNodeClient
     :param tx_hash: Transaction's hash
-    :param check_interval: Defines interval between checks
+    :param check_interval: Deprecated and ignored, the watcher backs off on its own
     :return: Tuple containing block number and transaction status
     """
-    if check_interval <= 0:
-        raise ValueError("Argument check_interval has to be greater than 0.")
+    if check_interval is not None:
+        warnings.warn(
+            "wait_for_tx check_interval is deprecated and ignored, "
+            "the receipt watcher sets its own poll interval",
+            DeprecationWarning,
+            stacklevel=2,
+        )
 
     try:
-        while True:
-            result = await client.get_transaction_receipt(tx_hash=tx_hash)
-
-            if result.execution_status == TransactionExecutionStatus.REVERTED:
-                raise TransactionRevertedError(
-                    message=result.revert_reason,
-                )
-
-            if result.finality_status == TransactionFinalityStatus.ACCEPTED_ON_L1:
-                assert result.block_number is not None
-                return result.block_number, result.finality_status
-
-            await asyncio.sleep(check_interval)
+        return await get_tx_watcher(client).wait_for_l1(tx_hash)
     except asyncio.CancelledError as exc:
         raise TransactionNotReceivedError from exc
 
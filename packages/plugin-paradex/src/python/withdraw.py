@@ -1,27 +1,26 @@
 # built ins
 import asyncio
-import json
 import logging
 import os
 import traceback
-from hexbytes import HexBytes
 from typing import Dict, Tuple
 
+from eth_account.signers.local import LocalAccount
 from web3.auto import Web3
 
-from starknet_py.contract import Contract
 from starknet_py.net.client import Client
 
 from helpers.account import Account
 from shared.api_client import get_paradex_config
+from shared.contract_cache import contract_from_address
+from shared.fee_estimator import get_fee_estimator
+from shared.l1_bridge import L1Bridge, claim_when_matured
+from shared.tx_watcher import get_tx_watcher
 from utils import (
     generate_paradex_account,
     get_account,
     get_l1_eth_account,
-    get_proxy_config,
-    get_random_max_fee,
     hex_to_int,
-    wait_for_tx,
 )
 
 paradex_http_url = "https://api.testnet.paradex.trade/v1"
@@ -38,14 +37,12 @@ async def withdraw_from_paraclear(
     l2_bridge_address = config["bridged_tokens"][0]["l2_bridge_address"]
     usdc_decimals = config["bridged_tokens"][0]["decimals"]
 
-    paraclear_contract = await Contract.from_address(
-        provider=account, address=paraclear_address, proxy_config=True
+    paraclear_contract, l2_bridge_contract, usdc_contract = await asyncio.gather(
+        contract_from_address(paraclear_address, account),
+        contract_from_address(l2_bridge_address, account),
+        contract_from_address(usdc_address, account),
     )
     logging.info(f"Paraclear Contract: {hex(paraclear_contract.address)}")
-
-    l2_bridge_contract = await Contract.from_address(
-        provider=account, address=l2_bridge_address, proxy_config=get_proxy_config()
-    )
     logging.info(f"USDC Bridge Contract: {hex(l2_bridge_contract.address)}")
 
     token_asset_bal = await paraclear_contract.functions["getTokenAssetBalance"].call(
@@ -69,18 +66,17 @@ async def withdraw_from_paraclear(
             amount=amount * 10**usdc_decimals,
         ),
     ]
-    withdraw_info = await account.execute_v1(calls=calls, max_fee=get_random_max_fee())
+    max_fee = await get_fee_estimator().max_fee(account, calls)
+    withdraw_info = await account.execute_v1(calls=calls, max_fee=max_fee)
     withdraw_tx_hash = hex(withdraw_info.transaction_hash)
     logging.info(f"Waiting for withdraw to complete: {withdraw_tx_hash}")
-    tx_status = await account.client.wait_for_tx(
-        tx_hash=withdraw_info.transaction_hash,
-    )
+    # Keep watching after L2 acceptance, main() then waits for `ACCEPTED_ON_L1`
+    tx_status = await get_tx_watcher(account.client).watch(
+        withdraw_info.transaction_hash, until_l1=True
+    ).l2
     logging.info(f"L2 withdraw completed: {tx_status}")
 
     # Check balance
-    usdc_contract = await Contract.from_address(
-        provider=account, address=usdc_address, proxy_config=get_proxy_config()
-    )
     usdc_bal = await usdc_contract.functions["balanceOf"].call(account=account.address)
     logging.info(f"USDC L2 balance is {usdc_bal[0] / 10**usdc_decimals}")
 
@@ -88,28 +84,19 @@ async def withdraw_from_paraclear(
 
 
 async def withdraw_from_l1_bridge(
-    l1_recipient: str, amount: int, config: Dict, w3: Web3
-) -> None:
+    l1_recipient: str, amount: int, config: Dict, w3: Web3, eth_account: LocalAccount
+) -> str:
     logging.info("Withdraw from L1 token bridge contract to L1 recipient")
 
-    l1_bridge_address = config["bridged_tokens"][0]["l1_bridge_address"]
-    l1_bridge_abi = json.load(open(os.path.abspath("./abis/l1_bridge_abi.json")))
     usdc_decimals = config["bridged_tokens"][0]["decimals"]
-
-    l1_contract = w3.eth.contract(address=l1_bridge_address, abi=l1_bridge_abi)
-
-    nonce = w3.eth.get_transaction_count(l1_recipient, "pending")
-    tx = {
-        "maxFeePerGas": w3.toWei("2", "gwei"),
-        "maxPriorityFeePerGas": w3.toWei("1", "gwei"),
-        "nonce": nonce,
-        "type": 2,
-    }
-    withdraw_tx = l1_contract.functions.withdraw(
-        amount * 10**usdc_decimals, l1_recipient
-    ).build_transaction(tx)
-    tx_hash = w3.eth.send_transaction(withdraw_tx)
-    logging.info(f"L1 withdraw tx hash: { HexBytes(tx_hash).hex()}")
+    bridge = L1Bridge(w3, eth_account, config)
+    (tx_hash,) = await bridge.claim([(l1_recipient, amount * 10**usdc_decimals)])
+    if isinstance(tx_hash, Exception):
+        raise tx_hash
+    receipts = await bridge.wait_for_receipts([tx_hash])
+    if tx_hash not in receipts:
+        raise Exception(f"L1 withdraw {tx_hash} was not included")
+    return tx_hash
 
 
 # Primary Coroutine
@@ -137,12 +124,20 @@ async def main(eth_private_key_hex: str) -> None:
         eth_account.address, amount, paradex_config, account
     )
 
-    # Poll for `ACCEPTED_ON_L1` status
+    # After withdraw tx is `ACCEPTED_ON_L1`, trigger the withdrawal from L1 bridge.
+    # Any number of L2 withdrawals can be passed, they are claimed as they mature
     logging.info(f"Poll L2 withdraw tx: {withdraw_tx_hash}")
-    await wait_for_tx(client=client, tx_hash=withdraw_tx_hash)
-
-    # After withdraw tx is `ACCEPTED_ON_L1`, trigger the withdrawal from L1 bridge
-    await withdraw_from_l1_bridge(eth_account.address, amount, paradex_config, w3)
+    bridge = L1Bridge(w3, eth_account, paradex_config)
+    usdc_decimals = paradex_config["bridged_tokens"][0]["decimals"]
+    claims = await claim_when_matured(
+        bridge, client, [(withdraw_tx_hash, eth_account.address, amount * 10**usdc_decimals)]
+    )
+    l1_tx_hashes = [h for h in claims.values() if isinstance(h, str)]
+    receipts = await bridge.wait_for_receipts(l1_tx_hashes)
+    missing = [h for h in l1_tx_hashes if h not in receipts]
+    if missing:
+        logging.error(f"L1 withdrawals not included: {missing}")
+    logging.info(f"L1 withdrawals completed: {claims}")
 
 
 if __name__ == "__main__":
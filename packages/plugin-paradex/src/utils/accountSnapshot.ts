@@ -0,0 +1,97 @@
+export type SnapshotPart = "account" | "positions" | "balances" | "openOrders";
+
+interface CachedPart {
+    value: any;
+    fetchedAt: number;
+}
+
+// `requireOk: false` returns the body of a non-2xx response, as /balance always did,
+// but only successful responses are cached
+const SNAPSHOT_ENDPOINTS: Record<
+    SnapshotPart,
+    { path: string; requireOk: boolean }
+> = {
+    account: { path: "/account", requireOk: true },
+    positions: { path: "/positions", requireOk: true },
+    balances: { path: "/balance", requireOk: false },
+    openOrders: { path: "/orders", requireOk: true },
+};
+
+// Providers are composed on every turn, a short TTL is enough to share one fetch
+const SNAPSHOT_TTL_MS = Number(process.env.PARADEX_SNAPSHOT_TTL_MS || 3000);
+
+// Keyed by jwt and part, so a failed endpoint does not evict or block the others
+const parts = new Map<string, CachedPart>();
+const inFlight = new Map<string, Promise<any>>();
+
+function getParadexUrl(): string {
+    const network = (process.env.PARADEX_NETWORK || "testnet").toLowerCase();
+    if (network !== "testnet" && network !== "prod") {
+        throw new Error("PARADEX_NETWORK must be either 'testnet' or 'prod'");
+    }
+    return `https://api.${network}.paradex.trade/v1`;
+}
+
+async function fetchPrivate(
+    path: string,
+    jwt: string,
+    requireOk: boolean
+): Promise<{ ok: boolean; value: any }> {
+    const response = await fetch(`${getParadexUrl()}${path}`, {
+        headers: {
+            Authorization: `Bearer ${jwt}`,
+            Accept: "application/json",
+        },
+    });
+
+    if (requireOk && !response.ok) {
+        throw new Error(
+            `Failed to fetch ${path}: ${response.status} ${response.statusText}`
+        );
+    }
+
+    return { ok: response.ok, value: await response.json() };
+}
+
+function evictExpired(now: number) {
+    for (const [key, part] of parts) {
+        if (now - part.fetchedAt >= SNAPSHOT_TTL_MS) {
+            parts.delete(key);
+        }
+    }
+}
+
+/**
+ * Returns one part of the account snapshot. Successful responses are cached
+ * for a short TTL, failures and non-2xx bodies are not, and concurrent
+ * callers share a single request per part.
+ */
+export async function getSnapshotPart(
+    jwt: string,
+    part: SnapshotPart
+): Promise<any> {
+    evictExpired(Date.now());
+
+    const key = `${jwt}:${part}`;
+    const cached = parts.get(key);
+    if (cached) {
+        return cached.value;
+    }
+
+    const pending = inFlight.get(key);
+    if (pending) {
+        return pending;
+    }
+
+    const { path, requireOk } = SNAPSHOT_ENDPOINTS[part];
+    const request = fetchPrivate(path, jwt, requireOk)
+        .then(({ ok, value }) => {
+            if (ok) {
+                parts.set(key, { value, fetchedAt: Date.now() });
+            }
+            return value;
+        })
+        .finally(() => inFlight.delete(key));
+    inFlight.set(key, request);
+    return request;
+}